@@ -0,0 +1,12 @@
+"""
+Пакет benchmarks: замеры производительности журнала тренировок без графического интерфейса.
+
+Модули пакета:
+- generator: генератор синтетических журналов заданного размера с воспроизводимыми (по seed) данными;
+- run: замеры времени и пиковой памяти операций журнала, запись результатов в JSON и сравнение с базовыми;
+- load: нагрузочный тест локального сервера журнала (python -m journal serve): запросы в секунду и процентили
+времени ответа при одновременных клиентах.
+
+Запуск: python -m benchmarks --sizes 10k 100k
+Нагрузочный тест: python -m benchmarks.load --size 100k --clients 16
+"""
@@ -0,0 +1,9 @@
+"""
+Запуск замеров производительности: python -m benchmarks ...
+"""
+
+import sys
+
+from benchmarks.run import main
+
+sys.exit(main())
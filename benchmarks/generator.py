@@ -0,0 +1,102 @@
+"""
+Генератор синтетических журналов тренировок для замеров производительности.
+
+Журнал строится из генератора случайных чисел NumPy с заданным зерном (seed), поэтому один и тот же
+размер и seed всегда дают один и тот же файл. Распределения приближены к настоящему журналу:
+- упражнения выбираются по закону Ципфа: несколько базовых упражнений встречаются часто, остальные редко;
+- подходы сгруппированы в тренировки (от 3 до 25 подходов одной тренировки с интервалом в несколько минут),
+тренировки идут через 1-3 дня, начиная с START_DATE; журнал охватывает не более MAX_DAYS дней, поэтому
+в больших журналах тренировки идут чаще (как в общем журнале нескольких спортсменов);
+- у каждого упражнения свой рабочий вес, который медленно растет со временем, с разбросом и округлением
+до 0.5 кг (от 0.5 до 200 кг);
+- количество повторений - распределение Пуассона вокруг 8 (не меньше 1).
+
+Файлы пишутся потоково пачками, поэтому журнал из 10 миллионов записей не собирается в памяти целиком.
+"""
+
+import csv
+import json
+from datetime import date
+
+import numpy as np
+
+from journal.csv_io import CSV_HEADER
+from journal.records import date_to_minutes, format_datetime, format_weight
+
+START_DATE = date(2010, 1, 1)  # Дата первой тренировки
+MAX_DAYS = 15 * 365  # Наибольшая длительность журнала, дней
+CHUNK_SIZE = 100000  # Количество записей в пачке при записи файла
+EXERCISES = (
+    "Жим лежа", "Присед", "Становая тяга", "Подтягивания", "Отжимания", "Жим стоя", "Тяга штанги в наклоне",
+    "Выпады", "Жим ногами", "Сгибания на бицепс", "Французский жим", "Разведения гантелей", "Тяга верхнего блока",
+    "Подъемы на носки", "Гиперэкстензия", "Скручивания", "Отжимания на брусьях", "Румынская тяга",
+    "Жим гантелей", "Шраги",
+)
+# Рабочий вес каждого упражнения в начале журнала, кг
+BASE_WEIGHTS = (60, 80, 100, 10, 5, 40, 50, 30, 120, 15, 25, 10, 45, 70, 10, 5, 10, 70, 25, 60)
+
+
+def generate_columns(count, seed=0):
+    """
+    Генерирует журнал из count записей в виде столбцов NumPy в порядке времени:
+    время (минуты от начала эпохи), номер упражнения в EXERCISES, вес, повторения.
+    """
+    rng = np.random.default_rng(seed)
+    # Разбиение подходов на тренировки и время каждого подхода
+    session_sizes = rng.integers(3, 26, size=count // 3 + 1)
+    session_of = np.repeat(np.arange(len(session_sizes)), session_sizes)[:count]
+    sessions = int(session_of[-1]) + 1 if count else 0
+    session_days = np.cumsum(rng.integers(1, 4, size=sessions))
+    # Большие журналы сжимаются в MAX_DAYS дней: тренировки идут чаще, как в журнале нескольких спортсменов
+    scale = min(1.0, MAX_DAYS / session_days[-1]) if sessions else 1.0
+    session_starts = (date_to_minutes(START_DATE) + (session_days * scale * 1440).astype(np.int64)
+                      + rng.integers(6 * 60, 21 * 60, size=sessions))
+    elapsed = np.cumsum(rng.integers(2, 6, size=count))
+    minutes = np.sort(session_starts[session_of] + elapsed - elapsed[np.searchsorted(session_of, session_of)])
+
+    # Упражнения по закону Ципфа
+    ranks = np.arange(1, len(EXERCISES) + 1)
+    exercise = rng.choice(len(EXERCISES), size=count, p=(1 / ranks) / (1 / ranks).sum()).astype(np.int32)
+
+    # Вес растет примерно на 20% за 1000 тренировок, разброс 10%
+    progress = 1 + 0.2 * session_of / 1000
+    weight = np.asarray(BASE_WEIGHTS, dtype=np.float64)[exercise] * progress * rng.normal(1, 0.1, size=count)
+    weight = np.clip(np.round(weight * 2) / 2, 0.5, 200)
+    repetitions = np.maximum(rng.poisson(8, size=count), 1).astype(np.int32)
+    return minutes, exercise, weight, repetitions
+
+
+def _chunks(columns, count):
+    minutes, exercise, weight, repetitions = columns
+    for start in range(0, count, CHUNK_SIZE):
+        end = min(start + CHUNK_SIZE, count)
+        yield start, zip(minutes[start:end].tolist(), exercise[start:end].tolist(),
+                         weight[start:end].tolist(), repetitions[start:end].tolist())
+
+
+def write_journal(path, count, seed=0):
+    """
+    Записывает синтетический журнал из count записей в файл журнала JSON (с номерами записей).
+    """
+    columns = generate_columns(count, seed)
+    with open(path, 'w') as file:
+        file.write('[')
+        for start, rows in _chunks(columns, count):
+            entries = [json.dumps({'id': start + number + 1, 'datetime': format_datetime(minutes),
+                                   'exercise': EXERCISES[code], 'weight': format_weight(weight),
+                                   'repetitions': str(repetitions)})
+                       for number, (minutes, code, weight, repetitions) in enumerate(rows)]
+            file.write(('\n' if start == 0 else ',\n') + ',\n'.join(entries))
+        file.write('\n]\n')
+
+
+def write_csv(path, count, seed=0):
+    """
+    Записывает синтетический журнал из count записей в файл CSV в формате экспорта приложения.
+    """
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(CSV_HEADER)
+        for start, rows in _chunks(generate_columns(count, seed), count):
+            writer.writerows((format_datetime(minutes), EXERCISES[code], format_weight(weight), repetitions)
+                             for minutes, code, weight, repetitions in rows)
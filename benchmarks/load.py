@@ -0,0 +1,260 @@
+"""
+Нагрузочный тест локального сервера журнала (journal/server.py) на синтетическом журнале.
+
+Запуск: python -m benchmarks.load [--size 100k] [--clients 16] [--duration 10] [--write-ratio 0.05]
+                                  [--chart-ratio 0.01] [--output ФАЙЛ]
+
+Сервер запускается отдельным процессом (python -m journal serve --port 0) на копии синтетического журнала
+(benchmarks/generator.py, кэшируется в benchmarks/data), чтобы клиенты и сервер не делили один GIL.
+clients клиентов asyncio держат по одному постоянному соединению (keep-alive) и отправляют запросы
+без пауз в течение duration секунд (после разогрева --warmup секунд, который в статистику не входит).
+Смесь запросов:
+- add: POST /records (доля write-ratio);
+- charts: GET /charts/weight.png (доля chart-ratio);
+- records, stats и exercises: GET /records?limit=100, GET /stats, GET /exercises (остальные запросы
+в пропорции 45/45/10).
+Фильтр - случайное окно в 30 дней внутри журнала, в половине запросов - с подстрокой названия упражнения.
+
+Результат - количество запросов в секунду и процентили времени ответа (p50, p95, p99, максимум) по каждому
+виду запросов и в целом; с параметром --output результаты записываются в JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from urllib.parse import urlencode
+
+from benchmarks.run import SIZES, prepare_data, write_results
+
+CLIENTS = 16
+DURATION = 10.0  # Длительность замера, секунды
+WARMUP = 1.0  # Разогрев перед замером, секунды
+WRITE_RATIO = 0.05
+CHART_RATIO = 0.01
+WINDOW_DAYS = 30  # Длина окна дат в фильтре запросов
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Client:
+    """
+    Клиент HTTP/1.1 с одним постоянным соединением.
+    """
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, body=b''):
+        """
+        Отправляет запрос и возвращает (код ответа, тело).
+        """
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        head = f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Length: {len(body)}\r\n\r\n"
+        self.writer.write(head.encode('latin-1') + body)
+        await self.writer.drain()
+        status_line, *header_lines = (await self.reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+        headers = dict(line.lower().split(': ', 1) for line in header_lines if ': ' in line)
+        body = await self.reader.readexactly(int(headers.get('content-length', 0)))
+        if headers.get('connection') == 'close':
+            await self.close()
+        return int(status_line.split(' ')[1]), body
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+            self.writer = None
+
+
+class Workload:
+    """
+    Генератор случайных запросов по журналу: диапазон дат журнала и названия упражнений.
+    """
+    def __init__(self, first_day, last_day, exercises, write_ratio, chart_ratio, seed=0):
+        self.first_day = first_day
+        self.days = max(1, (last_day - first_day).days - WINDOW_DAYS)
+        self.exercises = exercises
+        self.random = random.Random(seed)
+        read_ratio = 1 - write_ratio - chart_ratio
+        self.operations = ('add', 'charts', 'records', 'stats', 'exercises')
+        self.weights = (write_ratio, chart_ratio, read_ratio * 0.45, read_ratio * 0.45, read_ratio * 0.1)
+
+    def query(self):
+        start = self.first_day + timedelta(days=self.random.randrange(self.days))
+        query = {'from': start.strftime('%d/%m/%Y'), 'to': (start + timedelta(days=WINDOW_DAYS)).strftime('%d/%m/%Y')}
+        if self.random.random() < 0.5:
+            query['exercise'] = self.random.choice(self.exercises)
+        return query
+
+    def next(self):
+        """
+        Следующий запрос: (вид запроса, метод, путь, тело).
+        """
+        operation = self.random.choices(self.operations, self.weights)[0]
+        if operation == 'add':
+            day = self.first_day + timedelta(days=self.random.randrange(self.days))
+            record = {'datetime': f"{day:%d/%m/%Y} {self.random.randrange(6, 22):02}:{self.random.randrange(60):02}",
+                      'exercise': self.random.choice(self.exercises),
+                      'weight': str(self.random.randrange(10, 150)), 'repetitions': str(self.random.randrange(1, 15))}
+            return operation, 'POST', '/records', json.dumps(record).encode('utf-8')
+        if operation == 'charts':
+            return operation, 'GET', '/charts/weight.png?' + urlencode(self.query()), b''
+        if operation == 'records':
+            return operation, 'GET', '/records?' + urlencode(dict(self.query(), limit=100)), b''
+        if operation == 'stats':
+            return operation, 'GET', '/stats?' + urlencode(self.query()), b''
+        return operation, 'GET', '/exercises', b''
+
+
+def start_server(journal_path, directory):
+    """
+    Запускает сервер журнала отдельным процессом и возвращает (процесс, порт).
+    """
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPOSITORY, os.environ.get('PYTHONPATH')])))
+    process = subprocess.Popen([sys.executable, '-m', 'journal', '--journal', journal_path, 'serve', '--port', '0'],
+                               cwd=directory, env=environment, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    match = re.search(r':(\d+)/', line)
+    if match is None:
+        process.kill()
+        raise RuntimeError(f"Сервер не запустился: {line.strip()}")
+    return process, int(match.group(1))
+
+
+async def describe_journal(host, port):
+    """
+    Диапазон дат и названия упражнений журнала на сервере.
+    """
+    client = Client(host, port)
+    try:
+        total = json.loads((await client.request('GET', '/records?limit=1'))[1])
+        first = total['records'][0]
+        last = json.loads((await client.request('GET', f"/records?offset={total['total'] - 1}"))[1])['records'][0]
+        exercises = json.loads((await client.request('GET', '/exercises'))[1])
+    finally:
+        await client.close()
+    parse = lambda record: date(*map(int, reversed(record['datetime'].split(' ')[0].split('/'))))  # noqa: E731
+    return parse(first), parse(last), exercises
+
+
+async def run_clients(host, port, workload, clients, duration, warmup):
+    """
+    Выполняет нагрузку и возвращает замеры {вид запроса: [время ответа, секунды]}, ошибки и длительность замера.
+    """
+    latencies = {}
+    errors = {}
+    started = time.perf_counter() + warmup
+    finished = started + duration
+
+    async def client_loop():
+        client = Client(host, port)
+        try:
+            while True:
+                operation, method, path, body = workload.next()
+                sent = time.perf_counter()
+                if sent >= finished:
+                    break
+                status, _ = await client.request(method, path, body)
+                received = time.perf_counter()
+                if sent < started:
+                    continue  # Разогрев
+                if status >= 400 and not (operation == 'charts' and status == 404):
+                    errors[operation] = errors.get(operation, 0) + 1
+                latencies.setdefault(operation, []).append(received - sent)
+        finally:
+            await client.close()
+
+    await asyncio.gather(*(client_loop() for _ in range(clients)))
+    return latencies, errors, duration
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def summarize(latencies, errors, duration):
+    """
+    Сводка по видам запросов и в целом: запросы, запросы в секунду, процентили в миллисекундах.
+    """
+    summary = {}
+    every = []
+    for operation, values in sorted(latencies.items()) + [('total', every)]:
+        values = sorted(values)
+        if operation != 'total':
+            every.extend(values)
+        if not values:
+            continue
+        summary[operation] = {
+            'requests': len(values),
+            'errors': errors.get(operation, 0) if operation != 'total' else sum(errors.values()),
+            'rps': len(values) / duration,
+            'p50_ms': percentile(values, 0.5) * 1000,
+            'p95_ms': percentile(values, 0.95) * 1000,
+            'p99_ms': percentile(values, 0.99) * 1000,
+            'max_ms': values[-1] * 1000,
+        }
+    return summary
+
+
+def format_summary(summary):
+    lines = [f"  {'запрос':<10} {'запросов':>9} {'ошибок':>7} {'запр/с':>9} {'p50, мс':>9} {'p95, мс':>9} "
+             f"{'p99, мс':>9} {'макс, мс':>9}"]
+    for operation, result in summary.items():
+        lines.append(f"  {operation:<10} {result['requests']:>9} {result['errors']:>7} {result['rps']:>9.1f} "
+                     f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+                     f"{result['max_ms']:>9.2f}")
+    return lines
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.load', description="Нагрузочный тест сервера журнала")
+    parser.add_argument('--size', choices=SIZES, default='100k', help="размер синтетического журнала")
+    parser.add_argument('--seed', type=int, default=0, help="зерно генератора журнала и запросов")
+    parser.add_argument('--clients', type=int, default=CLIENTS, help="количество одновременных клиентов")
+    parser.add_argument('--duration', type=float, default=DURATION, help="длительность замера, секунды")
+    parser.add_argument('--warmup', type=float, default=WARMUP, help="разогрев, секунды")
+    parser.add_argument('--write-ratio', type=float, default=WRITE_RATIO, help="доля запросов на добавление")
+    parser.add_argument('--chart-ratio', type=float, default=CHART_RATIO, help="доля запросов графиков")
+    parser.add_argument('--output', help="файл результатов JSON")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    source, _ = prepare_data(SIZES[args.size], args.seed)
+    directory = tempfile.mkdtemp(prefix='journal-load-')
+    journal_path = os.path.join(directory, 'journal.json')
+    shutil.copyfile(source, journal_path)
+    process, port = start_server(journal_path, directory)
+    try:
+        first_day, last_day, exercises = asyncio.run(describe_journal('127.0.0.1', port))
+        workload = Workload(first_day, last_day, exercises, args.write_ratio, args.chart_ratio, args.seed)
+        print(f"Журнал {args.size}, клиентов: {args.clients}, замер {args.duration:g} с...")
+        summary = summarize(*asyncio.run(run_clients('127.0.0.1', port, workload, args.clients, args.duration,
+                                                     args.warmup)))
+    finally:
+        process.terminate()
+        process.wait()
+        shutil.rmtree(directory, ignore_errors=True)
+    print("\n".join(format_summary(summary)))
+    if args.output:
+        meta = {'size': args.size, 'seed': args.seed, 'clients': args.clients, 'duration': args.duration,
+                'write_ratio': args.write_ratio, 'chart_ratio': args.chart_ratio}
+        write_results(args.output, meta, summary)
+        print(f"Результаты записаны в файл: {args.output}")
+    return 1 if summary.get('total', {}).get('errors') else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
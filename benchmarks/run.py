@@ -0,0 +1,335 @@
+"""
+Замеры производительности операций журнала тренировок без графического интерфейса.
+
+Запуск: python -m benchmarks [--sizes 10k 100k 1m 10m] [--storage json sqlite] [--repeat 3] [--no-memory]
+                             [--baseline ФАЙЛ] [--save-baseline] [--threshold 0.25]
+
+Для каждого размера журнала (синтетический журнал из benchmarks/generator.py, кэшируется в benchmarks/data)
+и каждого хранилища замеряются операции JournalEngine, на которых держится приложение:
+- load: загрузка журнала (для JSON - разбор файла, без столбцового файла);
+- load_column_file: загрузка журнала JSON из актуального столбцового файла;
+- add: добавление одной записи с сохранением;
+- select: выборка записей по фильтру (половина диапазона дат и подстрока названия упражнения);
+- statistics: статистика по тому же фильтру;
+- export_csv: экспорт всего журнала в CSV;
+- import_csv: импорт CSV того же размера в пустой журнал;
+- chart_series: ряды графиков за весь журнал;
+- chart_render: построение графиков за весь журнал (без кэша).
+
+Время операции - медиана по repeat повторам (perf_counter). Пиковая память (tracemalloc) замеряется
+в отдельном, дополнительном прогоне: трассировка выделений памяти сильно замедляет код и исказила бы время.
+
+Результаты записываются в JSON (--output) с ключами "хранилище/размер/операция". Если задан файл базовых
+результатов (--baseline, по умолчанию benchmarks/baseline.json), результаты сравниваются с ним: операция
+считается регрессией, если она медленнее (или требует больше памяти) на долю больше threshold. При регрессиях
+код возврата - 1. С параметром --save-baseline результаты сохраняются как новые базовые.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.generator import write_csv, write_journal
+from journal.charts import ChartService
+from journal.engine import JournalEngine, make_filter
+
+SIZES = {'10k': 10000, '100k': 100000, '1m': 1000000, '10m': 10000000}
+STORAGES = {'json': '.json', 'sqlite': '.db'}
+BENCHMARK_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+DATA_DIRECTORY = os.path.join(BENCHMARK_DIRECTORY, 'data')  # Кэш сгенерированных журналов
+BASELINE = os.path.join(BENCHMARK_DIRECTORY, 'baseline.json')
+RESULTS = os.path.join(BENCHMARK_DIRECTORY, 'results.json')
+REPEAT = 3
+THRESHOLD = 0.25  # Допустимое замедление (доля), больше - регрессия
+MIN_SECONDS = 0.001  # Разница во времени меньше этой считается шумом
+MIN_BYTES = 1024 * 1024  # Разница в памяти меньше этой считается шумом
+
+
+class Measurement:
+    """
+    Замер одного выполнения операции: время и пиковая память (если включена трассировка tracemalloc).
+    Операция замеряется в блоке with, подготовка вне блока в замер не входит.
+    """
+    def __init__(self):
+        self.seconds = None
+        self.peak_bytes = None
+        self._started = None
+        self._memory_before = 0
+
+    def __enter__(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            self._memory_before = tracemalloc.get_traced_memory()[0]
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.seconds = time.perf_counter() - self._started
+        if tracemalloc.is_tracing():
+            self.peak_bytes = tracemalloc.get_traced_memory()[1] - self._memory_before
+        return False
+
+
+class Workspace:
+    """
+    Рабочая папка замеров одного размера журнала: копия журнала, загруженный журнал, файл CSV и фильтр.
+    """
+    def __init__(self, source, csv_path, suffix):
+        self.directory = tempfile.mkdtemp(prefix='journal-benchmark-')
+        self.source = source  # Сгенерированный журнал JSON
+        self.csv_path = csv_path
+        self.suffix = suffix
+        self.path = self.fresh_path()
+        self.engine = JournalEngine(self.path, migrate_from=source, chart_directory=self.file('images'))
+        self.engine.load()
+        if self.engine.store.needs_maintenance():
+            self.engine.store.maintain()
+        series = self.engine.store.series(*make_filter())
+        first, last = (int(value) for value in series[0][[0, -1]].astype(np.int64))
+        quarter = (last - first) // 4
+        self.full_filter = (first, last, '')
+        self.filter = (first + quarter, last - quarter, 'жим')
+
+    def file(self, name):
+        return os.path.join(self.directory, name)
+
+    def fresh_path(self):
+        """
+        Путь к новой копии журнала: JSON копируется, база SQLite создается переносом из JSON при загрузке.
+        """
+        path = tempfile.mktemp(suffix=self.suffix, dir=self.directory)
+        if self.suffix == '.json':
+            shutil.copyfile(self.source, path)
+        return path
+
+    def close(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def bench_load(workspace, measurement):
+    engine = JournalEngine(workspace.path, migrate_from=workspace.source)
+    if workspace.suffix == '.json':
+        engine.store.column_path = None  # Только разбор JSON
+    with measurement:
+        engine.load()
+
+
+def bench_load_column_file(workspace, measurement):
+    if workspace.suffix != '.json':
+        return False
+    engine = JournalEngine(workspace.path)
+    with measurement:
+        engine.load()
+
+
+def bench_add(workspace, measurement):
+    with measurement:
+        workspace.engine.add('01/01/2030 10:00', 'Присед', '100', '5')
+        workspace.engine.save()
+
+
+def bench_select(workspace, measurement):
+    with measurement:
+        workspace.engine.select(workspace.filter)
+
+
+def bench_statistics(workspace, measurement):
+    with measurement:
+        workspace.engine.statistics(workspace.filter)
+
+
+def bench_export_csv(workspace, measurement):
+    with measurement:
+        workspace.engine.export_csv(workspace.file('export.csv'))
+
+
+def bench_import_csv(workspace, measurement):
+    engine = JournalEngine(tempfile.mktemp(suffix=workspace.suffix, dir=workspace.directory))
+    engine.load(create=True)
+    with measurement:
+        engine.import_csv(workspace.csv_path)
+        engine.save()
+
+
+def bench_chart_series(workspace, measurement):
+    with measurement:
+        workspace.engine.store.series(*workspace.full_filter)
+
+
+def bench_chart_render(workspace, measurement):
+    charts = ChartService(workspace.engine.store, workspace.file('images'))
+    importlib.import_module('matplotlib.figure')  # Импорт matplotlib не входит в замер
+    with measurement:
+        charts.render(*workspace.full_filter)
+
+
+BENCHMARKS = {
+    'load': bench_load,
+    'load_column_file': bench_load_column_file,
+    'add': bench_add,
+    'select': bench_select,
+    'statistics': bench_statistics,
+    'export_csv': bench_export_csv,
+    'import_csv': bench_import_csv,
+    'chart_series': bench_chart_series,
+    'chart_render': bench_chart_render,
+}
+
+
+def prepare_data(count, seed):
+    """
+    Возвращает пути к синтетическому журналу JSON и файлу CSV из count записей (создает их при первом запросе).
+    """
+    os.makedirs(DATA_DIRECTORY, exist_ok=True)
+    journal_path = os.path.join(DATA_DIRECTORY, f'journal_{count}_{seed}.json')
+    csv_path = os.path.join(DATA_DIRECTORY, f'journal_{count}_{seed}.csv')
+    if not os.path.exists(journal_path):
+        write_journal(journal_path + '.part', count, seed)
+        os.replace(journal_path + '.part', journal_path)
+    if not os.path.exists(csv_path):
+        write_csv(csv_path + '.part', count, seed + 1)
+        os.replace(csv_path + '.part', csv_path)
+    return journal_path, csv_path
+
+
+def run_benchmark(benchmark, workspace, repeat, memory):
+    """
+    Выполняет операцию repeat раз (и еще раз под tracemalloc, если memory). Возвращает результат
+    или None, если операция не применима к хранилищу.
+    """
+    times = []
+    for _ in range(repeat):
+        measurement = Measurement()
+        if benchmark(workspace, measurement) is False:
+            return None
+        times.append(measurement.seconds)
+    result = {'seconds': statistics.median(times), 'min_seconds': min(times)}
+    if memory:
+        measurement = Measurement()
+        tracemalloc.start()
+        try:
+            benchmark(workspace, measurement)
+        finally:
+            tracemalloc.stop()
+        result['peak_bytes'] = measurement.peak_bytes
+    return result
+
+
+def run(sizes, storages, operations, seed=0, repeat=REPEAT, memory=True, log=print):
+    """
+    Выполняет замеры и возвращает результаты {"хранилище/размер/операция": результат}.
+    """
+    results = {}
+    for size in sizes:
+        log(f"Журнал {size}: подготовка данных...")
+        source, csv_path = prepare_data(SIZES[size], seed)
+        for storage in storages:
+            workspace = Workspace(source, csv_path, STORAGES[storage])
+            try:
+                for operation in operations:
+                    result = run_benchmark(BENCHMARKS[operation], workspace, repeat, memory)
+                    if result is None:
+                        continue
+                    key = f'{storage}/{size}/{operation}'
+                    results[key] = result
+                    log(format_result(key, result))
+            finally:
+                workspace.close()
+    return results
+
+
+def format_result(key, result):
+    text = f"  {key:<32} {result['seconds'] * 1000:10.2f} мс"
+    if result.get('peak_bytes') is not None:
+        text += f" {result['peak_bytes'] / 1024 / 1024:10.2f} МБ"
+    return text
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """
+    Сравнивает результаты с базовыми. Возвращает список регрессий (ключ, показатель, базовое, текущее).
+    """
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if (result['seconds'] > base['seconds'] * (1 + threshold)
+                and result['seconds'] - base['seconds'] > MIN_SECONDS):
+            regressions.append((key, 'seconds', base['seconds'], result['seconds']))
+        peak, base_peak = result.get('peak_bytes'), base.get('peak_bytes')
+        if (peak is not None and base_peak is not None and peak > base_peak * (1 + threshold)
+                and peak - base_peak > MIN_BYTES):
+            regressions.append((key, 'peak_bytes', base_peak, peak))
+    return regressions
+
+
+def metadata(args):
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'seed': args.seed,
+        'repeat': args.repeat,
+    }
+
+
+def write_results(path, meta, results):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump({'meta': meta, 'results': results}, file, ensure_ascii=False, indent=4)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description="Замеры производительности журнала")
+    parser.add_argument('--sizes', nargs='+', choices=SIZES, default=['10k', '100k'], help="размеры журналов")
+    parser.add_argument('--storage', nargs='+', choices=STORAGES, default=['json'], help="хранилища")
+    parser.add_argument('--operations', nargs='+', choices=BENCHMARKS, default=list(BENCHMARKS),
+                        help="операции")
+    parser.add_argument('--seed', type=int, default=0, help="зерно генератора журналов")
+    parser.add_argument('--repeat', type=int, default=REPEAT, help="количество повторов каждой операции")
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help="не замерять пиковую память")
+    parser.add_argument('--output', default=RESULTS, help="файл результатов JSON")
+    parser.add_argument('--baseline', default=BASELINE, help="файл базовых результатов для сравнения")
+    parser.add_argument('--save-baseline', action='store_true', help="сохранить результаты как базовые")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, help="допустимое замедление (доля)")
+    return parser
+
+
+def main(argv=None):
+    """
+    Выполняет замеры по параметрам командной строки. Возвращает 1, если найдены регрессии.
+    """
+    args = build_parser().parse_args(argv)
+    meta = metadata(args)
+    results = run(args.sizes, args.storage, args.operations, args.seed, args.repeat, args.memory)
+    write_results(args.output, meta, results)
+    print(f"Результаты записаны в файл: {args.output}")
+
+    if args.save_baseline:
+        write_results(args.baseline, meta, results)
+        print(f"Базовые результаты записаны в файл: {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline, encoding='utf-8') as file:
+        baseline = json.load(file)['results']
+    regressions = compare(results, baseline, args.threshold)
+    for key, metric, base, current in regressions:
+        print(f"Регрессия {key} ({metric}): {base:.6g} -> {current:.6g} ({current / base:.2f}x)", file=sys.stderr)
+    if regressions:
+        return 1
+    print(f"Регрессий нет (сравнение с {args.baseline}, порог {args.threshold:.0%})")
+    return 0
@@ -0,0 +1,32 @@
+"""
+Пакет journal: работа с журналом тренировок без графического интерфейса.
+
+Модули пакета:
+- engine: операции с журналом (добавление, фильтрация, статистика, импорт, экспорт, графики) без интерфейса;
+- cli: командная строка журнала (python -m journal);
+- storage: общий интерфейс хранилищ Storage и выбор хранилища по расширению файла (open_storage);
+- store: хранилище журнала в памяти. Файл читается один раз и перечитывается только
+если он изменился на диске (по времени изменения и размеру);
+- sqlite_store: хранилище журнала в базе данных SQLite с индексами по времени и по упражнению;
+- column_file: двоичный столбцовый снимок журнала, открываемый через mmap, для быстрого запуска;
+- records: компактное представление записи журнала (Record) и преобразования дат;
+- index: индекс записей по дате для выборки диапазона дат двоичным поиском и словарь упражнений;
+- stats: суммы по упражнениям и дням для быстрой статистики за диапазон дат;
+- analytics: журнал в виде столбцов NumPy для векторной фильтрации, статистики и графиков;
+- csv_io: потоковые импорт и экспорт записей в файлах CSV;
+- fingerprints: отпечатки записей для поиска повторов при импорте и добавлении;
+- progression: личные рекорды и расчетный разовый максимум (e1RM) по упражнениям с пересчетом по упражнению;
+- charts: построение графиков без графического интерфейса с кэшем изображений и прореживанием рядов;
+- instrumentation: замеры времени операций (скользящая гистограмма) и профилирование cProfile;
+- team: каталог журналов команды и статистика по всем журналам в пуле процессов с кэшем итогов;
+- server: локальный сервер HTTP/JSON на asyncio (python -m journal serve) с записью добавлений пачками;
+- autosave: отложенное сохранение изменений группой по таймеру для графического интерфейса;
+- tasks: планировщик фоновых задач для графического интерфейса (пул потоков и опрос через root.after).
+"""
+
+from journal.engine import JournalEngine
+from journal.sqlite_store import SqliteStore
+from journal.storage import Storage, open_storage
+from journal.store import JournalStore
+
+__all__ = ['JournalEngine', 'JournalStore', 'SqliteStore', 'Storage', 'open_storage']
@@ -0,0 +1,9 @@
+"""
+Запуск командной строки журнала тренировок: python -m journal КОМАНДА ...
+"""
+
+import sys
+
+from journal.cli import main
+
+sys.exit(main())
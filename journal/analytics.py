@@ -0,0 +1,165 @@
+"""
+Векторные вычисления по журналу тренировок на NumPy.
+
+ColumnarJournal хранит журнал в виде столбцов NumPy, упорядоченных по времени:
+- minutes (int64): время подхода в минутах от начала эпохи;
+- weight (float32): вес;
+- repetitions (int32): количество повторений;
+- exercise (int32): номер упражнения в списке names.
+
+Выборка диапазона дат - np.searchsorted по отсортированному столбцу времени, фильтр по упражнениям -
+булева маска, суммы по упражнениям - np.bincount, суммы по дням - np.add.reduceat. Ряды для графиков
+возвращаются срезами столбцов без циклов на Python.
+
+Функция sort_order и класс OrderedRecords используются таблицей записей для сортировки по столбцу в памяти:
+порядок строк вычисляется np.argsort, а записи в новом порядке выдаются по индексу без копирования списка.
+
+NumPy устанавливается вместе с matplotlib, поэтому отдельной зависимостью не является.
+"""
+
+import numpy as np
+
+from journal.records import MINUTES_PER_DAY
+
+
+class ColumnarJournal:
+    """
+    Журнал тренировок в виде столбцов NumPy.
+    """
+    def __init__(self, minutes, weight, repetitions, exercise, names):
+        self.minutes = minutes
+        self.weight = weight
+        self.repetitions = repetitions
+        self.exercise = exercise
+        self.names = names
+        self._codes = {name: code for code, name in enumerate(names)}
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Строит столбцы по записям (Record), упорядоченным по времени.
+        """
+        names = sorted({record.exercise for record in records})
+        codes = {name: code for code, name in enumerate(names)}
+        count = len(records)
+        return cls(
+            np.fromiter((record.minutes for record in records), dtype=np.int64, count=count),
+            np.fromiter((record.weight for record in records), dtype=np.float32, count=count),
+            np.fromiter((record.repetitions for record in records), dtype=np.int32, count=count),
+            np.fromiter((codes[record.exercise] for record in records), dtype=np.int32, count=count),
+            names
+        )
+
+    def __len__(self):
+        return len(self.minutes)
+
+    def codes(self, names):
+        """
+        Номера указанных упражнений (неизвестные названия пропускаются).
+        """
+        return np.array([self._codes[name] for name in names if name in self._codes], dtype=np.int32)
+
+    def select(self, start_minutes, end_minutes, names=None):
+        """
+        Возвращает индексы строк за диапазон [start_minutes, end_minutes] по упражнениям names
+        (по всем упражнениям, если names равен None): срез slice, если фильтра по упражнениям нет,
+        иначе массив индексов.
+        """
+        low = np.searchsorted(self.minutes, start_minutes, side='left')
+        high = np.searchsorted(self.minutes, end_minutes, side='right')
+        if names is None:
+            return slice(low, high)
+        mask = np.isin(self.exercise[low:high], self.codes(names))
+        return np.flatnonzero(mask) + low
+
+    def statistics(self, start_minutes, end_minutes, names=None):
+        """
+        Статистика за диапазон в том же виде, что и StatsEngine.query: суммарный объем, суммарное
+        количество повторений и словарь {упражнение: {'weight', 'repetitions', 'count'}}.
+        """
+        rows = self.select(start_minutes, end_minutes, names)
+        exercise = self.exercise[rows]
+        repetitions = self.repetitions[rows].astype(np.int64)
+        volume = self.weight[rows].astype(np.float64) * repetitions
+        size = len(self.names)
+        volume_by_exercise = np.bincount(exercise, weights=volume, minlength=size)
+        repetitions_by_exercise = np.bincount(exercise, weights=repetitions, minlength=size)
+        count_by_exercise = np.bincount(exercise, minlength=size)
+        exercises_stats = {
+            self.names[code]: {
+                'weight': float(volume_by_exercise[code]),
+                'repetitions': int(repetitions_by_exercise[code]),
+                'count': int(count_by_exercise[code])
+            }
+            for code in np.flatnonzero(count_by_exercise)
+        }
+        return float(volume.sum()), int(repetitions.sum()), exercises_stats
+
+    def daily(self, start_minutes, end_minutes, names=None):
+        """
+        Суммы по дням за диапазон: массивы дней (datetime64[D]), объема, повторений и количества подходов.
+        Строки упорядочены по времени, поэтому границы дней находятся без сортировки.
+        """
+        rows = self.select(start_minutes, end_minutes, names)
+        days = self.minutes[rows] // MINUTES_PER_DAY
+        if not len(days):
+            empty = np.array([], dtype=np.float64)
+            return np.array([], dtype='datetime64[D]'), empty, empty.astype(np.int64), empty.astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+        repetitions = self.repetitions[rows].astype(np.int64)
+        volume = self.weight[rows].astype(np.float64) * repetitions
+        return (
+            days[starts].astype('datetime64[D]'),
+            np.add.reduceat(volume, starts),
+            np.add.reduceat(repetitions, starts),
+            np.diff(np.r_[starts, len(days)])
+        )
+
+    def series(self, start_minutes, end_minutes, names=None):
+        """
+        Ряды для графиков за диапазон: время (datetime64[m]), вес и количество повторений.
+        """
+        rows = self.select(start_minutes, end_minutes, names)
+        return (
+            self.minutes[rows].astype('datetime64[m]'),
+            self.weight[rows],
+            self.repetitions[rows]
+        )
+
+
+SORT_ATTRIBUTES = ('minutes', 'exercise', 'weight', 'repetitions')  # Поля записи, по которым можно сортировать
+
+
+def sort_order(records, attribute, columns=None):
+    """
+    Возвращает порядок строк (массив индексов), сортирующий записи по полю attribute по возрастанию.
+    Сортировка устойчивая. Если передан columns - ColumnarJournal, построенный по тем же записям
+    в том же порядке, ключи берутся из его столбцов без обхода записей.
+    """
+    if attribute not in SORT_ATTRIBUTES:
+        raise ValueError(f"Сортировка по полю {attribute} не поддерживается")
+    if columns is not None and len(columns) == len(records):
+        keys = getattr(columns, attribute)  # Номера упражнений идут в алфавитном порядке названий
+    elif attribute == 'exercise':
+        names = sorted({record.exercise for record in records})
+        codes = {name: code for code, name in enumerate(names)}
+        keys = np.fromiter((codes[record.exercise] for record in records), dtype=np.int32, count=len(records))
+    else:
+        dtype = np.float64 if attribute == 'weight' else np.int64
+        keys = np.fromiter((getattr(record, attribute) for record in records), dtype=dtype, count=len(records))
+    return np.argsort(keys, kind='stable')
+
+
+class OrderedRecords:
+    """
+    Записи в заданном порядке: i-я запись - records[order[i]]. Список записей не копируется.
+    """
+    def __init__(self, records, order):
+        self.records = records
+        self.order = order
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, index):
+        return self.records[int(self.order[index])]
@@ -0,0 +1,87 @@
+"""
+Отложенное сохранение журнала для графического интерфейса (write-behind).
+
+Раньше каждое добавление, изменение, удаление и импорт сразу сохраняли журнал, поэтому при записи тренировки
+по подходам каждый подход означал отдельную запись на диск. Теперь изменения остаются в памяти хранилища
+(режим write_behind, journal/store.py), а Autosave сохраняет их группой:
+- по таймеру: через delay мс после последнего изменения (каждое новое изменение откладывает сохранение,
+поэтому серия быстрых добавлений сохраняется одной записью), но не позже max_delay мс после первого
+несохраненного изменения;
+- по запросу пользователя (flush);
+- при закрытии приложения (flush).
+Если сохранение не удалось, изменения остаются отмеченными и сохранение повторяется через retry_delay мс.
+
+Таймер работает через root.after, поэтому сохранение запускается в главном потоке; сама запись может
+выполняться в фоновой задаче (это решает функция save).
+"""
+
+import time
+
+AUTOSAVE_DELAY = 2000  # Пауза после последнего изменения до сохранения, мс
+AUTOSAVE_MAX_DELAY = 30000  # Наибольшая задержка сохранения первого несохраненного изменения, мс
+AUTOSAVE_RETRY_DELAY = 10000  # Пауза перед повторным сохранением после ошибки, мс
+
+
+class Autosave:
+    """
+    Сохранение изменений с задержкой: save() вызывается один раз на группу изменений.
+    """
+    def __init__(self, root, save, delay=AUTOSAVE_DELAY, max_delay=AUTOSAVE_MAX_DELAY,
+                 retry_delay=AUTOSAVE_RETRY_DELAY):
+        self.root = root
+        self.save = save
+        self.delay = delay
+        self.max_delay = max_delay
+        self.retry_delay = retry_delay
+        self.changes = 0  # Количество изменений с последнего сохранения
+        self._first_change = None  # Время первого несохраненного изменения (time.monotonic)
+        self._timer = None
+
+    def mark(self, count=1):
+        """
+        Отмечает count изменений и (пере)запускает таймер сохранения.
+        """
+        self.changes += count
+        now = time.monotonic()
+        if self._first_change is None:
+            self._first_change = now
+        waited = (now - self._first_change) * 1000
+        self._cancel_timer()
+        self._timer = self.root.after(max(0, int(min(self.delay, self.max_delay - waited))), self.flush)
+
+    def flush(self):
+        """
+        Сохраняет изменения сейчас (по таймеру или по запросу пользователя).
+        """
+        self._cancel_timer()
+        changes = self.changes
+        self.changes = 0
+        self._first_change = None
+        try:
+            self.save()
+        except BaseException:
+            self.retry(changes)  # Изменения не сохранены: они войдут в повторное сохранение
+            raise
+
+    def retry(self, count=0):
+        """
+        Сохранение не удалось (в том числе в фоновой задаче): count изменений снова отмечаются,
+        а сохранение повторяется по таймеру через retry_delay мс. Пауза больше обычной, чтобы не повторять
+        ошибку (например, нехватку места на диске) каждые несколько секунд.
+        """
+        self.changes += count
+        if self._first_change is None:
+            self._first_change = time.monotonic()
+        self._cancel_timer()
+        self._timer = self.root.after(self.retry_delay, self.flush)
+
+    def cancel(self):
+        """
+        Останавливает таймер (изменения остаются отмеченными).
+        """
+        self._cancel_timer()
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self.root.after_cancel(self._timer)
+            self._timer = None
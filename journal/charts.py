@@ -0,0 +1,167 @@
+"""
+Построение графиков журнала тренировок без графического интерфейса.
+
+ChartService рисует графики веса и повторений средствами Agg (растровый вывод matplotlib без Tk),
+поэтому может работать в фоновом потоке. Готовые изображения PNG хранятся в кэше с ключом
+(начало диапазона, конец диапазона, фильтр по упражнению, версия журнала): повторный запрос тех же
+графиков, пока журнал не менялся, не перерисовывает их. Файлы графиков в папке images перезаписываются
+под постоянными именами (weight_chart.png, repetitions_chart.png), а не копятся с новым номером.
+
+На графике веса отмечаются личные рекорды: подходы, которые превысили все прежние расчетные разовые
+максимумы (e1RM) своего упражнения (journal/progression.py); последние MAX_ANNOTATIONS рекордов подписываются.
+
+Если точек больше, чем можно различить на графике (MAX_POINTS), ряд прореживается алгоритмом LTTB
+(Largest-Triangle-Three-Buckets): точки делятся на корзины, и из каждой выбирается точка, образующая
+наибольший треугольник с соседними корзинами. Форма графика (пики и провалы) сохраняется, а рисуются
+тысячи точек вместо миллиона.
+
+matplotlib импортируется только при первом построении графика: его импорт занимает сотни миллисекунд
+и не должен замедлять запуск приложения.
+"""
+
+import base64
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from journal.progression import estimate_1rm
+
+MAX_POINTS = 2000  # Наибольшее количество точек на графике, больше - прореживание LTTB
+CACHE_SIZE = 8  # Сколько наборов графиков хранится в кэше
+CHART_DIRECTORY = 'images'  # Папка для файлов графиков
+MAX_ANNOTATIONS = 5  # Сколько последних рекордов подписывается на графике веса
+
+
+def lttb(x, y, threshold):
+    """
+    Прореживание ряда алгоритмом Largest-Triangle-Three-Buckets. Возвращает индексы выбранных точек
+    (по возрастанию, первая и последняя точки всегда выбираются). x должен быть упорядочен.
+    """
+    count = len(x)
+    if threshold >= count or threshold < 3:
+        return np.arange(count)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # Внутренние точки 1..count-2 делятся на threshold-2 корзины
+    edges = np.linspace(1, count - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = count - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # Третья вершина треугольника - среднее следующей корзины (для последней корзины - последняя точка)
+        if bucket + 2 < len(edges):
+            next_start, next_end = edges[bucket + 1], edges[bucket + 2]
+        else:
+            next_start, next_end = count - 1, count
+        average_x = x[next_start:next_end].mean()
+        average_y = y[next_start:next_end].mean()
+        point_x, point_y = x[previous], y[previous]
+        areas = np.abs((point_x - average_x) * (y[start:end] - point_y)
+                       - (point_x - x[start:end]) * (average_y - point_y))
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+class Chart:
+    """
+    Готовый график: заголовок окна, путь к файлу и изображение PNG.
+    """
+    __slots__ = ('title', 'path', 'png')
+
+    def __init__(self, title, path, png):
+        self.title = title
+        self.path = path
+        self.png = png
+
+    def photo_data(self):
+        """
+        Изображение в виде строки base64 для tk.PhotoImage(data=...).
+        """
+        return base64.b64encode(self.png).decode('ascii')
+
+
+class ChartService:
+    """
+    Построение графиков журнала с кэшем готовых изображений.
+    """
+    def __init__(self, store, directory=CHART_DIRECTORY, max_points=MAX_POINTS, cache_size=CACHE_SIZE):
+        self.store = store
+        self.directory = directory
+        self.max_points = max_points
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # Ключ -> список Chart (или None, если данных нет)
+        self._saved_key = None  # Ключ графиков, которые сейчас записаны в файлы
+        self._lock = threading.Lock()
+
+    def render(self, start_minutes, end_minutes, exercise_filter=None):
+        """
+        Возвращает графики веса и повторений за диапазон времени (список Chart) или None,
+        если данных нет. Графики берутся из кэша, если журнал не менялся с прошлого построения.
+        Файлы графиков в папке directory перезаписываются.
+        """
+        key = (start_minutes, end_minutes, exercise_filter or '', self.store.version)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                charts = self._cache[key]
+            else:
+                charts = self._cache[key] = self._draw(start_minutes, end_minutes, exercise_filter)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            if charts is not None and self._saved_key != key:
+                self._save(charts)
+                self._saved_key = key
+        return charts
+
+    def _draw(self, start_minutes, end_minutes, exercise_filter):
+        dates, weights, repetitions = self.store.series(start_minutes, end_minutes, exercise_filter)
+        if not len(dates):
+            return None
+        records = self.store.record_history(start_minutes, end_minutes, exercise_filter)
+        return [
+            self._plot(dates, weights, "Изменение веса", "Вес (кг)", 'blue',
+                       "График веса", 'weight_chart.png', records),
+            self._plot(dates, repetitions, "Изменение повторений", "Повторения", 'green',
+                       "График повторений", 'repetitions_chart.png')
+        ]
+
+    def _plot(self, dates, values, title, ylabel, color, window_title, file_name, records=()):
+        """
+        Рисует один ряд (прореженный до max_points точек) и возвращает Chart с изображением PNG.
+        records - подходы-рекорды, которые отмечаются на графике (по весу подхода).
+        """
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        rows = lttb(dates.astype(np.int64), values, self.max_points)
+        figure = Figure(figsize=(8, 6), dpi=100)
+        FigureCanvasAgg(figure)
+        axes = figure.add_subplot(111)
+        axes.plot(dates[rows], values[rows], marker='o', label=ylabel, color=color)
+        if records:
+            record_dates = np.array([record.minutes for record in records], dtype=np.int64).astype('datetime64[m]')
+            axes.scatter(record_dates, [record.weight for record in records], marker='*', s=150, color='red',
+                         zorder=3, label="Рекорд e1RM")
+            for record, record_date in zip(records[-MAX_ANNOTATIONS:], record_dates[-MAX_ANNOTATIONS:]):
+                axes.annotate(f"{record.exercise}: e1RM {estimate_1rm(record.weight, record.repetitions):.1f}",
+                              (record_date, record.weight), textcoords='offset points', xytext=(0, 8),
+                              ha='center', fontsize=8)
+            axes.legend()
+        axes.set_title(title)
+        axes.set_ylabel(ylabel)
+        axes.grid()
+        buffer = io.BytesIO()
+        figure.savefig(buffer, format='png')
+        return Chart(window_title, os.path.join(self.directory, file_name), buffer.getvalue())
+
+    def _save(self, charts):
+        os.makedirs(self.directory, exist_ok=True)
+        for chart in charts:
+            with open(chart.path, 'wb') as file:
+                file.write(chart.png)
@@ -0,0 +1,232 @@
+"""
+Командная строка журнала тренировок (без графического интерфейса и дисплея).
+
+Запуск: python -m journal [--journal ФАЙЛ] КОМАНДА ...
+
+Команды:
+- add ДАТА_ВРЕМЯ УПРАЖНЕНИЕ ВЕС ПОВТОРЕНИЯ - добавить запись ("26/11/2024 07:11" "Отжимания" 110 4);
+если такая запись уже есть, выводится предупреждение, а с параметром --unique запись не добавляется;
+- list - вывести записи в формате CSV;
+- stats - вывести статистику и личные рекорды упражнений: лучший вес, объем, расчетный разовый максимум (e1RM)
+по формулам Эпли и Бжицки и лучшие подходы по диапазонам повторений (с параметром --json - в формате JSON);
+- export ФАЙЛ - экспортировать записи в CSV;
+- import ФАЙЛ - импортировать записи из CSV; записи, которые уже есть в журнале, пропускаются
+(с параметром --keep-duplicates импортируются все);
+- charts - построить графики веса и повторений в папке --directory;
+- team ПАПКА - статистика команды по всем журналам каталога: суммы по упражнениям, лидеры по объему
+и суммы по периодам --period day|week|month|year (с параметром --json - в формате JSON);
+- serve - локальный сервер HTTP/JSON (journal/server.py): журнал в памяти, запросы add, filter, stats и графики PNG
+на --host и --port (по умолчанию 127.0.0.1:8765), остановка - Ctrl+C.
+
+Команды list, stats, export, charts и team принимают фильтр: --from и --to (ДД/ММ/ГГГГ или ГГГГ-ММ-ДД)
+и --exercise (подстрока названия упражнения). Команда export без фильтра выгружает весь журнал.
+
+Параметр --migrate-from ФАЙЛ переносит записи журнала JSON в новую базу SQLite (--journal training_log.db)
+при ее создании; без него новая база создается пустой.
+
+Параметр --timestamps legacy|iso|epoch задает формат даты и времени в файле журнала JSON: для нового журнала
+сразу, для существующего - при следующей перезаписи снимка. По умолчанию сохраняется формат файла.
+
+С параметром --profile ПАПКА команда выполняется под cProfile, профиль сохраняется в файл .pstats в этой папке.
+
+Код возврата: 0 - успешно, 1 - ошибка (сообщение выводится в поток ошибок).
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import sys
+
+from journal.charts import CHART_DIRECTORY
+from journal.csv_io import CSV_HEADER
+from journal.engine import DEFAULT_JOURNAL, JournalEngine, make_filter, make_record, parse_date, statistics_lines
+from journal.instrumentation import instrumentation
+from journal.progression import progress_lines
+from journal.records import TIMESTAMP_FORMATS
+from journal.server import DEFAULT_HOST, DEFAULT_PORT, serve
+from journal.team import PERIODS, TeamStats, team_lines
+
+
+def build_parser():
+    """
+    Создает разбор параметров командной строки.
+    """
+    parser = argparse.ArgumentParser(prog='python -m journal', description="Журнал тренировок")
+    parser.add_argument('--journal', default=DEFAULT_JOURNAL,
+                        help=f"файл журнала (.json или .db/.sqlite/.sqlite3), по умолчанию {DEFAULT_JOURNAL}")
+    parser.add_argument('--migrate-from', metavar='ФАЙЛ',
+                        help="журнал JSON, записи которого однократно переносятся в новую базу SQLite")
+    parser.add_argument('--timestamps', choices=TIMESTAMP_FORMATS,
+                        help="формат даты и времени в файле JSON (для новых журналов и при перезаписи)")
+    parser.add_argument('--profile', metavar='ПАПКА', help="выполнить команду под cProfile и сохранить профиль")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record_filter = argparse.ArgumentParser(add_help=False)
+    record_filter.add_argument('--from', dest='start_date', type=parse_date, help="дата начала")
+    record_filter.add_argument('--to', dest='end_date', type=parse_date, help="дата окончания")
+    record_filter.add_argument('--exercise', default='', help="подстрока названия упражнения")
+
+    add = commands.add_parser('add', help="добавить запись")
+    add.add_argument('datetime', help="дата и время ДД/ММ/ГГГГ ЧЧ:ММ")
+    add.add_argument('exercise', help="упражнение")
+    add.add_argument('weight', help="вес, кг")
+    add.add_argument('repetitions', help="повторения")
+    add.add_argument('--unique', action='store_true', help="не добавлять, если такая запись уже есть")
+
+    commands.add_parser('list', parents=[record_filter], help="вывести записи")
+
+    stats = commands.add_parser('stats', parents=[record_filter], help="вывести статистику")
+    stats.add_argument('--json', action='store_true', help="вывести статистику в формате JSON")
+
+    export = commands.add_parser('export', parents=[record_filter], help="экспортировать записи в CSV")
+    export.add_argument('file', help="файл CSV")
+
+    import_ = commands.add_parser('import', help="импортировать записи из CSV")
+    import_.add_argument('file', help="файл CSV")
+    import_.add_argument('--keep-duplicates', action='store_true',
+                         help="импортировать и записи, которые уже есть в журнале")
+
+    charts = commands.add_parser('charts', parents=[record_filter], help="построить графики")
+    charts.add_argument('--directory', default=CHART_DIRECTORY, help="папка для файлов графиков")
+
+    team = commands.add_parser('team', parents=[record_filter], help="статистика команды по каталогу журналов")
+    team.add_argument('team_directory', metavar='ПАПКА', help="каталог журналов спортсменов")
+    team.add_argument('--period', choices=tuple(PERIODS), default='month', help="период сумм, по умолчанию month")
+    team.add_argument('--workers', type=int, help="количество процессов (по умолчанию - по числу процессоров)")
+    team.add_argument('--json', action='store_true', help="вывести статистику в формате JSON")
+
+    server = commands.add_parser('serve', help="запустить локальный сервер HTTP/JSON")
+    server.add_argument('--host', default=DEFAULT_HOST, help=f"адрес, по умолчанию {DEFAULT_HOST}")
+    server.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help=f"порт (0 - любой свободный), по умолчанию {DEFAULT_PORT}")
+    return parser
+
+
+def get_filter(args):
+    return make_filter(args.start_date, args.end_date, args.exercise)
+
+
+def has_filter(args):
+    return bool(args.start_date or args.end_date or args.exercise)
+
+
+def run_add(engine, args):
+    engine.load(create=True)
+    record = make_record(args.datetime, args.exercise, args.weight, args.repetitions)
+    duplicates = engine.duplicates(record)
+    if duplicates and args.unique:
+        print(f"Запись уже есть в журнале, не добавлена: {', '.join(record.values())}")
+        return 1
+    record = engine.add(args.datetime, args.exercise, args.weight, args.repetitions)
+    engine.save()
+    print(f"Запись добавлена: {', '.join(record.values())}")
+    if duplicates:
+        print(f"Внимание: такая запись уже была в журнале ({duplicates})", file=sys.stderr)
+
+
+def run_list(engine, args):
+    engine.load()
+    writer = csv.writer(sys.stdout)
+    writer.writerow(CSV_HEADER)
+    writer.writerows(record.values() for record in engine.select(get_filter(args)))
+
+
+def run_stats(engine, args):
+    engine.load()
+    statistics = engine.statistics(get_filter(args))
+    records = engine.personal_records(get_filter(args))
+    if args.json:
+        total_weight, total_repetitions, exercises_stats = statistics
+        json.dump({'weight': total_weight, 'repetitions': total_repetitions, 'exercises': exercises_stats,
+                   'records': {name: progress.to_dict() for name, progress in records.items()}},
+                  sys.stdout, ensure_ascii=False, indent=4)
+        print()
+    else:
+        print("\n".join(statistics_lines(statistics)))
+        if records:
+            print("Личные рекорды (за все время):")
+            print("\n".join(progress_lines(records)))
+
+
+def run_export(engine, args):
+    engine.load()
+    count = engine.export_csv(args.file, get_filter(args) if has_filter(args) else None)
+    print(f"Данные экспортированы в файл: {args.file}\nЗаписей: {count}")
+
+
+def run_import(engine, args):
+    engine.load(create=True)
+    report = engine.import_csv(args.file, skip_duplicates=not args.keep_duplicates)
+    if report.imported:
+        engine.save()
+    for line, message in report.errors:
+        print(f"Строка {line}: {message}", file=sys.stderr)
+    print(report.summary())
+    return 0 if report.imported or report.duplicates else 1
+
+
+def run_charts(engine, args):
+    engine.load()
+    charts = engine.render_charts(get_filter(args))
+    if charts is None:
+        print("Нет данных для отображения графиков.")
+        return 1
+    for chart in charts:
+        print(chart.path)
+
+
+def run_team(engine, args):
+    team = TeamStats(args.team_directory, max_workers=args.workers)
+    try:
+        report = team.collect(*get_filter(args), period=args.period)
+    finally:
+        team.close()
+    if args.json:
+        json.dump(report.to_dict(), sys.stdout, ensure_ascii=False, indent=4)
+        print()
+    else:
+        print("\n".join(team_lines(report)))
+    return 1 if report.errors else 0
+
+
+def run_serve(engine, args):
+    count = engine.load(create=True)
+
+    def ready(server):
+        print(f"Сервер журнала {engine.path} ({count} записей): http://{server.host}:{server.port}/", flush=True)
+    try:
+        asyncio.run(serve(engine, args.host, args.port, ready))
+    except KeyboardInterrupt:
+        print("Сервер остановлен")
+
+
+COMMANDS = {
+    'add': run_add,
+    'list': run_list,
+    'stats': run_stats,
+    'export': run_export,
+    'import': run_import,
+    'charts': run_charts,
+    'team': run_team,
+    'serve': run_serve,
+}
+
+
+def main(argv=None):
+    """
+    Выполняет команду из параметров командной строки argv и возвращает код возврата.
+    """
+    args = build_parser().parse_args(argv)
+    instrumentation.profile_directory = args.profile
+    try:
+        engine = JournalEngine(args.journal, migrate_from=args.migrate_from,
+                               chart_directory=getattr(args, 'directory', CHART_DIRECTORY),
+                               timestamp_format=args.timestamps,
+                               write_behind=args.command == 'serve')  # Сервер сохраняет добавления пачками
+        return instrumentation.call(args.command, COMMANDS[args.command], engine, args) or 0
+    except FileNotFoundError as e:
+        print(f"Файл не найден: {e.filename}", file=sys.stderr)
+    except (ValueError, OSError) as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+    return 1
@@ -0,0 +1,146 @@
+"""
+Двоичный столбцовый снимок журнала тренировок для быстрого запуска.
+
+Разбор большого файла JSON (строки дат, чисел и названий) - самая долгая часть запуска приложения.
+Столбцовый файл (например, "training_log.json.cols") хранит тот же снимок журнала в виде столбцов
+фиксированной ширины, которые открываются через mmap и numpy.frombuffer без разбора и копирования:
+
+    заголовок  (struct HEADER): сигнатура, версия формата, количество названий, количество записей,
+               отметка файла JSON (время изменения в наносекундах и размер), по которому построен снимок;
+    названия   длины названий (uint32) и сами названия в UTF-8, отсортированные по алфавиту;
+    столбцы    id (int64), minutes (int64), weight (float64), repetitions (int32), exercise (int32 -
+               номер названия), fingerprint (int64 - отпечаток записи для поиска повторов,
+               journal/fingerprints.py), каждый выровнен на 8 байт. Строки идут в порядке записей файла JSON.
+
+Снимок действителен, только пока отметка файла JSON совпадает с отметкой в заголовке, то есть снимок
+новее файла JSON. Устаревший или поврежденный файл игнорируется и строится заново в фоне.
+"""
+
+import mmap
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+from journal.fingerprints import fingerprint_columns
+from journal.records import Record
+
+COLUMN_FILE_SUFFIX = '.cols'  # Суффикс столбцового файла рядом с файлом журнала
+MAGIC = b'TJCOLS\x00\x00'
+FORMAT_VERSION = 2  # 2 - добавлен столбец отпечатков
+HEADER = struct.Struct('<8sIIqqq')  # Сигнатура, версия, названий, записей, mtime_ns и размер файла JSON
+ALIGNMENT = 8
+COLUMNS = (
+    ('id', np.int64),
+    ('minutes', np.int64),
+    ('weight', np.float64),
+    ('repetitions', np.int32),
+    ('exercise', np.int32),
+    ('fingerprint', np.int64),
+)
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class ColumnFile:
+    """
+    Открытый столбцовый файл: столбцы NumPy поверх mmap и список названий упражнений.
+    """
+    def __init__(self, buffer, columns, names):
+        self._buffer = buffer
+        self.ids, self.minutes, self.weight, self.repetitions, self.exercise, self.fingerprints = columns
+        self.names = names
+
+    def __len__(self):
+        return len(self.ids)
+
+    def records(self):
+        """
+        Создает записи Record в порядке файла.
+        """
+        names = self.names
+        return list(map(Record, self.minutes.tolist(), [names[code] for code in self.exercise.tolist()],
+                        self.weight.tolist(), self.repetitions.tolist(), self.ids.tolist()))
+
+    def close(self):
+        """
+        Освобождает отображение файла в память (столбцы после этого недоступны).
+        """
+        self.ids = self.minutes = self.weight = self.repetitions = self.exercise = self.fingerprints = None
+        try:
+            self._buffer.close()
+        except BufferError:
+            pass  # На столбцы еще есть ссылки: отображение закроется вместе с ними
+
+
+def open_column_file(path, stamp):
+    """
+    Открывает столбцовый файл, построенный по снимку JSON с отметкой stamp (mtime_ns, размер).
+    Возвращает ColumnFile или None, если файла нет, он устарел или поврежден.
+    """
+    try:
+        with open(path, 'rb') as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None  # Файла нет или он пустой
+    try:
+        magic, version, name_count, row_count, mtime_ns, size = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != FORMAT_VERSION or [mtime_ns, size] != list(stamp):
+            raise ValueError("Столбцовый файл устарел")
+        offset = HEADER.size
+        lengths = np.frombuffer(buffer, dtype=np.uint32, count=name_count, offset=offset)
+        offset += lengths.nbytes
+        names = []
+        for length in lengths.tolist():
+            names.append(buffer[offset:offset + length].decode('utf-8'))
+            offset += length
+        columns = []
+        for name, dtype in COLUMNS:
+            offset = _align(offset)
+            column = np.frombuffer(buffer, dtype=dtype, count=row_count, offset=offset)
+            offset += column.nbytes
+            columns.append(column)
+        if offset != len(buffer) or (name_count and row_count and columns[4].max() >= name_count):
+            raise ValueError("Столбцовый файл поврежден")
+    except (ValueError, struct.error, UnicodeDecodeError):
+        return None  # Отображение закроется вместе с последним столбцом, который на него ссылается
+    return ColumnFile(buffer, columns, names)
+
+
+def write_column_file(path, records, stamp):
+    """
+    Атомарно записывает столбцовый файл для записей records (в порядке файла JSON),
+    построенный по снимку JSON с отметкой stamp.
+    """
+    records = list(records)
+    names = sorted({record.exercise for record in records})
+    codes = {name: code for code, name in enumerate(names)}
+    count = len(records)
+    columns = [
+        np.fromiter((record.id for record in records), dtype=np.int64, count=count),
+        np.fromiter((record.minutes for record in records), dtype=np.int64, count=count),
+        np.fromiter((record.weight for record in records), dtype=np.float64, count=count),
+        np.fromiter((record.repetitions for record in records), dtype=np.int32, count=count),
+        np.fromiter((codes[record.exercise] for record in records), dtype=np.int32, count=count),
+    ]
+    columns.append(fingerprint_columns(columns[1], columns[4], columns[2], columns[3], names))
+    encoded = [name.encode('utf-8') for name in names]
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix='.tmp-', suffix=COLUMN_FILE_SUFFIX, dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(names), count, *stamp))
+            file.write(np.array([len(name) for name in encoded], dtype=np.uint32).tobytes())
+            file.write(b''.join(encoded))
+            for column in columns:
+                file.write(b'\x00' * (_align(file.tell()) - file.tell()))
+                file.write(column.tobytes())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
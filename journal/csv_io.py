@@ -0,0 +1,216 @@
+"""
+Обмен записями журнала тренировок через файлы формата CSV.
+
+Импорт выполняется потоково: файл читается построчно и обрабатывается пачками (по BATCH_SIZE строк),
+в памяти не накапливаются строки файла - только готовые компактные записи Record. Каждая строка
+проверяется (дата, вес, повторения); ошибки не прерывают импорт, а собираются в отчет ImportReport
+с номерами строк. Записи, которые уже есть в журнале, по умолчанию пропускаются (поиск по отпечаткам записей,
+journal/fingerprints.py), и их количество попадает в отчет. Все новые записи добавляются в журнал одной
+пачкой (одна запись в журнал изменений). О ходе импорта сообщает функция progress(доля), доля вычисляется
+по прочитанным байтам.
+
+Экспорт также потоковый: записи (снимок списка ссылок из хранилища) превращаются в строки CSV пачками
+и записываются через writerows, поэтому строки всего журнала одновременно в памяти не находятся.
+Файл пишется во временный файл рядом с целевым и переименовывается после записи, так что отмененный
+или прерванный экспорт не оставляет недописанного файла.
+"""
+
+import csv
+import os
+
+from journal.fingerprints import drop_duplicates
+from journal.records import Record, parse_datetime
+
+CSV_HEADER = ["Дата", "Упражнение", "Вес", "Повторения"]  # Столбцы файла CSV
+BATCH_SIZE = 10000  # Количество строк в пачке при импорте
+MAX_REPORTED_ERRORS = 1000  # Сколько ошибок сохраняется в отчете (остальные только считаются)
+MAX_REPETITIONS = 2 ** 31 - 1  # Наибольшее количество повторений (столбцы повторений - int32)
+
+
+class ImportCancelled(Exception):
+    """
+    Импорт отменен пользователем.
+    """
+
+
+class ExportCancelled(Exception):
+    """
+    Экспорт отменен пользователем.
+    """
+
+
+class ImportReport:
+    """
+    Отчет об импорте: сколько строк прочитано, импортировано и пропущено как повторы, ошибки по строкам.
+    """
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.rows_read = 0
+        self.imported = 0
+        self.duplicates = 0  # Записи, которые уже есть в журнале (не импортированы)
+        self.error_count = 0
+        self.errors = []  # Список (номер строки, сообщение), не более MAX_REPORTED_ERRORS
+        self.fatal_error = None  # Ошибка, из-за которой файл не удалось импортировать целиком
+
+    def add_error(self, line_number, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line_number, message))
+
+    def summary(self):
+        """
+        Краткое текстовое описание результата импорта.
+        """
+        if self.fatal_error:
+            return self.fatal_error
+        text = f"Импортировано записей: {self.imported} из {self.rows_read}."
+        if self.duplicates:
+            text += f" Уже были в журнале: {self.duplicates}."
+        if self.error_count:
+            text += f" Строк с ошибками: {self.error_count}."
+        return text
+
+
+def validate_row(row, columns):
+    """
+    Проверяет строку CSV и возвращает запись Record. columns - позиции столбцов
+    (дата, упражнение, вес, повторения) в строке. При ошибке выбрасывается ValueError с описанием.
+    """
+    try:
+        date_text, exercise, weight_text, repetitions_text = (row[column] for column in columns)
+    except IndexError:
+        raise ValueError("В строке не хватает столбцов")
+
+    try:
+        minutes = parse_datetime(date_text)
+    except ValueError:
+        raise ValueError(f"Некорректная дата: {date_text}. Формат: ДД/ММ/ГГГГ ЧЧ:ММ")
+
+    if not exercise:
+        raise ValueError("Не указано упражнение")
+
+    try:
+        weight = float(weight_text)
+    except ValueError:
+        raise ValueError(f"Некорректное значение веса: {weight_text}")
+    if weight <= 0 or weight > 200:
+        raise ValueError(f"Некорректное значение веса: {weight_text}. "
+                         f"Вес должен быть положительным числом не более 200.")
+
+    try:
+        repetitions = int(repetitions_text)
+    except ValueError:
+        repetitions = 0
+    if repetitions <= 0 or repetitions > MAX_REPETITIONS:
+        raise ValueError(f"Некорректное значение повторений: {repetitions_text}. "
+                         f"Повторения должны быть целым положительным числом не более {MAX_REPETITIONS}.")
+
+    return Record(minutes, exercise, weight, repetitions)
+
+
+def _read_lines(file, counter):
+    """
+    Построчно декодирует двоичный файл, подсчитывая прочитанные байты (для индикатора прогресса).
+    """
+    for raw_line in file:
+        counter[0] += len(raw_line)
+        yield raw_line.decode('utf-8-sig')
+
+
+def iter_batches(file_name, batch_size=BATCH_SIZE, progress=None):
+    """
+    Потоково читает файл CSV и возвращает пачки строк в виде списков (номер строки, строка).
+    Первая строка файла - заголовок; первой пачкой возвращаются позиции столбцов CSV_HEADER.
+    Если столбцов не хватает, выбрасывается ValueError.
+    """
+    total_size = os.path.getsize(file_name) or 1
+    counter = [0]
+    with open(file_name, 'rb') as file:
+        reader = csv.reader(_read_lines(file, counter))
+        header = next(reader, None)
+        if header is None or any(column not in header for column in CSV_HEADER):
+            raise ValueError("Некорректный формат данных в файле. Убедитесь, что файл "
+                             "содержит столбцы 'Дата', 'Упражнение', 'Вес', 'Повторения'.")
+        yield [header.index(column) for column in CSV_HEADER]
+
+        batch = []
+        for row in reader:
+            batch.append((reader.line_num, row))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+                if progress:
+                    progress(counter[0] / total_size)
+        if batch:
+            yield batch
+    if progress:
+        progress(1.0)
+
+
+def read_records(file_name, report, batch_size=BATCH_SIZE, progress=None, cancelled=None):
+    """
+    Читает и проверяет записи из файла CSV. Ошибки строк записываются в report.
+    Возвращает список корректных записей. Функция cancelled() позволяет прервать импорт
+    между пачками (выбрасывается ImportCancelled).
+    """
+    records = []
+    batches = iter_batches(file_name, batch_size, progress)
+    columns = next(batches)
+    for batch in batches:
+        if cancelled and cancelled():
+            raise ImportCancelled()
+        for line_number, row in batch:
+            if not any(row):
+                continue  # Пустые строки пропускаем
+            report.rows_read += 1
+            try:
+                records.append(validate_row(row, columns))
+            except ValueError as e:
+                report.add_error(line_number, str(e))
+    return records
+
+
+def import_csv(file_name, store, batch_size=BATCH_SIZE, progress=None, cancelled=None, skip_duplicates=True):
+    """
+    Импортирует записи из файла CSV в хранилище store. Все корректные записи добавляются
+    одной пачкой; с skip_duplicates записи, которые уже есть в журнале, пропускаются.
+    Возвращает отчет ImportReport.
+    """
+    report = ImportReport(file_name)
+    try:
+        records = read_records(file_name, report, batch_size, progress, cancelled)
+    except ValueError as e:
+        report.fatal_error = str(e)
+        return report
+    if records and skip_duplicates:
+        records, report.duplicates = drop_duplicates(records, store)
+    if records:
+        store.extend(records)
+        report.imported = len(records)
+    return report
+
+
+def export_csv(file_name, records, batch_size=BATCH_SIZE, progress=None, cancelled=None):
+    """
+    Записывает записи (список Record) в файл CSV пачками по batch_size строк.
+    Возвращает количество записанных записей. Функция cancelled() позволяет прервать экспорт
+    между пачками (выбрасывается ExportCancelled, файл не создается).
+    """
+    total = len(records)
+    temp_name = file_name + '.part'
+    try:
+        with open(temp_name, mode='w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(CSV_HEADER)
+            for start in range(0, total, batch_size):
+                if cancelled and cancelled():
+                    raise ExportCancelled()
+                writer.writerows([record.values() for record in records[start:start + batch_size]])
+                if progress:
+                    progress(min(start + batch_size, total) / total)
+        os.replace(temp_name, file_name)
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+        raise
+    return total
@@ -0,0 +1,198 @@
+"""
+Операции с журналом тренировок без графического интерфейса.
+
+JournalEngine объединяет хранилище журнала (open_storage) и построение графиков (ChartService) и выполняет
+все действия, которые доступны в приложении: добавление, редактирование и удаление записей, фильтрацию,
+статистику, импорт и экспорт CSV, построение графиков. Ошибки ввода сообщаются исключением ValueError
+с описанием на русском языке, а не окнами сообщений, поэтому одни и те же операции используют
+и графическое приложение (training_journal.py), и командная строка (journal/cli.py), и сценарии:
+
+    engine = JournalEngine('training_log.json')
+    engine.load()
+    engine.add('26/11/2024 07:11', 'Отжимания', '110', '4')
+    engine.save()
+    total_weight, total_repetitions, exercises = engine.statistics(make_filter(exercise_filter='Отжимания'))
+
+Фильтр записей - кортеж (начало, конец, фильтр по упражнению): время в минутах от начала эпохи
+(включительно) и подстрока названия упражнения без учета регистра.
+"""
+
+from datetime import date, datetime
+
+from journal.charts import CHART_DIRECTORY, ChartService
+from journal.csv_io import export_csv, import_csv, validate_row
+from journal.fingerprints import record_fingerprint
+from journal.records import MINUTES_PER_DAY, date_to_minutes
+from journal.storage import open_storage
+
+DEFAULT_JOURNAL = 'training_log.json'  # Файл журнала по умолчанию
+DATE_FORMATS = ('%d/%m/%Y', '%Y-%m-%d')  # Форматы дат в командной строке: ДД/ММ/ГГГГ и ГГГГ-ММ-ДД
+FIRST_DAY = date(1, 1, 1)  # Начало диапазона, если дата начала не указана
+LAST_DAY = date(9999, 12, 31)  # Конец диапазона, если дата окончания не указана
+
+
+def parse_date(text):
+    """
+    Разбирает дату в формате ДД/ММ/ГГГГ или ГГГГ-ММ-ДД. При неверном формате выбрасывается ValueError.
+    """
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date()
+        except ValueError:
+            pass
+    raise ValueError(f"Некорректная дата: {text}. Формат: ДД/ММ/ГГГГ или ГГГГ-ММ-ДД")
+
+
+def make_filter(start_date=None, end_date=None, exercise_filter=''):
+    """
+    Создает фильтр записей за дни с start_date по end_date (объекты date, включительно; None - без ограничения)
+    по упражнениям, название которых содержит exercise_filter. Если дата начала позже даты окончания,
+    выбрасывается ValueError.
+    """
+    start_minutes = date_to_minutes(start_date or FIRST_DAY)  # 00:00
+    end_minutes = date_to_minutes(end_date or LAST_DAY) + MINUTES_PER_DAY - 1  # 23:59
+    if start_minutes > end_minutes:
+        raise ValueError("Дата начала не может быть позже даты окончания.")
+    return start_minutes, end_minutes, (exercise_filter or '').strip()
+
+
+def make_record(datetime_text, exercise, weight, repetitions):
+    """
+    Проверяет значения полей записи (строки, как в полях ввода и в файле CSV) и возвращает запись Record.
+    При ошибке выбрасывается ValueError с описанием.
+    """
+    fields = [str(datetime_text).strip(), str(exercise).strip(), str(weight).strip(), str(repetitions).strip()]
+    if not all(fields):
+        raise ValueError("Все поля должны быть заполнены!")
+    return validate_row(fields, (0, 1, 2, 3))
+
+
+def statistics_lines(statistics):
+    """
+    Строки отчета по статистике: суммарные значения и значения по упражнениям.
+    """
+    total_weight, total_repetitions, exercises_stats = statistics
+    lines = [f"Суммарный вес: {total_weight:.2f} кг",
+             f"Суммарное количество повторений: {total_repetitions}",
+             "Упражнения:"]
+    for exercise, stats in exercises_stats.items():
+        lines.append(f"{exercise}: {stats['weight']:.2f} кг, {stats['repetitions']} повторений")
+    return lines
+
+
+class JournalEngine:
+    """
+    Журнал тренировок: хранилище записей и построение графиков.
+    """
+    def __init__(self, path=DEFAULT_JOURNAL, migrate_from=None, chart_directory=CHART_DIRECTORY,
+                 timestamp_format=None, write_behind=False):
+        self.store = open_storage(path, migrate_from=migrate_from, timestamp_format=timestamp_format,
+                                  write_behind=write_behind)
+        self.charts = ChartService(self.store, chart_directory)
+
+    @property
+    def path(self):
+        return self.store.path
+
+    def load(self, create=False):
+        """
+        Загружает журнал (перечитывает, если он изменился на диске) и возвращает количество записей.
+        Если файла нет, выбрасывается FileNotFoundError, а при create=True создается пустой журнал.
+        """
+        try:
+            self.store.load()
+        except FileNotFoundError:
+            if not create:
+                raise
+            self.store.create_empty()
+        return self.store.count()
+
+    def save(self, path=None):
+        """
+        Сохраняет изменения журнала (в режиме write_behind - все отложенные изменения одной записью).
+        Если указан другой путь, записывает туда копию журнала.
+        """
+        self.store.save(path)
+
+    def add(self, datetime_text, exercise, weight, repetitions, skip_duplicate=False):
+        """
+        Проверяет значения полей и добавляет запись в журнал. Возвращает добавленную запись.
+        С skip_duplicate запись не добавляется, если такая же уже есть в журнале, и возвращается None.
+        """
+        record = make_record(datetime_text, exercise, weight, repetitions)
+        if skip_duplicate and self.duplicates(record):
+            return None
+        self.store.add(record)
+        return record
+
+    def duplicates(self, record):
+        """
+        Количество записей журнала, совпадающих с записью record (время, упражнение, вес и повторения).
+        """
+        value = record_fingerprint(record)
+        return self.store.fingerprint_counts([value]).get(value, 0)
+
+    def update(self, record_id, datetime_text, exercise, weight, repetitions):
+        """
+        Проверяет значения полей и заменяет запись с номером record_id.
+        Если записи нет, выбрасывается KeyError.
+        """
+        record = make_record(datetime_text, exercise, weight, repetitions)
+        self.store.update(record_id, record)
+        return record
+
+    def remove(self, record_ids):
+        """
+        Удаляет записи с указанными номерами.
+        """
+        self.store.remove(record_ids)
+
+    def exercise_names(self):
+        return self.store.exercise_names()
+
+    def select(self, record_filter):
+        """
+        Записи по фильтру, упорядоченные по времени.
+        """
+        return self.store.select(*record_filter)
+
+    def statistics(self, record_filter):
+        """
+        Статистика по фильтру: суммарный объем, суммарное количество повторений и словарь по упражнениям.
+        """
+        return self.store.statistics(*record_filter)
+
+    def personal_records(self, record_filter):
+        """
+        Личные рекорды за все время (journal/progression.py) упражнений, которые выполнялись в диапазоне
+        фильтра: словарь {упражнение: ExerciseProgress}.
+        """
+        performed = self.statistics(record_filter)[2]
+        return {name: progress for name, progress in self.store.personal_records(record_filter[2]).items()
+                if name in performed}
+
+    def render_charts(self, record_filter):
+        """
+        Графики веса и повторений по фильтру (список Chart) или None, если данных нет.
+        Файлы графиков записываются в папку графиков.
+        """
+        return self.charts.render(*record_filter)
+
+    def export_csv(self, file_name, record_filter=None, progress=None, cancelled=None):
+        """
+        Экспортирует в CSV весь журнал или записи по фильтру. Возвращает количество записанных записей.
+        """
+        # Снимок записей (только ссылки): журнал может меняться, пока идет запись файла
+        if record_filter is None:
+            records = self.store.snapshot()
+        else:
+            records = self.select(record_filter)
+        return export_csv(file_name, records, progress=progress, cancelled=cancelled)
+
+    def import_csv(self, file_name, progress=None, cancelled=None, skip_duplicates=True):
+        """
+        Импортирует записи из файла CSV (записи, которые уже есть в журнале, пропускаются,
+        если skip_duplicates). Возвращает отчет ImportReport.
+        """
+        return import_csv(file_name, self.store, progress=progress, cancelled=cancelled,
+                          skip_duplicates=skip_duplicates)
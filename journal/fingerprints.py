@@ -0,0 +1,171 @@
+"""
+Отпечатки записей журнала для поиска повторов при импорте и добавлении.
+
+Отпечаток - 64-битный хеш нормализованных полей записи: время в минутах, название упражнения (без учета
+регистра и лишних пробелов), вес с точностью до 0.01 кг и количество повторений. Одинаковые подходы дают
+одинаковый отпечаток, как бы они ни были записаны в файле ('7:11' и '07:11', 'Присед ' и 'присед', '100'
+и '100.0'). Номер записи в отпечаток не входит. Отпечаток записи считается функцией fingerprint,
+а отпечатки многих записей сразу - векторно по столбцам NumPy (fingerprint_columns), с тем же результатом.
+
+Повторы считаются как мультимножество: в тренировке бывает несколько одинаковых подходов в одну минуту,
+поэтому запись из файла импорта считается повтором, только если в журнале осталась еще не сопоставленная
+такая же запись. Повторный импорт того же файла ничего не добавляет, а новый файл с тремя одинаковыми
+подходами добавляет все три.
+
+Хранилища отвечают на вопрос "сколько в журнале записей с такими отпечатками" (Storage.fingerprint_counts):
+- JournalStore - через FingerprintIndex: отсортированный массив отпечатков снимка (количество находится
+двоичным поиском np.searchsorted) и словарь изменений после его построения. Отпечатки снимка хранятся
+в столбцовом файле (journal/column_file.py) и читаются оттуда без пересчета;
+- SqliteStore - через столбец fingerprint таблицы records с индексом.
+
+Совпадение отпечатков разных подходов маловероятно: для одной строки импорта и журнала из 10 млн записей
+вероятность порядка 10^-12.
+"""
+
+import functools
+import hashlib
+
+import numpy as np
+
+MASK = (1 << 64) - 1
+SIGN = 1 << 63
+MERGE_SIZE = 1000  # С какого размера пачки отпечатки добавляются в отсортированный массив, а не в словарь
+# Константы перемешивания splitmix64
+MIX_1 = 0xBF58476D1CE4E5B9
+MIX_2 = 0x94D049BB133111EB
+
+
+def normalize_exercise(name):
+    """
+    Название упражнения для сравнения: без учета регистра, лишние пробелы убраны.
+    """
+    return ' '.join(name.split()).casefold()
+
+
+@functools.lru_cache(maxsize=None)
+def exercise_hash(name):
+    """
+    64-битный хеш нормализованного названия упражнения (не зависит от запуска, в отличие от hash()).
+    """
+    digest = hashlib.blake2b(normalize_exercise(name).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def _mix(value):
+    value = (value ^ (value >> 30)) * MIX_1 & MASK
+    value = (value ^ (value >> 27)) * MIX_2 & MASK
+    return value ^ (value >> 31)
+
+
+def fingerprint(minutes, exercise, weight, repetitions):
+    """
+    Отпечаток подхода: целое число со знаком (int64, как целые SQLite).
+    """
+    value = exercise_hash(exercise)
+    for field in (minutes, round(weight * 100), repetitions):
+        value = _mix(value ^ (field & MASK))
+    return value - (1 << 64) if value & SIGN else value
+
+
+def record_fingerprint(record):
+    return fingerprint(record.minutes, record.exercise, record.weight, record.repetitions)
+
+
+def _mix_array(values):
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(MIX_1)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(MIX_2)
+    return values ^ (values >> np.uint64(31))
+
+
+def fingerprint_columns(minutes, exercise, weight, repetitions, names):
+    """
+    Отпечатки записей по столбцам: minutes, weight, repetitions - значения, exercise - номера названий
+    в списке names. Возвращает массив int64 (те же значения, что и fingerprint).
+    """
+    hashes = np.array([exercise_hash(name) for name in names], dtype=np.uint64)
+    values = hashes[np.asarray(exercise, dtype=np.intp)]
+    fields = (np.asarray(minutes, dtype=np.int64),
+              np.rint(np.asarray(weight, dtype=np.float64) * 100).astype(np.int64),
+              np.asarray(repetitions, dtype=np.int64))
+    with np.errstate(over='ignore'):
+        for field in fields:
+            values = _mix_array(values ^ field.view(np.uint64))
+    return values.view(np.int64)
+
+
+def record_fingerprints(records):
+    """
+    Отпечатки списка записей Record (массив int64), посчитанные векторно.
+    """
+    count = len(records)
+    names = sorted({record.exercise for record in records})
+    codes = {name: code for code, name in enumerate(names)}
+    return fingerprint_columns(
+        np.fromiter((record.minutes for record in records), dtype=np.int64, count=count),
+        np.fromiter((codes[record.exercise] for record in records), dtype=np.int32, count=count),
+        np.fromiter((record.weight for record in records), dtype=np.float64, count=count),
+        np.fromiter((record.repetitions for record in records), dtype=np.int64, count=count),
+        names
+    )
+
+
+class FingerprintIndex:
+    """
+    Мультимножество отпечатков записей журнала: отсортированный массив отпечатков, по которому индекс
+    построен, и словарь изменений (отпечаток -> прибавка к количеству) после построения.
+    """
+    def __init__(self, fingerprints=()):
+        self._base = np.sort(np.asarray(fingerprints, dtype=np.int64))
+        self._delta = {}
+
+    def add(self, value):
+        self._delta[value] = self._delta.get(value, 0) + 1
+
+    def extend(self, fingerprints):
+        """
+        Добавляет отпечатки пачки записей (массив int64). Большая пачка (импорт) вливается в отсортированный
+        массив, а не в словарь изменений.
+        """
+        if len(fingerprints) < MERGE_SIZE:
+            for value in fingerprints.tolist():
+                self.add(value)
+        else:
+            self._base = np.sort(np.concatenate((self._base, fingerprints)))
+
+    def remove(self, value):
+        self._delta[value] = self._delta.get(value, 0) - 1
+
+    def counts(self, fingerprints):
+        """
+        Количество записей с каждым из отпечатков: словарь {отпечаток: количество} только для найденных.
+        """
+        fingerprints = list(fingerprints)
+        values = np.array(fingerprints, dtype=np.int64)
+        found = (np.searchsorted(self._base, values, side='right')
+                 - np.searchsorted(self._base, values, side='left')).tolist()
+        counts = {}
+        for value, count in zip(fingerprints, found):
+            count += self._delta.get(value, 0)
+            if count > 0:
+                counts[value] = count
+        return counts
+
+
+def drop_duplicates(records, store):
+    """
+    Отделяет от списка записей повторы записей журнала store (как мультимножество, см. описание модуля).
+    Возвращает (новые записи, количество пропущенных повторов). Отпечатки считаются векторно, поиск
+    в журнале - двоичный, поэтому время растет почти линейно с числом записей.
+    """
+    fingerprints = record_fingerprints(records).tolist()
+    remaining = store.fingerprint_counts(set(fingerprints))
+    if not remaining:
+        return records, 0
+    unique = []
+    for record, value in zip(records, fingerprints):
+        left = remaining.get(value)
+        if left:
+            remaining[value] = left - 1  # Запись журнала сопоставлена с этой строкой
+        else:
+            unique.append(record)
+    return unique, len(records) - len(unique)
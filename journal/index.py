@@ -0,0 +1,195 @@
+"""
+Индексы журнала тренировок в памяти.
+
+DateIndex - записи, упорядоченные по дате и времени, и параллельный список их отметок времени (в минутах).
+Выборка записей за диапазон дат выполняется двоичным поиском (bisect) за O(log N + k) вместо полного
+просмотра журнала. Индекс обновляется при добавлении, редактировании, удалении и импорте записей.
+
+ExerciseIndex - словарь упражнений: для каждого названия хранится ключ для поиска без учета регистра
+(casefold) и собственный DateIndex записей этого упражнения. Фильтр по подстроке проверяется только
+по нескольким сотням различных названий, а не по всем записям журнала.
+"""
+
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from operator import attrgetter
+
+# Если за раз добавляется больше записей, чем эта доля от размера индекса, индекс пересобирается
+# сортировкой целиком: это быстрее, чем вставлять записи по одной
+REBUILD_RATIO = 0.125
+
+
+class DateIndex:
+    """
+    Индекс записей, упорядоченный по времени тренировки.
+    """
+    def __init__(self, records=()):
+        self.rebuild(records)
+
+    def rebuild(self, records, presorted=False):
+        """
+        Полностью пересобирает индекс по списку записей.
+        Записи с одинаковым временем сохраняют исходный порядок.
+        Если presorted равен True, записи уже упорядочены по времени и не сортируются.
+        """
+        self._records = list(records) if presorted else sorted(records, key=attrgetter('minutes'))
+        self._times = [record.minutes for record in self._records]
+
+    def __len__(self):
+        return len(self._records)
+
+    def insert(self, record):
+        """
+        Добавляет запись в индекс. Запись встает после записей с тем же временем.
+        """
+        position = bisect_right(self._times, record.minutes)
+        self._times.insert(position, record.minutes)
+        self._records.insert(position, record)
+
+    def extend(self, records):
+        """
+        Добавляет несколько записей в индекс.
+        """
+        records = list(records)
+        if len(records) > len(self._records) * REBUILD_RATIO:
+            self.rebuild(self._records + records)
+            return
+        for record in records:
+            self.insert(record)
+
+    def remove(self, record):
+        """
+        Удаляет запись из индекса. Среди записей с тем же временем запись ищется по идентичности объекта.
+        """
+        position = bisect_left(self._times, record.minutes)
+        end = bisect_right(self._times, record.minutes, position)
+        for index in range(position, end):
+            if self._records[index] is record:
+                del self._times[index]
+                del self._records[index]
+                return
+        raise ValueError(f"Запись отсутствует в индексе: {record!r}")
+
+    def range(self, start_minutes, end_minutes):
+        """
+        Возвращает записи со временем в диапазоне [start_minutes, end_minutes], упорядоченные по времени.
+        """
+        low = bisect_left(self._times, start_minutes)
+        high = bisect_right(self._times, end_minutes, low)
+        return self._records[low:high]
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def __getitem__(self, index):
+        return self._records[index]
+
+
+class _Exercise:
+    """
+    Элемент словаря упражнений: ключ для поиска и записи упражнения, упорядоченные по времени.
+    """
+    __slots__ = ('key', 'dates')
+
+    def __init__(self, name):
+        self.key = name.casefold()
+        self.dates = DateIndex()
+
+
+class ExerciseIndex:
+    """
+    Словарь упражнений журнала.
+    """
+    def __init__(self, records=()):
+        self.names_version = 0  # Увеличивается при изменении списка названий
+        self.rebuild(records)
+
+    def rebuild(self, records, presorted=False):
+        """
+        Полностью пересобирает словарь упражнений по списку записей
+        (presorted - записи уже упорядочены по времени).
+        """
+        grouped = {}
+        for record in records:
+            grouped.setdefault(record.exercise, []).append(record)
+        self._exercises = {}
+        for name, exercise_records in grouped.items():
+            exercise = self._exercises[name] = _Exercise(name)
+            exercise.dates.rebuild(exercise_records, presorted)
+        self._names = sorted(self._exercises)
+        self.names_version += 1
+
+    def _get_or_create(self, name):
+        exercise = self._exercises.get(name)
+        if exercise is None:
+            exercise = self._exercises[name] = _Exercise(name)
+            insort(self._names, name)
+            self.names_version += 1
+        return exercise
+
+    def insert(self, record):
+        """
+        Добавляет запись в словарь упражнений.
+        """
+        self._get_or_create(record.exercise).dates.insert(record)
+
+    def extend(self, records):
+        """
+        Добавляет несколько записей в словарь упражнений.
+        """
+        grouped = {}
+        for record in records:
+            grouped.setdefault(record.exercise, []).append(record)
+        for name, exercise_records in grouped.items():
+            self._get_or_create(name).dates.extend(exercise_records)
+
+    def remove(self, record):
+        """
+        Удаляет запись из словаря упражнений. Упражнение без записей удаляется из словаря.
+        """
+        exercise = self._exercises[record.exercise]
+        exercise.dates.remove(record)
+        if not len(exercise.dates):
+            del self._exercises[record.exercise]
+            del self._names[bisect_left(self._names, record.exercise)]
+            self.names_version += 1
+
+    @property
+    def names(self):
+        """
+        Отсортированный список названий упражнений.
+        """
+        return self._names
+
+    def match(self, query):
+        """
+        Возвращает названия упражнений, содержащие подстроку query без учета регистра.
+        """
+        query = query.casefold()
+        return [name for name, exercise in self._exercises.items() if query in exercise.key]
+
+    def count(self, name):
+        """
+        Количество записей упражнения.
+        """
+        exercise = self._exercises.get(name)
+        return len(exercise.dates) if exercise else 0
+
+    def records(self, name):
+        """
+        Записи упражнения, упорядоченные по времени.
+        """
+        exercise = self._exercises.get(name)
+        return list(exercise.dates) if exercise else []
+
+    def range(self, names, start_minutes, end_minutes):
+        """
+        Возвращает записи указанных упражнений со временем в диапазоне [start_minutes, end_minutes],
+        упорядоченные по времени. Для каждого упражнения диапазон выбирается двоичным поиском,
+        затем выборки сливаются.
+        """
+        ranges = [self._exercises[name].dates.range(start_minutes, end_minutes)
+                  for name in names if name in self._exercises]
+        if len(ranges) == 1:
+            return ranges[0]
+        return list(heapq.merge(*ranges, key=attrgetter('minutes')))
@@ -0,0 +1,193 @@
+"""
+Замеры времени операций журнала тренировок во время работы приложения (включаются по желанию).
+
+Когда приложение работает медленно, нужно понять, на что уходит время: на разбор файла журнала, выборку,
+построение таблицы или графиков. Общий объект instrumentation собирает замеры (spans) именованных операций:
+- время выполнения и количество обработанных записей (если оно известно);
+- скользящее окно последних HISTORY замеров каждой операции в памяти, по которому строится гистограмма
+времени (BUCKETS) и процентили;
+- общее количество вызовов и суммарное время за все время работы.
+
+Замеры выключены по умолчанию: выключенный span почти ничего не стоит. Включаются они параметрами
+командной строки приложения (--diagnostics, --profile) или journal/cli.py (--profile). Сводку можно посмотреть
+в окне диагностики приложения или записать в файл JSON (dump).
+
+Если задана папка profile_directory, каждая операция, запущенная через call или декоратор instrumented,
+выполняется под cProfile, и профиль сохраняется в файл "<операция>-<время>.pstats" (открывается
+модулем pstats или snakeviz). cProfile профилирует только текущий поток, поэтому фоновые задачи
+профилируются в своем рабочем потоке; если профилировщик уже запущен, операция выполняется без профиля.
+"""
+
+import cProfile
+import contextlib
+import functools
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+HISTORY = 1000  # Сколько последних замеров каждой операции хранится в памяти
+# Границы корзин гистограммы времени, секунды
+BUCKETS = (0.001, 0.01, 0.1, 1.0, 10.0)
+BUCKET_LABELS = ("< 1 мс", "1-10 мс", "10-100 мс", "0.1-1 с", "1-10 с", "> 10 с")
+
+
+class Span:
+    """
+    Замер одной операции: название, время выполнения и количество обработанных записей.
+    """
+    __slots__ = ('name', 'seconds', 'count')
+
+    def __init__(self, name):
+        self.name = name
+        self.seconds = None
+        self.count = None  # Операция может указать, сколько записей она обработала
+
+
+class SpanStats:
+    """
+    Замеры одной операции: скользящее окно последних замеров и итоги за все время.
+    """
+    def __init__(self, history=HISTORY):
+        self.samples = deque(maxlen=history)  # (секунды, количество записей)
+        self.calls = 0
+        self.total_seconds = 0.0
+
+    def add(self, seconds, count):
+        self.samples.append((seconds, count))
+        self.calls += 1
+        self.total_seconds += seconds
+
+    def summary(self):
+        """
+        Сводка по операции: вызовы, суммарное время, процентили и гистограмма последних замеров.
+        """
+        times = sorted(seconds for seconds, count in self.samples)
+        counts = [count for seconds, count in self.samples if count is not None]
+        histogram = [0] * len(BUCKET_LABELS)
+        for seconds in times:
+            histogram[sum(seconds >= bound for bound in BUCKETS)] += 1
+        return {
+            'calls': self.calls,
+            'total_seconds': self.total_seconds,
+            'window': len(times),
+            'mean_seconds': sum(times) / len(times) if times else 0.0,
+            'p50_seconds': _percentile(times, 0.5),
+            'p95_seconds': _percentile(times, 0.95),
+            'max_seconds': times[-1] if times else 0.0,
+            'last_count': counts[-1] if counts else None,
+            'histogram': dict(zip(BUCKET_LABELS, histogram)),
+        }
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class Instrumentation:
+    """
+    Сбор замеров операций и профилирование cProfile.
+    """
+    def __init__(self, history=HISTORY):
+        self.enabled = False
+        self.profile_directory = None  # Папка для файлов .pstats или None
+        self.history = history
+        self._spans = {}  # Название операции -> SpanStats
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, name):
+        """
+        Замеряет время блока with. Блок может указать количество записей: span.count = n.
+        """
+        span = Span(name)
+        if not self.enabled:
+            yield span
+            return
+        started = time.perf_counter()
+        try:
+            yield span
+        finally:
+            span.seconds = time.perf_counter() - started
+            self.record(span)
+
+    def record(self, span):
+        with self._lock:
+            stats = self._spans.get(span.name)
+            if stats is None:
+                stats = self._spans[span.name] = SpanStats(self.history)
+            stats.add(span.seconds, span.count)
+
+    def call(self, name, func, *args, count=None, **kwargs):
+        """
+        Выполняет func(*args, **kwargs) с замером (и под cProfile, если задана папка profile_directory).
+        count(результат) - количество обработанных записей.
+        """
+        if not self.enabled and self.profile_directory is None:
+            return func(*args, **kwargs)
+        with self.span(name) as span:
+            if self.profile_directory is None:
+                result = func(*args, **kwargs)
+            else:
+                result = self._profile(name, func, *args, **kwargs)
+            if count is not None:
+                span.count = count(result)
+        return result
+
+    def _profile(self, name, func, *args, **kwargs):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return func(*args, **kwargs)  # Профилировщик уже запущен в другом потоке
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            os.makedirs(self.profile_directory, exist_ok=True)
+            safe_name = re.sub(r'[^\w-]+', '_', name)
+            file_name = f"{safe_name}-{datetime.now():%Y%m%d-%H%M%S-%f}.pstats"
+            profiler.dump_stats(os.path.join(self.profile_directory, file_name))
+
+    def summary(self):
+        """
+        Сводка по всем операциям: {название: сводка SpanStats.summary}, по убыванию суммарного времени.
+        """
+        with self._lock:
+            summaries = {name: stats.summary() for name, stats in self._spans.items()}
+        return dict(sorted(summaries.items(), key=lambda item: -item[1]['total_seconds']))
+
+    def dump(self, path):
+        """
+        Записывает сводку по операциям в файл JSON.
+        """
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({'created': datetime.now().isoformat(timespec='seconds'), 'spans': self.summary()},
+                      file, ensure_ascii=False, indent=4)
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+
+
+instrumentation = Instrumentation()  # Общий объект замеров приложения
+
+
+def instrumented(name=None, count=None):
+    """
+    Декоратор: функция выполняется через instrumentation.call под названием name
+    (по умолчанию - имя функции). count(результат) - количество обработанных записей.
+    """
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return instrumentation.call(span_name, func, *args, count=count, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,216 @@
+"""
+Личные рекорды и расчетный разовый максимум (e1RM) по упражнениям.
+
+Разовый максимум оценивается по весу и количеству повторений подхода (FORMULAS):
+- Эпли (epley): вес x (1 + повторения / 30), для одного повторения - сам вес;
+- Бжицки (brzycki): вес x 36 / (37 - повторения).
+Формулы надежны только для небольшого числа повторений, поэтому e1RM считается для подходов не более чем
+из E1RM_MAX_REPETITIONS повторений; остальные подходы в рекорды e1RM не входят.
+
+ProgressTracker хранит для каждого упражнения (ExerciseProgress):
+- лучший подход по весу (при равном весе - с большим числом повторений), по объему (вес x повторения)
+и по e1RM каждой формулы;
+- таблицу лучших подходов по диапазонам повторений (REP_RANGES: 1, 2-3, 4-6, 7-10, 11-15, 16 и больше);
+- историю рекордов: подходы в порядке времени, каждый из которых превысил все прежние e1RM упражнения
+(по формуле DEFAULT_FORMULA), - для отметок рекордов на графике.
+
+Добавление записи обновляет рекорды упражнения за O(1): новый подход сравнивается с текущими лучшими.
+Если запись добавлена задним числом (раньше последнего подхода упражнения), а также если изменена
+или удалена запись, которая входит в рекорды, рекорды этого упражнения сбрасываются и пересчитываются
+при следующем запросе только по записям этого упражнения (records_of). Рекорды упражнения вычисляются
+при первом запросе, поэтому загрузка журнала не замедляется.
+"""
+
+REP_RANGES = ((1, 1), (2, 3), (4, 6), (7, 10), (11, 15), (16, None))  # Диапазоны повторений (None - без верхней границы)
+E1RM_MAX_REPETITIONS = 12  # Наибольшее количество повторений подхода, по которому оценивается e1RM
+DEFAULT_FORMULA = 'epley'  # Формула e1RM для истории рекордов
+
+
+def epley(weight, repetitions):
+    return weight if repetitions == 1 else weight * (1 + repetitions / 30)
+
+
+def brzycki(weight, repetitions):
+    return weight * 36 / (37 - repetitions)
+
+
+FORMULAS = {'epley': epley, 'brzycki': brzycki}
+FORMULA_NAMES = {'epley': "Эпли", 'brzycki': "Бжицки"}
+
+
+def estimate_1rm(weight, repetitions, formula=DEFAULT_FORMULA):
+    """
+    Расчетный разовый максимум подхода или None, если повторений больше E1RM_MAX_REPETITIONS.
+    """
+    if not 1 <= repetitions <= E1RM_MAX_REPETITIONS:
+        return None
+    return FORMULAS[formula](weight, repetitions)
+
+
+def rep_range(repetitions):
+    """
+    Номер диапазона повторений в REP_RANGES.
+    """
+    for index, (low, high) in enumerate(REP_RANGES):
+        if repetitions >= low and (high is None or repetitions <= high):
+            return index
+    return 0
+
+
+def range_label(index):
+    low, high = REP_RANGES[index]
+    if high is None:
+        return f"{low}+"
+    return str(low) if low == high else f"{low}-{high}"
+
+
+def _heavier(record, best):
+    return best is None or (record.weight, record.repetitions) > (best.weight, best.repetitions)
+
+
+class ExerciseProgress:
+    """
+    Рекорды одного упражнения.
+    """
+    __slots__ = ('best_weight', 'best_volume', 'best_e1rm', 'ranges', 'history', 'last_minutes')
+
+    def __init__(self, records=()):
+        self.best_weight = None  # Лучший подход по весу
+        self.best_volume = None  # Лучший подход по объему
+        self.best_e1rm = {formula: (0.0, None) for formula in FORMULAS}  # Формула -> (e1RM, подход)
+        self.ranges = [None] * len(REP_RANGES)  # Лучший подход (по весу) каждого диапазона повторений
+        self.history = []  # Подходы, которые обновили рекорд e1RM (DEFAULT_FORMULA), в порядке времени
+        self.last_minutes = None  # Время последнего подхода упражнения
+        for record in records:
+            self.add(record)
+
+    def add(self, record):
+        """
+        Учитывает подход. Возвращает False, если подход добавлен задним числом и оценка e1RM
+        могла изменить историю рекордов: тогда рекорды нужно пересчитать.
+        """
+        in_order = self.last_minutes is None or record.minutes >= self.last_minutes
+        if _heavier(record, self.best_weight):
+            self.best_weight = record
+        if self.best_volume is None or record.volume > self.best_volume.volume:
+            self.best_volume = record
+        index = rep_range(record.repetitions)
+        if _heavier(record, self.ranges[index]):
+            self.ranges[index] = record
+        for formula, (best, best_record) in self.best_e1rm.items():
+            estimate = estimate_1rm(record.weight, record.repetitions, formula)
+            if estimate is not None and estimate > best:
+                self.best_e1rm[formula] = (estimate, record)
+        if in_order:
+            self.last_minutes = record.minutes
+            estimate = estimate_1rm(record.weight, record.repetitions)
+            if estimate is not None and (not self.history or estimate > self.e1rm(self.history[-1])):
+                self.history.append(record)
+        elif estimate_1rm(record.weight, record.repetitions) is not None:
+            return False
+        return True
+
+    @staticmethod
+    def e1rm(record, formula=DEFAULT_FORMULA):
+        return estimate_1rm(record.weight, record.repetitions, formula)
+
+    def involves(self, record):
+        """
+        Входит ли подход (по номеру записи) в рекорды упражнения: тогда после его изменения или удаления
+        нужен пересчет.
+        """
+        bests = [self.best_weight, self.best_volume, *self.ranges, *self.history]
+        bests.extend(best_record for best, best_record in self.best_e1rm.values())
+        return any(best is not None and best.id == record.id for best in bests)
+
+    def to_dict(self):
+        def fields(record):
+            return None if record is None else {
+                'datetime': record.datetime_str, 'weight': record.weight, 'repetitions': record.repetitions}
+        return {
+            'best_weight': fields(self.best_weight),
+            'best_volume': fields(self.best_volume),
+            'e1rm': {formula: {'value': round(best, 2), 'set': fields(record)}
+                     for formula, (best, record) in self.best_e1rm.items() if record is not None},
+            'rep_ranges': {range_label(index): fields(record)
+                           for index, record in enumerate(self.ranges) if record is not None},
+        }
+
+
+class ProgressTracker:
+    """
+    Рекорды по упражнениям с пересчетом только измененных упражнений.
+    records_of(название) - записи упражнения в порядке времени (для пересчета).
+    """
+    def __init__(self, records_of):
+        self.records_of = records_of
+        self._exercises = {}  # Упражнение -> ExerciseProgress (только вычисленные)
+
+    def reset(self):
+        """
+        Сбрасывает рекорды всех упражнений (например, после перечитывания журнала).
+        """
+        self._exercises = {}
+
+    def add(self, record):
+        progress = self._exercises.get(record.exercise)
+        if progress is not None and not progress.add(record):
+            del self._exercises[record.exercise]
+
+    def extend(self, records):
+        for record in records:
+            self.add(record)
+
+    def remove(self, record):
+        progress = self._exercises.get(record.exercise)
+        if progress is not None and progress.involves(record):
+            del self._exercises[record.exercise]
+
+    def progress(self, name):
+        """
+        Рекорды упражнения (вычисляются по записям упражнения при первом запросе).
+        """
+        progress = self._exercises.get(name)
+        if progress is None:
+            progress = self._exercises[name] = ExerciseProgress(self.records_of(name))
+        return progress
+
+    def records(self, names):
+        """
+        Рекорды упражнений names: словарь {упражнение: ExerciseProgress} по алфавиту.
+        """
+        return {name: self.progress(name) for name in sorted(names)}
+
+    def history(self, names, start_minutes, end_minutes):
+        """
+        Подходы упражнений names за диапазон времени, которые обновили рекорд e1RM, в порядке времени.
+        """
+        events = []
+        for name in names:
+            events.extend(record for record in self.progress(name).history
+                          if start_minutes <= record.minutes <= end_minutes)
+        events.sort(key=lambda record: record.minutes)
+        return events
+
+
+def progress_lines(records):
+    """
+    Строки отчета по рекордам упражнений (словарь ProgressTracker.records): лучший вес, объем и e1RM
+    по каждой формуле и лучшие подходы по диапазонам повторений.
+    """
+    lines = []
+    for exercise, progress in records.items():
+        if progress.best_weight is None:
+            continue
+        best = progress.best_weight
+        lines.append(f"{exercise}: лучший вес {best.weight_str} кг x {best.repetitions} ({best.datetime_str})")
+        volume = progress.best_volume
+        lines.append(f"    Лучший объем подхода: {volume.weight_str} кг x {volume.repetitions} = {volume.volume:.1f} кг")
+        estimates = [f"{FORMULA_NAMES[formula]} {value:.1f} кг"
+                     for formula, (value, record) in progress.best_e1rm.items() if record is not None]
+        if estimates:
+            lines.append(f"    e1RM: {', '.join(estimates)}")
+        ranges = [f"{range_label(index)}: {record.weight_str} кг x {record.repetitions}"
+                  for index, record in enumerate(progress.ranges) if record is not None]
+        lines.append(f"    По повторениям: {'; '.join(ranges)}")
+    return lines
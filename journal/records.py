@@ -0,0 +1,229 @@
+"""
+Типизированное представление записей журнала тренировок.
+
+В файле журнала запись хранится как словарь строк: {'datetime': '26/11/2024 07:11', 'exercise': 'Отжимания',
+'weight': '110', 'repetitions': '4'}. В памяти каждая запись представлена компактным объектом Record
+с __slots__, поля которого разобраны один раз при загрузке:
+- id: постоянный уникальный номер записи (хранится в файле журнала в поле 'id');
+- minutes: дата и время тренировки в минутах от 01/01/1970 00:00 (целое число);
+- exercise: название упражнения (строка интернируется, одинаковые названия занимают память один раз);
+- weight: вес (число с плавающей точкой);
+- repetitions: количество повторений (целое число).
+
+Строки из записи формируются только для отображения и сохранения в файл.
+
+Дата и время в файле журнала хранятся в одном из форматов (TIMESTAMP_FORMATS):
+- 'legacy': строка 'ДД/ММ/ГГГГ ЧЧ:ММ' в поле 'datetime' (формат всех существующих журналов);
+- 'iso': строка 'ГГГГ-ММ-ДДTЧЧ:ММ' (ISO 8601) в поле 'datetime' - сортируется как строка;
+- 'epoch': целое число минут от начала эпохи в поле 'minutes' - не требует разбора.
+При чтении формат каждой записи определяется по ней самой, поэтому журналы всех форматов читаются одинаково.
+
+Строки дат разбираются срезами фиксированных позиций и int() без регулярных выражений и datetime.strptime.
+Результаты разбора кэшируются (PARSE_CACHE_SIZE строк): в журнале все подходы одной тренировки обычно
+имеют одно и то же время, а статистика и графики повторно разбирают одни и те же строки.
+"""
+
+import functools
+import re
+import sys
+from datetime import date, datetime, timedelta
+
+DATETIME_FORMAT = '%d/%m/%Y %H:%M'  # Формат даты и времени в журнале
+# Шаблон даты и времени без ведущих нулей (Д/М/ГГГГ Ч:ММ) - для строк, которые не подходят под быстрый разбор
+DATETIME_PATTERN = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4}) (\d{1,2}):(\d{1,2})')
+TIMESTAMP_FORMATS = ('legacy', 'iso', 'epoch')  # Форматы даты и времени в файле журнала
+PARSE_CACHE_SIZE = 65536  # Сколько разобранных строк дат хранится в кэше
+MINUTES_PER_DAY = 24 * 60
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def date_to_minutes(day):
+    """
+    Переводит дату (date или datetime) в минуты от начала эпохи на начало этого дня.
+    """
+    return (day.toordinal() - EPOCH_ORDINAL) * MINUTES_PER_DAY
+
+
+def datetime_to_minutes(moment):
+    """
+    Переводит объект datetime в минуты от начала эпохи (секунды отбрасываются).
+    """
+    return date_to_minutes(moment) + moment.hour * 60 + moment.minute
+
+
+def minutes_to_datetime(minutes):
+    """
+    Переводит минуты от начала эпохи в объект datetime.
+    """
+    return datetime(1970, 1, 1) + timedelta(minutes=minutes)
+
+
+def _to_minutes(year, month, day, hour, minute, text):
+    if hour > 23 or minute > 59:
+        raise ValueError(f"Некорректное время: {text!r}")
+    return (date(year, month, day).toordinal() - EPOCH_ORDINAL) * MINUTES_PER_DAY + hour * 60 + minute
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_datetime(text):
+    """
+    Разбирает строку даты и времени журнала (ДД/ММ/ГГГГ ЧЧ:ММ) в минуты от начала эпохи.
+    Строка фиксированной длины разбирается срезами и одним int(); строки без ведущих нулей (1/2/2024 7:05) -
+    заранее скомпилированным шаблоном. При неверном формате выбрасывается ValueError.
+    """
+    if len(text) == 16 and text[2] == '/' and text[5] == '/' and text[10] == ' ' and text[13] == ':':
+        digits = text[0:2] + text[3:5] + text[6:10] + text[11:13] + text[14:16]  # ДДММГГГГЧЧММ
+        if digits.isdigit() and digits.isascii():
+            number = int(digits)  # Одно преобразование вместо пяти
+            number, minute = divmod(number, 100)
+            number, hour = divmod(number, 100)
+            number, year = divmod(number, 10000)
+            day, month = divmod(number, 100)
+            return _to_minutes(year, month, day, hour, minute, text)
+    match = DATETIME_PATTERN.fullmatch(text)
+    if match is None or not text.isascii():
+        raise ValueError(f"Дата {text!r} не соответствует формату ДД/ММ/ГГГГ ЧЧ:ММ")
+    day, month, year, hour, minute = map(int, match.groups())
+    return _to_minutes(year, month, day, hour, minute, text)
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_iso_datetime(text):
+    """
+    Разбирает строку даты и времени ISO 8601 (ГГГГ-ММ-ДДTЧЧ:ММ) в минуты от начала эпохи.
+    При неверном формате выбрасывается ValueError.
+    """
+    if len(text) == 16 and text[4] == '-' and text[7] == '-' and text[10] == 'T' and text[13] == ':':
+        digits = text[0:4] + text[5:7] + text[8:10] + text[11:13] + text[14:16]  # ГГГГММДДЧЧММ
+        if digits.isdigit() and digits.isascii():
+            number = int(digits)
+            number, minute = divmod(number, 100)
+            number, hour = divmod(number, 100)
+            year, number = divmod(number, 10000)
+            month, day = divmod(number, 100)
+            return _to_minutes(year, month, day, hour, minute, text)
+    raise ValueError(f"Дата {text!r} не соответствует формату ГГГГ-ММ-ДДTЧЧ:ММ")
+
+
+def parse_timestamp(text):
+    """
+    Разбирает строку даты и времени из файла журнала в формате 'legacy' или 'iso'.
+    """
+    if len(text) > 4 and text[4] == '-':
+        return parse_iso_datetime(text)
+    return parse_datetime(text)
+
+
+def timestamp_format_of(entry):
+    """
+    Формат даты и времени записи из файла журнала (словаря): 'epoch', 'iso' или 'legacy'.
+    """
+    if 'minutes' in entry:
+        return 'epoch'
+    text = entry.get('datetime', '')
+    return 'iso' if len(text) > 4 and text[4] == '-' else 'legacy'
+
+
+def format_datetime(minutes):
+    """
+    Формирует строку даты и времени журнала (ДД/ММ/ГГГГ ЧЧ:ММ) из минут от начала эпохи.
+    """
+    days, minute_of_day = divmod(minutes, MINUTES_PER_DAY)
+    day = date.fromordinal(EPOCH_ORDINAL + days)
+    hour, minute = divmod(minute_of_day, 60)
+    return f"{day.day:02}/{day.month:02}/{day.year} {hour:02}:{minute:02}"
+
+
+def format_iso_datetime(minutes):
+    """
+    Формирует строку даты и времени ISO 8601 (ГГГГ-ММ-ДДTЧЧ:ММ) из минут от начала эпохи.
+    """
+    days, minute_of_day = divmod(minutes, MINUTES_PER_DAY)
+    day = date.fromordinal(EPOCH_ORDINAL + days)
+    hour, minute = divmod(minute_of_day, 60)
+    return f"{day.year:04}-{day.month:02}-{day.day:02}T{hour:02}:{minute:02}"
+
+
+def format_weight(weight):
+    """
+    Формирует строку веса: целые значения выводятся без дробной части ("110", "62.5").
+    """
+    text = repr(float(weight))
+    return text[:-2] if text.endswith('.0') else text
+
+
+class Record:
+    """
+    Запись о выполненном подходе.
+    """
+    __slots__ = ('id', 'minutes', 'exercise', 'weight', 'repetitions')
+
+    def __init__(self, minutes, exercise, weight, repetitions, id=None):
+        self.id = id  # Номер записи назначает хранилище при добавлении
+        self.minutes = minutes
+        self.exercise = sys.intern(exercise)
+        self.weight = weight
+        self.repetitions = repetitions
+
+    @classmethod
+    def from_dict(cls, entry):
+        """
+        Создает запись из словаря строк в формате файла журнала. В старых журналах поля 'id' нет.
+        Дата и время - поле 'minutes' (формат 'epoch') или строка 'datetime' (форматы 'legacy' и 'iso').
+        """
+        record_id = entry.get('id')
+        minutes = entry.get('minutes')
+        if minutes is None:
+            text = entry['datetime']
+            minutes = parse_iso_datetime(text) if text[4:5] == '-' else parse_datetime(text)
+        return cls(
+            int(minutes),
+            entry['exercise'],
+            float(entry['weight']),
+            int(entry['repetitions']),
+            int(record_id) if record_id is not None else None
+        )
+
+    def to_dict(self, timestamp_format='legacy'):
+        """
+        Возвращает запись в виде словаря в формате файла журнала: номер записи и строки полей.
+        Дата и время записываются в формате timestamp_format (см. TIMESTAMP_FORMATS).
+        """
+        if timestamp_format == 'epoch':
+            timestamp = ('minutes', self.minutes)
+        elif timestamp_format == 'iso':
+            timestamp = ('datetime', format_iso_datetime(self.minutes))
+        else:
+            timestamp = ('datetime', self.datetime_str)
+        return {
+            'id': self.id,
+            timestamp[0]: timestamp[1],
+            'exercise': self.exercise,
+            'weight': self.weight_str,
+            'repetitions': str(self.repetitions)
+        }
+
+    @property
+    def datetime_str(self):
+        return format_datetime(self.minutes)
+
+    @property
+    def weight_str(self):
+        return format_weight(self.weight)
+
+    @property
+    def volume(self):
+        """
+        Объем подхода: вес, умноженный на количество повторений.
+        """
+        return self.weight * self.repetitions
+
+    def values(self):
+        """
+        Значения записи в виде строк для отображения в таблице: дата, упражнение, вес, повторения.
+        """
+        return self.datetime_str, self.exercise, self.weight_str, str(self.repetitions)
+
+    def __repr__(self):
+        return (f"Record({self.datetime_str!r}, {self.exercise!r}, {self.weight!r}, {self.repetitions!r}, "
+                f"id={self.id!r})")
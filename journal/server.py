@@ -0,0 +1,301 @@
+"""
+Локальный сервер журнала тренировок: операции JournalEngine по HTTP/JSON на asyncio.
+
+Запуск: python -m journal [--journal ФАЙЛ] serve [--host 127.0.0.1] [--port 8765]
+
+Журнал загружается один раз при запуске и остается в памяти, поэтому запросы не перечитывают файл.
+Запросы (даты фильтра --from/--to - ДД/ММ/ГГГГ или ГГГГ-ММ-ДД, как в командной строке):
+- GET /records?from=&to=&exercise=&offset=0&limit=1000 - записи по фильтру в порядке времени:
+{"total": количество, "records": [{"id", "datetime", "exercise", "weight", "repetitions"}, ...]};
+- POST /records - добавить запись, тело {"datetime": "26/11/2024 07:11", "exercise": "Присед", "weight": "100",
+"repetitions": "5"}; ответ 201 с добавленной записью;
+- GET /stats?from=&to=&exercise= - статистика: {"weight", "repetitions", "exercises"};
+- GET /exercises - названия упражнений;
+- GET /charts/weight.png, GET /charts/repetitions.png (с тем же фильтром) - графики PNG.
+Ошибки возвращаются в JSON {"error": описание}: 400 - неверный запрос или значения полей, 404 - неизвестный путь
+или нет данных для графика, 405 - неподдерживаемый метод.
+
+Чтения выполняются в пуле потоков цикла событий, поэтому цикл событий не ждет хранилище и продолжает
+принимать соединения и отвечать на уже готовые запросы. Параллельными чтения от этого не становятся: каждый
+вызов хранилища выполняется под его блокировкой (RLock), так что чтения журнала идут по очереди друг с другом
+и с добавлениями и сохранением писателя. Вне блокировки выполняются только преобразование записей в JSON
+и рисование графиков (графики строятся по очереди под блокировкой сервиса графиков).
+Записи проходят через единственную задачу-писатель: запросы на добавление ставятся в очередь, писатель
+забирает все накопившиеся запросы, добавляет записи и сохраняет журнал одной записью на диск (хранилище
+в режиме write_behind, journal/store.py), после чего отвечает на все запросы пачки. Ошибка добавления
+или сохранения возвращается в ответах на запросы пачки (400 для неверных значений полей, иначе 500),
+а писатель продолжает работу.
+
+Сервер поддерживает HTTP/1.1 с постоянными соединениями (keep-alive) и предназначен только для локального
+использования: аутентификации и шифрования нет.
+"""
+
+import asyncio
+import contextlib
+import json
+from urllib.parse import parse_qs, urlsplit
+
+from journal.engine import make_filter, parse_date
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+MAX_HEADER_SIZE = 64 * 1024  # Наибольший размер строки запроса и заголовков, байт
+MAX_BODY_SIZE = 1024 * 1024  # Наибольший размер тела запроса, байт
+RECORDS_LIMIT = 1000  # Количество записей в ответе /records по умолчанию
+WRITE_BATCH = 1000  # Наибольшее количество добавлений, сохраняемых одной записью на диск
+RECORD_FIELDS = ('datetime', 'exercise', 'weight', 'repetitions')
+CHARTS = {'/charts/weight.png': 0, '/charts/repetitions.png': 1}  # Путь -> номер графика в render_charts
+REASONS = {200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class HttpError(Exception):
+    """
+    Ошибка запроса: код ответа HTTP и описание.
+    """
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def json_response(data, status=200):
+    return status, 'application/json; charset=utf-8', json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+def request_filter(query):
+    """
+    Фильтр записей из параметров запроса from, to и exercise.
+    """
+    start_date = parse_date(query['from']) if query.get('from') else None
+    end_date = parse_date(query['to']) if query.get('to') else None
+    return make_filter(start_date, end_date, query.get('exercise', ''))
+
+
+def int_parameter(query, name, default):
+    try:
+        value = int(query.get(name, default))
+    except ValueError:
+        raise ValueError(f"Параметр {name} должен быть целым числом")
+    if value < 0:
+        raise ValueError(f"Параметр {name} не может быть отрицательным")
+    return value
+
+
+class JournalServer:
+    """
+    HTTP сервер журнала: чтения в пуле потоков, записи через одну задачу-писатель.
+    """
+    def __init__(self, engine, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.engine = engine
+        self.host = host
+        self.port = port  # 0 - любой свободный порт; после start - фактический порт
+        self._server = None
+        self._writes = None  # Очередь добавлений: (поля записи, future ответа)
+        self._writer_task = None
+        self.routes = {
+            '/records': {'GET': self.get_records, 'POST': self.post_record},
+            '/stats': {'GET': self.get_stats},
+            '/exercises': {'GET': self.get_exercises},
+        }
+        for path in CHARTS:
+            self.routes[path] = {'GET': self.get_chart}
+
+    async def start(self):
+        """
+        Запускает задачу-писатель и начинает принимать соединения.
+        """
+        self._writes = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._writer())
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_HEADER_SIZE)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        """
+        Останавливает сервер и задачу-писатель и сохраняет журнал.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._writer_task
+        await asyncio.get_running_loop().run_in_executor(None, self.engine.save)
+
+    async def _read(self, func, *args):
+        """
+        Выполняет чтение журнала в пуле потоков, не задерживая цикл событий.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def _writer(self):
+        """
+        Единственная задача, которая меняет журнал: добавляет записи пачками и сохраняет каждую пачку
+        одной записью на диск.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._writes.get()]
+            while len(batch) < WRITE_BATCH and not self._writes.empty():
+                batch.append(self._writes.get_nowait())
+            try:
+                results = await loop.run_in_executor(None, self._apply, [fields for fields, future in batch])
+            except Exception as e:  # Писатель не должен останавливаться: иначе следующие добавления не получат ответа
+                results = [e] * len(batch)
+            for (fields, future), result in zip(batch, results):
+                if future.cancelled():
+                    continue  # Клиент отключился, не дождавшись ответа
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def _apply(self, batch):
+        """
+        Добавляет записи пачки и сохраняет журнал (в рабочем потоке). Возвращает для каждой записи
+        добавленную запись или исключение: ошибка одной записи не мешает остальным, а ошибка сохранения
+        возвращается для всех записей пачки.
+        """
+        results = []
+        for fields in batch:
+            try:
+                results.append(self.engine.add(*fields))
+            except Exception as e:
+                results.append(e)
+        try:
+            self.engine.save()
+        except Exception as e:
+            return [result if isinstance(result, Exception) else e for result in results]
+        return results
+
+    async def _handle(self, reader, writer):
+        """
+        Обслуживает одно соединение: запросы читаются и выполняются по очереди, пока клиент
+        не закроет соединение.
+        """
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, *json_response({'error': "Слишком длинный заголовок"}, 413), False)
+                    break
+                keep_alive = True
+                try:
+                    method, target, version, headers = self._parse_head(head)
+                    keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                    length = int(headers.get('content-length', 0))
+                    if length > MAX_BODY_SIZE:
+                        raise HttpError(413, "Слишком большое тело запроса")
+                    body = await reader.readexactly(length) if length else b''
+                    response = await self._dispatch(method, target, body)
+                except HttpError as e:
+                    keep_alive = False
+                    response = json_response({'error': str(e)}, e.status)
+                except ValueError:
+                    keep_alive = False
+                    response = json_response({'error': "Неверный запрос"}, 400)
+                await self._respond(writer, *response, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    @staticmethod
+    def _parse_head(head):
+        request_line, *header_lines = head.decode('latin-1').rstrip('\r\n').split('\r\n')
+        method, target, version = request_line.split(' ')
+        headers = {}
+        for line in header_lines:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        return method, target, version, headers
+
+    async def _respond(self, writer, status, content_type, body, keep_alive):
+        head = (f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def _dispatch(self, method, target, body):
+        """
+        Выполняет запрос и возвращает (код ответа, тип содержимого, тело).
+        """
+        url = urlsplit(target)
+        methods = self.routes.get(url.path)
+        if methods is None:
+            return json_response({'error': f"Неизвестный путь: {url.path}"}, 404)
+        handler = methods.get(method)
+        if handler is None:
+            return json_response({'error': f"Метод {method} не поддерживается"}, 405)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            return await handler(url.path, query, body)
+        except HttpError as e:
+            return json_response({'error': str(e)}, e.status)
+        except ValueError as e:  # Неверные значения фильтра или полей записи
+            return json_response({'error': str(e)}, 400)
+        except Exception as e:
+            return json_response({'error': f"Внутренняя ошибка: {e}"}, 500)
+
+    async def get_records(self, path, query, body):
+        record_filter = request_filter(query)
+        offset = int_parameter(query, 'offset', 0)
+        limit = int_parameter(query, 'limit', RECORDS_LIMIT)
+
+        def page():
+            records = self.engine.select(record_filter)
+            return len(records), [record.to_dict() for record in records[offset:offset + limit]]
+        total, records = await self._read(page)
+        return json_response({'total': total, 'records': records})
+
+    async def post_record(self, path, query, body):
+        try:
+            data = json.loads(body)
+        except ValueError:
+            raise HttpError(400, "Тело запроса должно быть объектом JSON")
+        if not isinstance(data, dict):
+            raise HttpError(400, "Тело запроса должно быть объектом JSON")
+        future = asyncio.get_running_loop().create_future()
+        await self._writes.put(([data.get(field, '') for field in RECORD_FIELDS], future))
+        record = await future
+        return json_response(record.to_dict(), 201)
+
+    async def get_stats(self, path, query, body):
+        total_weight, total_repetitions, exercises = await self._read(self.engine.statistics, request_filter(query))
+        return json_response({'weight': total_weight, 'repetitions': total_repetitions, 'exercises': exercises})
+
+    async def get_exercises(self, path, query, body):
+        return json_response(list(await self._read(self.engine.exercise_names)))
+
+    async def get_chart(self, path, query, body):
+        charts = await self._read(self.engine.render_charts, request_filter(query))
+        if charts is None:
+            raise HttpError(404, "Нет данных для отображения графиков")
+        return 200, 'image/png', charts[CHARTS[path]].png
+
+
+async def serve(engine, host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None):
+    """
+    Запускает сервер журнала и обслуживает запросы до отмены. ready(server) вызывается,
+    когда сервер начал принимать соединения.
+    """
+    server = JournalServer(engine, host, port)
+    await server.start()
+    if ready:
+        ready(server)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
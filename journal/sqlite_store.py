@@ -0,0 +1,434 @@
+"""
+Хранилище журнала тренировок в базе данных SQLite.
+
+В отличие от JournalStore, записи не загружаются в память целиком: каждая выборка, статистика и ряды
+для графиков выполняются параметризованным запросом к базе, а редактирование и удаление меняют одну
+строку таблицы. Поэтому размер журнала не ограничен объемом памяти, а изменения не переписывают файл.
+
+Схема базы:
+- records(id, minutes, exercise, weight, repetitions, fingerprint) - записи; minutes - время подхода в минутах
+от начала эпохи (целое число, сортируется в порядке времени, в отличие от строки ДД/ММ/ГГГГ ЧЧ:ММ);
+fingerprint - отпечаток записи для поиска повторов (journal/fingerprints.py);
+- индексы records_minutes (minutes) и records_exercise_minutes (exercise, minutes) - для выборки
+диапазона дат по всем упражнениям и по выбранным упражнениям; records_fingerprint (fingerprint) - для поиска
+повторов при импорте и добавлении. В базах, созданных до появления отпечатков, столбец добавляется
+и заполняется при первом открытии;
+- meta(key, value) - служебные значения (например, отметка о переносе данных из JSON).
+
+База открывается в режиме WAL (журнал с упреждающей записью SQLite): чтение не блокируется записью,
+а фиксация транзакции дописывает изменения в журнал, не переписывая файл базы.
+
+Перенос из JSON: если указан migrate_from (файл журнала JSON) и база создается впервые, записи файла
+переносятся в базу одной транзакцией. Отметка о переносе хранится в meta, поэтому перенос выполняется один раз.
+"""
+
+import errno
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+from journal.analytics import ColumnarJournal
+from journal.fingerprints import record_fingerprint, record_fingerprints
+from journal.progression import ProgressTracker
+from journal.records import Record
+from journal.storage import Storage, synchronized
+
+PAGE_SIZE = 256  # Количество записей, читаемых за один запрос при просмотре таблицы
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    minutes INTEGER NOT NULL,
+    exercise TEXT NOT NULL,
+    weight REAL NOT NULL,
+    repetitions INTEGER NOT NULL,
+    fingerprint INTEGER
+);
+CREATE INDEX IF NOT EXISTS records_minutes ON records (minutes);
+CREATE INDEX IF NOT EXISTS records_exercise_minutes ON records (exercise, minutes);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+RECORD_COLUMNS = 'id, minutes, exercise, weight, repetitions'
+INSERT_RECORD = f'INSERT INTO records ({RECORD_COLUMNS}, fingerprint) VALUES (?, ?, ?, ?, ?, ?)'
+FINGERPRINT_CHUNK = 500  # Количество отпечатков в одном запросе (ограничение числа параметров SQLite)
+
+
+def _record(row):
+    record_id, minutes, exercise, weight, repetitions = row
+    return Record(minutes, exercise, weight, repetitions, record_id)
+
+
+def _row(record, fingerprint):
+    return record.id, record.minutes, record.exercise, record.weight, record.repetitions, fingerprint
+
+
+class SqliteRecords:
+    """
+    Записи базы, упорядоченные по времени, с доступом по индексу. Записи читаются страницами
+    по PAGE_SIZE строк по мере обращения (таблица показывает только видимые строки).
+    """
+    def __init__(self, store):
+        self.store = store
+        self._length = store.count()
+        self._pages = {}  # Номер страницы -> список записей
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        page_number, position = divmod(index, PAGE_SIZE)
+        page = self._pages.get(page_number)
+        if page is None:
+            page = self._pages[page_number] = self.store.page(page_number * PAGE_SIZE, PAGE_SIZE)
+        return page[position]
+
+    def __iter__(self):
+        for index in range(self._length):
+            yield self[index]
+
+
+class SqliteStore(Storage):
+    """
+    Хранилище записей журнала тренировок в базе данных SQLite (реализация интерфейса Storage).
+    """
+    def __init__(self, path, migrate_from=None, read_only=False):
+        self.path = path
+        self.migrate_from = migrate_from  # Файл JSON для однократного переноса записей
+        self.read_only = read_only  # База открывается только для чтения: без создания таблиц и переноса
+        self.version = 0  # Увеличивается при каждом изменении записей
+        self.lock = threading.RLock()
+        self._connection = None
+        self._data_version = None  # PRAGMA data_version: меняется при изменении базы другим соединением
+        self._names = None  # Названия упражнений и версия журнала, для которой они прочитаны
+        self._names_version = None
+        self._columns = None
+        self._columns_version = None
+        # Рекорды по упражнениям: упражнение пересчитывается запросом по индексу (exercise, minutes)
+        self._progress = ProgressTracker(self._exercise_records)
+        self._progress_version = None
+
+    def _connect(self):
+        # Соединение используется из разных потоков, доступ к нему сериализуется блокировкой lock
+        if self.read_only:
+            self._connection = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True, check_same_thread=False)
+            self._data_version = None
+            return
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.executescript(SCHEMA)
+        self._connection = connection
+        self._data_version = None
+        self._add_fingerprints()
+
+    def _add_fingerprints(self):
+        """
+        Добавляет столбец отпечатков в базу, созданную до его появления, заполняет отпечатки записей,
+        у которых их нет, и создает индекс по отпечаткам.
+        """
+        columns = [row[1] for row in self._connection.execute('PRAGMA table_info(records)')]
+        with self._connection:
+            if 'fingerprint' not in columns:
+                self._connection.execute('ALTER TABLE records ADD COLUMN fingerprint INTEGER')
+            rows = self._connection.execute(
+                f'SELECT {RECORD_COLUMNS} FROM records WHERE fingerprint IS NULL').fetchall()
+            if rows:
+                records = [_record(row) for row in rows]
+                self._connection.executemany(
+                    'UPDATE records SET fingerprint = ? WHERE id = ?',
+                    zip(record_fingerprints(records).tolist(), (record.id for record in records)))
+            self._connection.execute('CREATE INDEX IF NOT EXISTS records_fingerprint ON records (fingerprint)')
+
+    @property
+    def records(self):
+        return self.ordered()
+
+    @property
+    def names_version(self):
+        return self.version
+
+    @synchronized
+    def load(self):
+        """
+        Открывает базу. Если базы нет, но есть файл JSON для переноса, база создается и записи
+        переносятся в нее. Если нет ни базы, ни файла для переноса, выбрасывается FileNotFoundError.
+        Если база была изменена другим соединением, версия журнала увеличивается.
+        """
+        if self._connection is None:
+            if not os.path.exists(self.path):
+                if self.read_only or not (self.migrate_from and os.path.exists(self.migrate_from)):
+                    raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), self.path)
+            self._connect()
+            if not self.read_only:
+                self._migrate()
+        data_version = self._connection.execute('PRAGMA data_version').fetchone()[0]
+        if data_version != self._data_version:
+            self._data_version = data_version
+            self.version += 1
+        return self.records
+
+    def _migrate(self):
+        """
+        Однократно переносит записи из файла JSON в базу.
+        """
+        if not self.migrate_from or not os.path.exists(self.migrate_from):
+            return
+        if self._connection.execute("SELECT 1 FROM meta WHERE key = 'migrated_from'").fetchone():
+            return
+        from journal.store import JournalStore
+        source = JournalStore(self.migrate_from, journal_mode=False, column_file=False, read_only=True)
+        source.load()
+        with self._connection:
+            records = list(source.records)
+            self._connection.executemany(INSERT_RECORD,
+                                         map(_row, records, record_fingerprints(records).tolist()))
+            self._connection.execute("INSERT INTO meta (key, value) VALUES ('migrated_from', ?)",
+                                     (os.path.abspath(self.migrate_from),))
+        self.version += 1
+
+    @synchronized
+    def create_empty(self):
+        """
+        Создает пустую базу (таблицы и индексы).
+        """
+        if self._connection is None:
+            self._connect()
+        with self._connection:
+            self._connection.execute('DELETE FROM records')
+        self.version += 1
+
+    @synchronized
+    def save(self, path=None):
+        """
+        Изменения фиксируются в базе сразу, поэтому сохранять в тот же файл нечего. Если указан другой путь,
+        в него записывается копия журнала: в формате JSON для файлов .json, иначе копия базы.
+        """
+        if path is None or os.path.abspath(path) == os.path.abspath(self.path):
+            return
+        if path.lower().endswith('.json'):
+            from journal.store import atomic_write_json
+            atomic_write_json(path, [record.to_dict() for record in self.snapshot()])
+            return
+        target = sqlite3.connect(path)
+        try:
+            self._connection.backup(target)
+        finally:
+            target.close()
+
+    @synchronized
+    def count(self):
+        return self._connection.execute('SELECT COUNT(*) FROM records').fetchone()[0]
+
+    @synchronized
+    def get(self, record_id):
+        row = self._connection.execute(
+            f'SELECT {RECORD_COLUMNS} FROM records WHERE id = ?', (record_id,)).fetchone()
+        return _record(row) if row else None
+
+    @synchronized
+    def extend(self, entries):
+        """
+        Добавляет записи одной транзакцией. Записям без номера (или с занятым номером) назначаются новые номера.
+        """
+        entries = list(entries)
+        if not entries:
+            return
+        next_id = self._connection.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM records').fetchone()[0]
+        assigned = set()
+        with self._connection:
+            for entry in entries:
+                if entry.id is None or entry.id in assigned or self._exists(entry.id):
+                    entry.id = next_id
+                assigned.add(entry.id)
+                next_id = max(next_id, entry.id + 1)
+            self._connection.executemany(INSERT_RECORD, map(_row, entries, record_fingerprints(entries).tolist()))
+        self.version += 1
+
+    def _exists(self, record_id):
+        return self._connection.execute('SELECT 1 FROM records WHERE id = ?', (record_id,)).fetchone() is not None
+
+    @synchronized
+    def update(self, record_id, new):
+        """
+        Заменяет запись одним запросом UPDATE. Если записи нет, выбрасывается KeyError.
+        """
+        with self._connection:
+            cursor = self._connection.execute(
+                'UPDATE records SET minutes = ?, exercise = ?, weight = ?, repetitions = ?, fingerprint = ? '
+                'WHERE id = ?',
+                (new.minutes, new.exercise, new.weight, new.repetitions, record_fingerprint(new), record_id))
+        if not cursor.rowcount:
+            raise KeyError(record_id)
+        new.id = record_id
+        self.version += 1
+
+    @synchronized
+    def remove(self, record_ids):
+        """
+        Удаляет записи запросами DELETE по номеру.
+        """
+        with self._connection:
+            cursor = self._connection.executemany('DELETE FROM records WHERE id = ?',
+                                                  ((record_id,) for record_id in record_ids))
+        if cursor.rowcount:
+            self.version += 1
+
+    def _exercise_records(self, name):
+        rows = self._connection.execute(
+            f'SELECT {RECORD_COLUMNS} FROM records WHERE exercise = ? ORDER BY minutes, id', (name,))
+        return [_record(row) for row in rows]
+
+    def _current_progress(self):
+        """
+        Рекорды по упражнениям, сброшенные, если журнал изменился (в том числе другим соединением).
+        """
+        if self._progress_version != self.version:
+            self._progress.reset()
+            self._progress_version = self.version
+        return self._progress
+
+    @synchronized
+    def personal_records(self, exercise_filter=None):
+        names = self._match(exercise_filter) if exercise_filter else self.exercise_names()
+        return self._current_progress().records(names)
+
+    @synchronized
+    def record_history(self, start_minutes, end_minutes, exercise_filter=None):
+        names = self._match(exercise_filter) if exercise_filter else self.exercise_names()
+        return self._current_progress().history(names, start_minutes, end_minutes)
+
+    @synchronized
+    def fingerprint_counts(self, fingerprints):
+        """
+        Количество записей с каждым из отпечатков: запросы по индексу records_fingerprint
+        пачками по FINGERPRINT_CHUNK отпечатков.
+        """
+        fingerprints = list(fingerprints)
+        counts = {}
+        for start in range(0, len(fingerprints), FINGERPRINT_CHUNK):
+            chunk = fingerprints[start:start + FINGERPRINT_CHUNK]
+            counts.update(self._connection.execute(
+                f'SELECT fingerprint, COUNT(*) FROM records WHERE fingerprint IN ({", ".join("?" * len(chunk))}) '
+                'GROUP BY fingerprint', chunk))
+        return counts
+
+    def ordered(self):
+        return SqliteRecords(self)
+
+    @synchronized
+    def page(self, offset, limit):
+        """
+        Записи с offset по offset + limit в порядке времени.
+        """
+        rows = self._connection.execute(
+            f'SELECT {RECORD_COLUMNS} FROM records ORDER BY minutes, id LIMIT ? OFFSET ?', (limit, offset))
+        return [_record(row) for row in rows]
+
+    @synchronized
+    def snapshot(self):
+        rows = self._connection.execute(f'SELECT {RECORD_COLUMNS} FROM records ORDER BY minutes, id')
+        return [_record(row) for row in rows]
+
+    def _where(self, start_minutes, end_minutes, exercise_filter):
+        """
+        Условие WHERE и параметры запроса для диапазона времени и фильтра по упражнению.
+        Подстрока ищется без учета регистра по списку названий (LIKE в SQLite не различает
+        регистр только для латиницы), в запрос передается список подходящих названий.
+        """
+        condition = 'minutes BETWEEN ? AND ?'
+        parameters = [start_minutes, end_minutes]
+        if exercise_filter:
+            names = self._match(exercise_filter)
+            condition += f" AND exercise IN ({', '.join('?' * len(names))})" if names else ' AND 0'
+            parameters.extend(names)
+        return condition, parameters
+
+    def _match(self, exercise_filter):
+        """
+        Названия упражнений, содержащие подстроку exercise_filter без учета регистра.
+        """
+        query = exercise_filter.casefold()
+        return [name for name in self.exercise_names() if query in name.casefold()]
+
+    @synchronized
+    def select(self, start_minutes, end_minutes, exercise_filter=None):
+        condition, parameters = self._where(start_minutes, end_minutes, exercise_filter)
+        rows = self._connection.execute(
+            f'SELECT {RECORD_COLUMNS} FROM records WHERE {condition} ORDER BY minutes, id', parameters)
+        return [_record(row) for row in rows]
+
+    @synchronized
+    def statistics(self, start_minutes, end_minutes, exercise_filter=None):
+        """
+        Статистика за диапазон одним запросом с группировкой по упражнению.
+        """
+        condition, parameters = self._where(start_minutes, end_minutes, exercise_filter)
+        rows = self._connection.execute(
+            'SELECT exercise, SUM(weight * repetitions), SUM(repetitions), COUNT(*) '
+            f'FROM records WHERE {condition} GROUP BY exercise ORDER BY exercise', parameters)
+        total_weight = 0.0
+        total_repetitions = 0
+        exercises_stats = {}
+        for exercise, volume, repetitions, count in rows:
+            total_weight += volume
+            total_repetitions += repetitions
+            exercises_stats[exercise] = {'weight': volume, 'repetitions': repetitions, 'count': count}
+        return total_weight, total_repetitions, exercises_stats
+
+    @synchronized
+    def series(self, start_minutes, end_minutes, exercise_filter=None):
+        condition, parameters = self._where(start_minutes, end_minutes, exercise_filter)
+        rows = self._connection.execute(
+            f'SELECT minutes, weight, repetitions FROM records WHERE {condition} ORDER BY minutes, id',
+            parameters).fetchall()
+        if not rows:
+            return np.array([], dtype='datetime64[m]'), np.array([], dtype=np.float32), np.array([], dtype=np.int32)
+        minutes, weights, repetitions = zip(*rows)
+        return (
+            np.array(minutes, dtype=np.int64).astype('datetime64[m]'),
+            np.array(weights, dtype=np.float32),
+            np.array(repetitions, dtype=np.int32)
+        )
+
+    @synchronized
+    def columns(self):
+        """
+        Все записи в виде столбцов NumPy в порядке ordered(). Столбцы перестраиваются только после
+        изменения журнала.
+        """
+        if self._columns_version != self.version:
+            rows = self._connection.execute(
+                'SELECT minutes, weight, repetitions, exercise FROM records ORDER BY minutes, id').fetchall()
+            names = self.exercise_names()
+            codes = {name: code for code, name in enumerate(names)}
+            count = len(rows)
+            self._columns = ColumnarJournal(
+                np.fromiter((row[0] for row in rows), dtype=np.int64, count=count),
+                np.fromiter((row[1] for row in rows), dtype=np.float32, count=count),
+                np.fromiter((row[2] for row in rows), dtype=np.int32, count=count),
+                np.fromiter((codes[row[3]] for row in rows), dtype=np.int32, count=count),
+                names
+            )
+            self._columns_version = self.version
+        return self._columns
+
+    @synchronized
+    def exercise_names(self):
+        """
+        Названия упражнений читаются по индексу (exercise, minutes) и запоминаются до изменения журнала.
+        """
+        if self._names_version != self.version:
+            self._names = [row[0] for row in self._connection.execute(
+                'SELECT DISTINCT exercise FROM records ORDER BY exercise')]
+            self._names_version = self.version
+        return self._names
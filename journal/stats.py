@@ -0,0 +1,190 @@
+"""
+Инкрементальная статистика журнала тренировок.
+
+StatsEngine хранит для каждого упражнения суммы по дням: объем (вес x повторения), количество повторений
+и количество подходов. Суммы обновляются при добавлении, редактировании, удалении и импорте записей,
+поэтому статистика не пересчитывается по всем записям при каждом запросе.
+
+Для запроса за диапазон дат по каждому упражнению строятся префиксные суммы по дням (лениво, только
+для упражнений, которые изменились с прошлого запроса). Сумма за диапазон - разность двух префиксных
+сумм, найденных двоичным поиском, то есть O(log D) на упражнение вместо просмотра всех записей.
+
+При загрузке журнала из столбцового файла суммы пересчитываются векторно (rebuild_arrays): пары
+(упражнение, день) группируются np.unique, суммы считаются np.bincount. Записи складываются в том же
+порядке, что и при пересчете по списку записей, поэтому результаты совпадают.
+"""
+
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from journal.records import MINUTES_PER_DAY
+
+
+class _ExerciseStats:
+    """
+    Суммы одного упражнения по дням и префиксные суммы для запросов по диапазону дней.
+    """
+    __slots__ = ('days', '_sorted_days', '_prefix')
+
+    def __init__(self):
+        self.days = {}  # день (от начала эпохи) -> [объем, повторения, подходы]
+        self._sorted_days = None  # None, если префиксные суммы нужно пересчитать
+        self._prefix = None
+
+    def add(self, day, volume, repetitions, count):
+        totals = self.days.get(day)
+        if totals is None:
+            totals = self.days[day] = [0.0, 0, 0]
+        totals[0] += volume
+        totals[1] += repetitions
+        totals[2] += count
+        if totals[2] == 0:
+            del self.days[day]  # Убираем пустой день, чтобы не копить погрешность округления
+        self._sorted_days = None
+
+    def totals(self, start_day, end_day):
+        """
+        Суммы (объем, повторения, подходы) за дни [start_day, end_day].
+        """
+        if self._sorted_days is None:
+            self._rebuild_prefix()
+        low = bisect_left(self._sorted_days, start_day)
+        high = bisect_right(self._sorted_days, end_day, low)
+        first, last = self._prefix[low], self._prefix[high]
+        return last[0] - first[0], last[1] - first[1], last[2] - first[2]
+
+    def _rebuild_prefix(self):
+        self._sorted_days = sorted(self.days)
+        volume = repetitions = count = 0
+        prefix = [(0.0, 0, 0)]
+        for day in self._sorted_days:
+            day_volume, day_repetitions, day_count = self.days[day]
+            volume += day_volume
+            repetitions += day_repetitions
+            count += day_count
+            prefix.append((volume, repetitions, count))
+        self._prefix = prefix
+
+
+class StatsEngine:
+    """
+    Статистика журнала по упражнениям и дням.
+    """
+    def __init__(self, records=()):
+        self.rebuild(records)
+
+    def rebuild(self, records):
+        """
+        Полностью пересчитывает суммы по списку записей.
+        """
+        self._exercises = {}
+        for record in records:
+            exercise = self._exercises.get(record.exercise)
+            if exercise is None:
+                exercise = self._exercises[record.exercise] = _ExerciseStats()
+            day = record.minutes // MINUTES_PER_DAY
+            totals = exercise.days.get(day)
+            if totals is None:
+                exercise.days[day] = [record.weight * record.repetitions, record.repetitions, 1]
+            else:
+                totals[0] += record.weight * record.repetitions
+                totals[1] += record.repetitions
+                totals[2] += 1
+
+    def rebuild_arrays(self, minutes, weight, repetitions, exercise, names):
+        """
+        Полностью пересчитывает суммы по столбцам NumPy: время, вес (float64), повторения и номер
+        упражнения в списке names.
+        """
+        self._exercises = {}
+        if not len(minutes):
+            return
+        days = minutes // MINUTES_PER_DAY
+        first_day = int(days.min())
+        span = int(days.max()) - first_day + 1
+        keys = exercise.astype(np.int64) * span + (days - first_day)
+        unique, inverse = np.unique(keys, return_inverse=True)
+        repetitions = repetitions.astype(np.int64)
+        volume = np.bincount(inverse, weights=weight * repetitions)
+        repetitions_sum = np.bincount(inverse, weights=repetitions)
+        count = np.bincount(inverse)
+        for key, day_volume, day_repetitions, day_count in zip(
+                unique.tolist(), volume.tolist(), repetitions_sum.tolist(), count.tolist()):
+            code, day = divmod(key, span)
+            name = names[code]
+            exercise_stats = self._exercises.get(name)
+            if exercise_stats is None:
+                exercise_stats = self._exercises[name] = _ExerciseStats()
+            exercise_stats.days[first_day + day] = [day_volume, int(day_repetitions), day_count]
+
+    def add(self, record):
+        """
+        Учитывает запись в суммах.
+        """
+        self._change(record, 1)
+
+    def extend(self, records):
+        for record in records:
+            self._change(record, 1)
+
+    def remove(self, record):
+        """
+        Исключает запись из сумм.
+        """
+        self._change(record, -1)
+
+    def _change(self, record, sign):
+        exercise = self._exercises.get(record.exercise)
+        if exercise is None:
+            exercise = self._exercises[record.exercise] = _ExerciseStats()
+        exercise.add(record.minutes // MINUTES_PER_DAY, sign * record.volume,
+                     sign * record.repetitions, sign)
+        if not exercise.days:
+            del self._exercises[record.exercise]
+
+    def query(self, start_day, end_day, names=None):
+        """
+        Статистика за дни [start_day, end_day] (дни от начала эпохи) по упражнениям names
+        (по всем упражнениям, если names не задан).
+        Возвращает суммарный объем, суммарное количество повторений и словарь
+        {упражнение: {'weight': объем, 'repetitions': повторения, 'count': подходы}}
+        только для упражнений, выполнявшихся в этом диапазоне.
+        """
+        if names is None:
+            names = sorted(self._exercises)
+        total_weight = 0.0
+        total_repetitions = 0
+        exercises_stats = {}
+        for name in names:
+            exercise = self._exercises.get(name)
+            if exercise is None:
+                continue
+            volume, repetitions, count = exercise.totals(start_day, end_day)
+            if not count:
+                continue
+            total_weight += volume
+            total_repetitions += repetitions
+            exercises_stats[name] = {'weight': volume, 'repetitions': repetitions, 'count': count}
+        return total_weight, total_repetitions, exercises_stats
+
+
+def summarize(records):
+    """
+    Статистика по произвольному списку записей (просмотром всех записей) в том же виде,
+    что и StatsEngine.query.
+    """
+    total_weight = 0.0
+    total_repetitions = 0
+    exercises_stats = {}
+    for record in records:
+        volume = record.volume
+        total_weight += volume
+        total_repetitions += record.repetitions
+        stats = exercises_stats.get(record.exercise)
+        if stats is None:
+            stats = exercises_stats[record.exercise] = {'weight': 0.0, 'repetitions': 0, 'count': 0}
+        stats['weight'] += volume
+        stats['repetitions'] += record.repetitions
+        stats['count'] += 1
+    return total_weight, total_repetitions, dict(sorted(exercises_stats.items()))
@@ -0,0 +1,211 @@
+"""
+Общий интерфейс хранилищ журнала тренировок.
+
+Графический интерфейс работает с журналом только через методы класса Storage, поэтому способ хранения
+можно выбирать:
+- JournalStore (journal/store.py): файл JSON со снимком записей и журналом изменений, все записи и индексы
+в памяти;
+- SqliteStore (journal/sqlite_store.py): база данных SQLite с индексами по времени и по (упражнение, время);
+в памяти записи не держатся, выборки, статистика и ряды графиков выполняются запросами к базе.
+
+Функция open_storage выбирает хранилище по расширению файла: .db, .sqlite и .sqlite3 - SQLite, остальные - JSON.
+
+Время в хранилищах - минуты от начала эпохи (см. journal/records.py), фильтр по упражнению - подстрока
+названия без учета регистра. Все открытые методы хранилищ выполняются под блокировкой lock, так как
+хранилище используется и из главного потока, и из фоновых задач.
+"""
+
+import functools
+import os
+
+SQLITE_SUFFIXES = ('.db', '.sqlite', '.sqlite3')  # Расширения файлов базы данных SQLite
+
+
+def synchronized(method):
+    """
+    Выполняет метод хранилища под его блокировкой.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class Storage:
+    """
+    Интерфейс хранилища записей журнала тренировок.
+    Атрибуты: path - путь к файлу, version - увеличивается при каждом изменении записей,
+    lock - блокировка (threading.RLock).
+    """
+    @property
+    def records(self):
+        """
+        Все записи журнала (последовательность Record).
+        """
+        raise NotImplementedError
+
+    @property
+    def names_version(self):
+        """
+        Версия списка названий упражнений: меняется, когда список мог измениться.
+        """
+        raise NotImplementedError
+
+    def load(self):
+        """
+        Открывает журнал (перечитывает, если он изменился на диске) и возвращает записи.
+        Если файла нет, выбрасывается FileNotFoundError; при ошибке разбора - ValueError.
+        """
+        raise NotImplementedError
+
+    def create_empty(self):
+        """
+        Создает пустой журнал.
+        """
+        raise NotImplementedError
+
+    def save(self, path=None):
+        """
+        Сохраняет изменения, которых еще нет на диске. Если указан другой путь, записывает туда копию журнала.
+        """
+        raise NotImplementedError
+
+    def count(self):
+        """
+        Количество записей журнала.
+        """
+        raise NotImplementedError
+
+    def get(self, record_id):
+        """
+        Возвращает запись по номеру или None, если такой записи нет.
+        """
+        raise NotImplementedError
+
+    def add(self, entry):
+        """
+        Добавляет запись (Record) и назначает ей номер.
+        """
+        self.extend([entry])
+
+    def extend(self, entries):
+        """
+        Добавляет несколько записей одной операцией записи.
+        """
+        raise NotImplementedError
+
+    def update(self, record_id, new):
+        """
+        Заменяет запись с номером record_id записью new. Если записи нет, выбрасывается KeyError.
+        """
+        raise NotImplementedError
+
+    def remove(self, record_ids):
+        """
+        Удаляет записи с указанными номерами. Отсутствующие номера пропускаются.
+        """
+        raise NotImplementedError
+
+    def ordered(self):
+        """
+        Все записи, упорядоченные по времени: последовательность с len и доступом по индексу
+        (для таблицы с виртуальной прокруткой). Действительна до следующего изменения журнала.
+        """
+        raise NotImplementedError
+
+    def snapshot(self):
+        """
+        Все записи, упорядоченные по времени, в новом списке, который не меняется вместе с журналом.
+        """
+        raise NotImplementedError
+
+    def select(self, start_minutes, end_minutes, exercise_filter=None):
+        """
+        Записи за диапазон времени [start_minutes, end_minutes] по упражнениям, название которых
+        содержит exercise_filter, упорядоченные по времени (новый список).
+        """
+        raise NotImplementedError
+
+    def statistics(self, start_minutes, end_minutes, exercise_filter=None):
+        """
+        Статистика за диапазон времени: суммарный объем, суммарное количество повторений и словарь
+        {упражнение: {'weight': объем, 'repetitions': повторения, 'count': подходы}}.
+        """
+        raise NotImplementedError
+
+    def series(self, start_minutes, end_minutes, exercise_filter=None):
+        """
+        Ряды для графиков за диапазон времени: время (datetime64[m]), вес и количество повторений.
+        """
+        raise NotImplementedError
+
+    def columns(self):
+        """
+        Записи в порядке ordered() в виде столбцов NumPy (ColumnarJournal), например для сортировки таблицы.
+        """
+        raise NotImplementedError
+
+    def exercise_names(self):
+        """
+        Отсортированный список названий упражнений.
+        """
+        raise NotImplementedError
+
+    def personal_records(self, exercise_filter=None):
+        """
+        Личные рекорды (journal/progression.py) упражнений, название которых содержит exercise_filter:
+        словарь {упражнение: ExerciseProgress} по алфавиту.
+        """
+        raise NotImplementedError
+
+    def record_history(self, start_minutes, end_minutes, exercise_filter=None):
+        """
+        Подходы за диапазон времени, которые обновили рекорд e1RM своего упражнения, в порядке времени.
+        """
+        raise NotImplementedError
+
+    def fingerprint_counts(self, fingerprints):
+        """
+        Количество записей журнала с каждым из отпечатков (journal/fingerprints.py):
+        словарь {отпечаток: количество} только для найденных отпечатков.
+        """
+        raise NotImplementedError
+
+    def unsaved_changes(self):
+        """
+        Количество изменений в памяти, которые еще не записаны на диск (0 - все сохранено).
+        """
+        return 0
+
+    def needs_maintenance(self):
+        """
+        Есть ли работа для фонового обслуживания хранилища (maintain).
+        """
+        return False
+
+    def maintain(self):
+        """
+        Фоновое обслуживание хранилища (например, перестроение двоичного снимка). Вызывается в фоновой задаче.
+        """
+
+
+def open_storage(path, migrate_from=None, timestamp_format=None, write_behind=False, read_only=False):
+    """
+    Создает хранилище для файла path: SQLite для файлов .db, .sqlite, .sqlite3, иначе JSON.
+    migrate_from - файл журнала JSON, записи которого однократно переносятся в новую базу SQLite.
+    timestamp_format - формат даты и времени в файле JSON ('legacy', 'iso', 'epoch'; None - как в файле).
+    В базе SQLite время всегда хранится числом минут.
+    write_behind - откладывать запись изменений файла JSON до сохранения (save); в SQLite каждое изменение
+    фиксируется отдельной транзакцией сразу.
+    read_only - журнал только читается: файлы не сворачиваются, не переносятся и не дополняются
+    (например, чужие журналы в статистике команды).
+    """
+    if os.path.splitext(path)[1].lower() in SQLITE_SUFFIXES:
+        from journal.sqlite_store import SqliteStore
+        return SqliteStore(path, migrate_from, read_only=read_only)
+    from journal.store import JournalStore
+    if read_only:
+        return JournalStore(path, journal_mode=False, column_file=False, timestamp_format=timestamp_format,
+                            read_only=True)
+    return JournalStore(path, timestamp_format=timestamp_format, write_behind=write_behind)
@@ -0,0 +1,750 @@
+"""
+Хранилище журнала тренировок в памяти (реализация интерфейса Storage для файла JSON).
+
+Класс JournalStore загружает файл журнала один раз и держит записи в памяти. Повторное чтение
+файла выполняется только тогда, когда файл был изменен извне: изменение определяется по времени
+последней модификации и размеру файла. Хранилище - единственное место, где происходит обращение
+к файлу журнала на диске.
+
+Режим журналирования (journal_mode): новые записи не переписывают весь файл, а дописываются
+в журнал изменений (файл JSON-lines рядом с основным файлом, например "training_log.json.wal").
+При чтении журнал изменений накладывается на последний снимок (основной JSON файл).
+Когда журнал изменений превышает заданный размер, он сворачивается в новый снимок.
+
+В памяти записи хранятся в виде объектов Record (journal/records.py), которые создаются один раз при загрузке.
+У каждой записи есть постоянный уникальный номер (id); записи хранятся в словаре id -> запись, поэтому
+редактирование и удаление находят запись за O(1). Журналам без номеров записей номера назначаются
+при первой загрузке, и файл сразу перезаписывается с ними.
+Поверх записей поддерживаются индекс по дате и словарь упражнений (journal/index.py): диапазон дат выбирается
+двоичным поиском, а фильтр по названию упражнения проверяется только по различным названиям.
+Суммы для статистики по упражнениям и дням (journal/stats.py) и личные рекорды (journal/progression.py)
+также обновляются при каждом изменении.
+Для векторных вычислений и графиков хранилище строит столбцы NumPy (journal/analytics.py) - лениво,
+один раз на версию журнала.
+
+Столбцовый файл (journal/column_file.py, например "training_log.json.cols") - двоичная копия снимка JSON
+в виде столбцов. Если он построен по текущему снимку, при загрузке записи создаются из столбцов, открытых
+через mmap, без разбора JSON, а столбцы NumPy для аналитики берутся из него же. Если столбцового файла нет
+или он устарел, снимок читается из JSON, а столбцовый файл строится заново в фоне (maintain).
+Индекс отпечатков записей для поиска повторов (journal/fingerprints.py) строится при первом запросе -
+из столбца отпечатков столбцового файла, если записи в памяти совпадают со снимком, - и дальше обновляется
+при каждом изменении.
+
+Отложенная запись (write_behind): изменения не дописываются в журнал изменений сразу, а копятся в памяти
+и записываются группой при сохранении (save) - одной операцией записи со сбросом на диск (fsync) вместо
+отдельной записи на каждое изменение. Так работает графический интерфейс: серия быстрых добавлений
+сохраняется одной записью по таймеру (journal/autosave.py). До сохранения изменения есть только в памяти.
+Если файл журнала перечитывается после изменения извне, отложенные изменения не теряются: они дописываются
+в журнал изменений (если снимок прежний) или применяются заново к записям нового снимка.
+
+Формат даты и времени в файле (timestamp_format, см. journal/records.py): 'legacy' (ДД/ММ/ГГГГ ЧЧ:ММ),
+'iso' или 'epoch' (число минут). Если формат не задан, хранилище пишет в том же формате, в котором записан файл
+(определяется по началу файла), а новые журналы - в формате 'legacy'. Заданный формат используется для новых
+журналов, а существующий журнал переводится в него при следующей перезаписи снимка.
+
+Все записи на диск безопасны при сбоях: снимок пишется во временный файл, сбрасывается на диск
+(fsync) и атомарно переименовывается, а недописанная последняя строка журнала изменений
+при чтении отбрасывается.
+
+Хранилище используется и из главного потока интерфейса, и из фоновых задач (journal/tasks.py),
+поэтому открытые методы, которые читают или меняют записи, выполняются под общей блокировкой (lock).
+
+Формат журнала изменений: первая строка - заголовок {"op": "base", "snapshot": [mtime_ns, size]},
+который связывает журнал со снимком, поверх которого он пишется. Далее по одной операции в строке:
+{"op": "add", "record": {...}} - добавление, {"op": "put", "record": {...}} - изменение записи с тем же 'id',
+{"op": "del", "id": ...} - удаление записи. Если заголовок не совпадает с текущим снимком, журнал уже
+свернут в снимок (сбой между записью снимка и удалением журнала) и не применяется повторно.
+"""
+
+import contextlib
+import gc
+import json
+import os
+import re
+import tempfile
+import threading
+
+import numpy as np
+
+from journal.analytics import ColumnarJournal
+from journal.column_file import COLUMN_FILE_SUFFIX, open_column_file, write_column_file
+from journal.fingerprints import FingerprintIndex, record_fingerprint, record_fingerprints
+from journal.index import DateIndex, ExerciseIndex
+from journal.progression import ProgressTracker
+from journal.records import MINUTES_PER_DAY, TIMESTAMP_FORMATS, Record
+from journal.stats import StatsEngine
+from journal.storage import Storage, synchronized
+
+LOG_SUFFIX = '.wal'  # Суффикс файла журнала изменений
+COMPACT_LIMIT = 1024 * 1024  # Размер журнала изменений (в байтах), после которого он сворачивается в снимок
+
+
+def fsync_directory(path):
+    """
+    Сбрасывает на диск запись каталога, чтобы переименование файла пережило сбой питания.
+    На системах без O_DIRECTORY (Windows) ничего не делает.
+    """
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write_json(path, data):
+    """
+    Атомарная запись данных в JSON файл: временный файл + fsync + переименование.
+    Недописанный файл никогда не заменит существующий.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix='.tmp-', suffix='.json', dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as file:
+            json.dump(data, file, indent=4)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    fsync_directory(path)
+
+
+# Первое поле даты и времени в файле журнала: "minutes": (формат 'epoch') или "datetime": "ГГГГ-... ('iso')
+TIMESTAMP_PATTERN = re.compile(rb'"(minutes)"\s*:|"datetime"\s*:\s*"(\d{4}-)?')
+DETECT_SIZE = 4096  # Сколько байт в начале файла просматривается для определения формата даты
+
+
+def detect_timestamp_format(path):
+    """
+    Определяет формат даты и времени по первой записи файла журнала (или журнала изменений):
+    'legacy', 'iso' или 'epoch'. Возвращает None, если в начале файла записей нет.
+    """
+    with open(path, 'rb') as file:
+        head = file.read(DETECT_SIZE)
+    match = TIMESTAMP_PATTERN.search(head)
+    if match is None:
+        return None
+    if match.group(1):
+        return 'epoch'
+    return 'iso' if match.group(2) else 'legacy'
+
+
+@contextlib.contextmanager
+def gc_paused():
+    """
+    Отключает циклический сборщик мусора на время массового создания записей при загрузке: записи
+    не образуют циклов ссылок, а без этого сборщик многократно обходит миллионы новых объектов.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class JournalStore(Storage):
+    """
+    Хранилище записей журнала тренировок в файле JSON (реализация интерфейса Storage).
+    """
+    def __init__(self, path, journal_mode=True, compact_limit=COMPACT_LIMIT, column_file=True, timestamp_format=None,
+                 write_behind=False, read_only=False):
+        if timestamp_format is not None and timestamp_format not in TIMESTAMP_FORMATS:
+            raise ValueError(f"Неизвестный формат даты и времени: {timestamp_format}")
+        self.path = path
+        self.log_path = path + LOG_SUFFIX
+        self.column_path = path + COLUMN_FILE_SUFFIX if column_file else None
+        self.journal_mode = journal_mode
+        self.write_behind = write_behind
+        self.read_only = read_only  # Файлы журнала только читаются: без сворачивания, обрезки и удаления
+        self.compact_limit = compact_limit
+        self.timestamp_format = timestamp_format  # Заданный формат даты и времени в файле или None
+        self._file_timestamp_format = None  # Формат даты и времени прочитанного файла
+        self.version = 0  # Увеличивается при каждом изменении записей
+        self._records = {}  # Номер записи -> запись, в порядке добавления
+        self._next_id = 1  # Номер, который получит следующая добавленная запись
+        self.dates = DateIndex()  # Индекс записей по дате и времени
+        self.exercises = ExerciseIndex()  # Словарь упражнений
+        self.stats = StatsEngine()  # Суммы по упражнениям и дням
+        self.progress = ProgressTracker(self.exercises.records)  # Личные рекорды по упражнениям
+        self._columns = None  # Столбцы NumPy и версия журнала, для которой они построены
+        self._fingerprints = None  # Индекс отпечатков записей (FingerprintIndex), строится при первом запросе
+        self._columns_version = None
+        # Отметки состояния (время изменения, размер) снимка и журнала изменений
+        # на момент последнего чтения/записи
+        self._stamp = None
+        self._log_stamp = None
+        self._dirty = False  # В памяти есть изменения, которые требуют перезаписи снимка
+        self._pending_log = []  # Операции журнала изменений, которые еще не записаны (режим write_behind)
+        # Снимок, для которого нужно построить столбцовый файл: (отметка снимка JSON, записи снимка)
+        self._column_file_pending = None
+        # Блокировка для обращений из фоновых потоков (повторная: методы вызывают друг друга)
+        self.lock = threading.RLock()
+
+    def _file_stamp(self, path=None):
+        """
+        Возвращает отметку состояния файла: время последнего изменения и размер.
+        """
+        stat = os.stat(path or self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    @property
+    def write_format(self):
+        """
+        Формат даты и времени, в котором записи пишутся в файл.
+        """
+        return self.timestamp_format or self._file_timestamp_format or 'legacy'
+
+    def _current_log_stamp(self):
+        try:
+            return self._file_stamp(self.log_path)
+        except FileNotFoundError:
+            return None
+
+    @property
+    def records(self):
+        """
+        Записи журнала в памяти (без обращения к диску) в порядке добавления.
+        """
+        return self._records.values()
+
+    @property
+    def names_version(self):
+        return self.exercises.names_version
+
+    def count(self):
+        return len(self.dates)
+
+    @synchronized
+    def get(self, record_id):
+        """
+        Возвращает запись по номеру или None, если такой записи нет.
+        """
+        return self._records.get(record_id)
+
+    @synchronized
+    def load(self):
+        """
+        Возвращает записи журнала. Файлы читаются заново, только если они изменились с момента
+        последнего чтения. Если файла нет, выбрасывается FileNotFoundError; при ошибке разбора
+        журнал считается пустым и выбрасывается ValueError (json.JSONDecodeError для ошибок JSON).
+        """
+        stamp = self._file_stamp()
+        log_stamp = self._current_log_stamp()
+        if stamp == self._stamp and log_stamp == self._log_stamp:
+            return self.records
+        pending = self._pending_log
+        if pending and stamp == self._stamp:
+            # Журнал изменений дописан извне, снимок прежний: несохраненные изменения дописываются
+            # до повторного чтения
+            self._flush_log()
+            stamp = self._file_stamp()
+            log_stamp = self._current_log_stamp()
+            pending = []
+
+        with gc_paused():
+            migrated = self._read(stamp, log_stamp)
+        if pending:
+            # Снимок заменен извне: журнал изменений прежнего снимка при чтении отбрасывается, поэтому
+            # несохраненные изменения применяются к новым записям заново
+            self._reapply(pending)
+        if migrated and not self.read_only:
+            # Старый журнал без номеров записей: сохраняем назначенные номера
+            self.compact()
+        return self.records
+
+    def _read(self, stamp, log_stamp):
+        """
+        Читает снимок (из столбцового файла или JSON) и журнал изменений и заменяет записи в памяти.
+        Возвращает True, если записям пришлось назначать номера.
+        """
+        # Формат даты определяется по снимку, а для пустого снимка - по журналу изменений
+        self._file_timestamp_format = (detect_timestamp_format(self.path)
+                                       or (detect_timestamp_format(self.log_path) if log_stamp else None))
+        column_file = open_column_file(self.column_path, stamp) if self.column_path else None
+        if column_file is not None:
+            # Снимок из столбцового файла: без разбора JSON
+            data = column_file.records()
+        else:
+            try:
+                with open(self.path, 'r') as file:
+                    data = self._parse_records(json.load(file))
+            except ValueError:
+                # Запоминаем состояние файла, чтобы не разбирать его повторно при каждом обращении
+                self._set_records({}, stamp, log_stamp)
+                raise
+
+        records = {}
+        migrated = self._assign_ids(data, records)
+        replayed = log_stamp is not None
+        if replayed:
+            migrated = self._replay_log(stamp, records) or migrated
+            log_stamp = self._current_log_stamp()
+
+        # Если журнал изменений не применялся, записи совпадают со столбцовым файлом:
+        # суммы и столбцы для аналитики строятся по его столбцам
+        self._set_records(records, stamp, log_stamp, column_file if not replayed else None)
+        if column_file is not None:
+            column_file.close()
+        elif self.column_path and not migrated:
+            self._column_file_pending = (stamp, data)
+        return migrated
+
+    def _use_column_file(self, records, column_file):
+        """
+        Строит индексы, суммы статистики и столбцы NumPy для аналитики по столбцовому файлу
+        (records - те же записи в том же порядке). Порядок по времени - устойчивая сортировка
+        np.argsort, как в индексе дат; суммы считаются векторно.
+        """
+        order = np.argsort(column_file.minutes, kind='stable')
+        self.dates.rebuild([records[index] for index in order.tolist()], presorted=True)
+        self.exercises.rebuild(self.dates, presorted=True)
+        self.stats.rebuild_arrays(column_file.minutes, column_file.weight, column_file.repetitions,
+                                  column_file.exercise, column_file.names)
+        self._columns = ColumnarJournal(
+            column_file.minutes[order],
+            column_file.weight[order].astype(np.float32),
+            column_file.repetitions[order],
+            column_file.exercise[order],
+            column_file.names
+        )
+
+    def _assign_ids(self, data, records):
+        """
+        Добавляет записи из списка data в словарь records. Записям без номера (или с уже занятым номером)
+        назначаются новые номера. Возвращает True, если номера пришлось назначать.
+        """
+        next_id = max((record.id for record in data if record.id is not None), default=0) + 1
+        next_id = max(next_id, max(records, default=0) + 1)
+        migrated = False
+        for record in data:
+            if record.id is None or record.id in records:
+                record.id = next_id
+                next_id += 1
+                migrated = True
+            records[record.id] = record
+        return migrated
+
+    @staticmethod
+    def _parse_records(entries):
+        """
+        Преобразует словари из файла журнала в объекты Record.
+        """
+        records = []
+        for entry in entries:
+            try:
+                records.append(Record.from_dict(entry))
+            except (KeyError, TypeError, ValueError):
+                raise ValueError(f"Некорректная запись в журнале: {entry}")
+        return records
+
+    def _replay_log(self, stamp, records):
+        """
+        Читает журнал изменений и применяет его операции к словарю записей records.
+        Недописанная последняя строка (сбой во время записи) отбрасывается и обрезается,
+        чтобы следующие записи не склеились с ней. Возвращает True, если добавленным записям
+        пришлось назначать номера (журнал изменений старого формата).
+        """
+        migrated = False
+        valid_size = 0
+        with open(self.log_path, 'rb') as file:
+            header = file.readline()
+            try:
+                base = json.loads(header)
+            except ValueError:
+                base = None
+            if not header.endswith(b'\n') or not base or base.get('snapshot') != list(stamp):
+                # Журнал не относится к текущему снимку: он уже свернут в снимок
+                file.close()
+                if not self.read_only:
+                    self._remove_log()
+                return migrated
+            valid_size = len(header)
+            for line in file:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    operation = json.loads(line)
+                    kind = operation.get('op')
+                    if kind == 'add':
+                        migrated = self._assign_ids([Record.from_dict(operation['record'])], records) or migrated
+                    elif kind == 'put':
+                        record = Record.from_dict(operation['record'])
+                        records[record.id] = record
+                    elif kind == 'del':
+                        records.pop(operation['id'], None)
+                except (KeyError, TypeError, ValueError):
+                    break
+                valid_size += len(line)
+
+        if valid_size < os.path.getsize(self.log_path) and not self.read_only:
+            with open(self.log_path, 'r+b') as file:
+                file.truncate(valid_size)
+                file.flush()
+                os.fsync(file.fileno())
+        return migrated
+
+    def _reapply(self, operations):
+        """
+        Применяет несохраненные операции журнала изменений к записям, прочитанным заново, и снова
+        откладывает их до сохранения. Добавленные записи, номера которых уже заняты, получают новые номера;
+        изменения записей, удаленных извне, пропускаются.
+        """
+        ids = {}  # Прежний номер добавленной записи -> новый
+        added = []
+
+        def add_pending():
+            previous = [record.id for record in added]
+            self.extend(added)
+            ids.update(zip(previous, (record.id for record in added)))
+            added.clear()
+
+        for operation in operations:
+            kind = operation['op']
+            if kind == 'add':
+                added.append(Record.from_dict(operation['record']))
+                continue
+            add_pending()
+            if kind == 'put':
+                record = Record.from_dict(operation['record'])
+                record_id = ids.get(record.id, record.id)
+                if record_id in self._records:
+                    self.update(record_id, record)
+            elif kind == 'del':
+                self.remove([ids.get(operation['id'], operation['id'])])
+        add_pending()
+
+    @synchronized
+    def create_empty(self):
+        """
+        Создает пустой файл журнала.
+        """
+        atomic_write_json(self.path, [])
+        self._file_timestamp_format = None
+        self._remove_log()
+        self._set_records({}, self._file_stamp(), None)
+
+    def _set_records(self, records, stamp, log_stamp, column_file=None):
+        self._records = records
+        self._next_id = max(records, default=0) + 1
+        if column_file is None:
+            self._index(records.values())
+        else:
+            self._use_column_file(list(records.values()), column_file)
+        self._dirty = False
+        self._pending_log = []
+        self._fingerprints = None
+        self.progress.reset()
+        self._stamp = stamp
+        self._log_stamp = log_stamp
+        self.version += 1
+        if column_file is not None:
+            self._columns_version = self.version
+
+    @synchronized
+    def extend(self, entries):
+        """
+        Добавляет несколько записей в журнал. В режиме журналирования все записи дописываются
+        в журнал изменений одной операцией записи.
+        """
+        entries = list(entries)
+        for entry in entries:
+            if entry.id is None or entry.id in self._records:
+                entry.id = self._next_id
+            self._next_id = max(self._next_id, entry.id + 1)
+            self._records[entry.id] = entry
+        self.dates.extend(entries)
+        self.exercises.extend(entries)
+        self.stats.extend(entries)
+        self.progress.extend(entries)
+        self.version += 1
+        if not entries:
+            return
+        if self._fingerprints is not None:
+            self._fingerprints.extend(record_fingerprints(entries))
+        if self.journal_mode:
+            self._log([{'op': 'add', 'record': entry.to_dict(self.write_format)} for entry in entries])
+        else:
+            self._dirty = True
+
+    @synchronized
+    def replace(self, records):
+        """
+        Заменяет все записи журнала в памяти. Изменения попадут на диск при сохранении.
+        """
+        self._records = {}
+        self._assign_ids(list(records), self._records)
+        self._next_id = max(self._records, default=0) + 1
+        self._index(self._records.values())
+        self._fingerprints = None
+        self.progress.reset()
+        self.version += 1
+        self._dirty = True
+
+    def _index(self, records):
+        """
+        Пересобирает индексы и суммы по всем записям.
+        """
+        self.dates.rebuild(records)
+        self.exercises.rebuild(self.dates, presorted=True)
+        self.stats.rebuild(records)
+
+    @synchronized
+    def update(self, record_id, new):
+        """
+        Заменяет запись с номером record_id записью new (новая запись получает тот же номер).
+        В режиме журналирования в журнал изменений дописывается только измененная запись.
+        Если записи с таким номером нет, выбрасывается KeyError.
+        """
+        old = self._records[record_id]
+        new.id = record_id
+        self._records[record_id] = new
+        self.dates.remove(old)
+        self.dates.insert(new)
+        self.exercises.remove(old)
+        self.exercises.insert(new)
+        self.stats.remove(old)
+        self.stats.add(new)
+        self.progress.remove(old)
+        self.progress.add(new)
+        if self._fingerprints is not None:
+            self._fingerprints.remove(record_fingerprint(old))
+            self._fingerprints.add(record_fingerprint(new))
+        self.version += 1
+        if self.journal_mode:
+            self._log([{'op': 'put', 'record': new.to_dict(self.write_format)}])
+        else:
+            self._dirty = True
+
+    @synchronized
+    def remove(self, record_ids):
+        """
+        Удаляет записи с указанными номерами. В режиме журналирования в журнал изменений
+        дописываются только номера удаленных записей. Отсутствующие номера пропускаются.
+        """
+        removed = [self._records.pop(record_id) for record_id in record_ids if record_id in self._records]
+        if not removed:
+            return
+        for record in removed:
+            self.dates.remove(record)
+            self.exercises.remove(record)
+            self.stats.remove(record)
+            self.progress.remove(record)
+            if self._fingerprints is not None:
+                self._fingerprints.remove(record_fingerprint(record))
+        self.version += 1
+        if self.journal_mode:
+            self._log([{'op': 'del', 'id': record.id} for record in removed])
+        else:
+            self._dirty = True
+
+    @synchronized
+    def select(self, start_minutes, end_minutes, exercise_filter=None):
+        """
+        Возвращает записи за диапазон времени [start_minutes, end_minutes] (в минутах от начала эпохи),
+        упорядоченные по времени. Если задан exercise_filter, выбираются только упражнения, название
+        которых содержит эту подстроку без учета регистра. Выборка выполняется двоичным поиском
+        по индексу дат (общему или по каждому подходящему упражнению).
+        """
+        if not exercise_filter:
+            return self.dates.range(start_minutes, end_minutes)
+        return self.exercises.range(self.exercises.match(exercise_filter), start_minutes, end_minutes)
+
+    def ordered(self):
+        """
+        Все записи, упорядоченные по времени: индекс дат без копирования списка записей.
+        """
+        return self.dates
+
+    @synchronized
+    def snapshot(self):
+        """
+        Все записи журнала, упорядоченные по времени, в новом списке. Список содержит только ссылки
+        на записи и не меняется при последующих изменениях журнала (например, пока идет экспорт).
+        """
+        return list(self.dates)
+
+    @synchronized
+    def statistics(self, start_minutes, end_minutes, exercise_filter=None):
+        """
+        Статистика за диапазон времени [start_minutes, end_minutes] по упражнениям, название которых
+        содержит exercise_filter. Если диапазон состоит из целых дней, статистика собирается из
+        заранее посчитанных сумм по дням; иначе - векторно по столбцам NumPy.
+        Возвращает суммарный объем, суммарное количество повторений и словарь статистики по упражнениям.
+        """
+        names = self.exercises.match(exercise_filter) if exercise_filter else None
+        if start_minutes % MINUTES_PER_DAY or (end_minutes + 1) % MINUTES_PER_DAY:
+            return self.columns().statistics(start_minutes, end_minutes, names)
+        return self.stats.query(start_minutes // MINUTES_PER_DAY, end_minutes // MINUTES_PER_DAY, names)
+
+    @synchronized
+    def series(self, start_minutes, end_minutes, exercise_filter=None):
+        """
+        Ряды для графиков за диапазон времени: время (datetime64[m]), вес и количество повторений.
+        """
+        names = self.exercises.match(exercise_filter) if exercise_filter else None
+        return self.columns().series(start_minutes, end_minutes, names)
+
+    @synchronized
+    def columns(self):
+        """
+        Журнал в виде столбцов NumPy (ColumnarJournal), упорядоченных по времени.
+        Столбцы перестраиваются только после изменения журнала.
+        """
+        if self._columns_version != self.version:
+            self._columns = ColumnarJournal.from_records(list(self.dates))
+            self._columns_version = self.version
+        return self._columns
+
+    @synchronized
+    def personal_records(self, exercise_filter=None):
+        """
+        Личные рекорды упражнений: пересчитываются только упражнения, которые изменились с прошлого запроса.
+        """
+        names = self.exercises.match(exercise_filter) if exercise_filter else self.exercises.names
+        return self.progress.records(names)
+
+    @synchronized
+    def record_history(self, start_minutes, end_minutes, exercise_filter=None):
+        names = self.exercises.match(exercise_filter) if exercise_filter else self.exercises.names
+        return self.progress.history(names, start_minutes, end_minutes)
+
+    @synchronized
+    def fingerprint_counts(self, fingerprints):
+        """
+        Количество записей журнала с каждым из отпечатков (поиск по индексу отпечатков).
+        """
+        if self._fingerprints is None:
+            self._fingerprints = FingerprintIndex(self._snapshot_fingerprints())
+        return self._fingerprints.counts(fingerprints)
+
+    def _snapshot_fingerprints(self):
+        """
+        Отпечатки всех записей журнала. Если записи в памяти совпадают со снимком на диске, отпечатки
+        читаются из столбцового файла снимка, иначе считаются по записям.
+        """
+        if self.column_path and self._stamp and self._log_stamp is None and not self._pending_log \
+                and not self._dirty:
+            column_file = open_column_file(self.column_path, self._stamp)
+            if column_file is not None:
+                fingerprints = np.array(column_file.fingerprints)
+                column_file.close()
+                return fingerprints
+        return record_fingerprints(list(self._records.values()))
+
+    def exercise_names(self):
+        """
+        Отсортированный список названий упражнений журнала.
+        """
+        return self.exercises.names
+
+    def _log(self, operations):
+        """
+        Записывает операции в журнал изменений, а в режиме write_behind откладывает их до сохранения.
+        """
+        if self.write_behind:
+            self._pending_log.extend(operations)
+        else:
+            self._append_log(operations)
+
+    def _flush_log(self):
+        """
+        Дописывает отложенные операции в журнал изменений одной записью. Если запись не удалась,
+        операции остаются в памяти до следующего сохранения.
+        """
+        operations, self._pending_log = self._pending_log, []
+        try:
+            self._append_log(operations)
+        except BaseException:
+            self._pending_log[:0] = operations
+            raise
+
+    def _append_log(self, operations):
+        """
+        Дописывает операции в журнал изменений и сбрасывает их на диск.
+        """
+        if self._stamp is None:
+            # Снимка еще нет: создаем его, чтобы журналу изменений было к чему относиться
+            self.compact()
+            return
+
+        lines = []
+        if not os.path.exists(self.log_path):
+            lines.append(json.dumps({'op': 'base', 'snapshot': list(self._stamp)}))
+        lines.extend(json.dumps(operation) for operation in operations)
+
+        with open(self.log_path, 'a') as file:
+            file.write('\n'.join(lines) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+        self._log_stamp = self._file_stamp(self.log_path)
+
+        if self._log_stamp[1] > self.compact_limit:
+            self.compact()
+
+    @synchronized
+    def compact(self):
+        """
+        Сворачивает журнал изменений в новый снимок: все записи атомарно записываются
+        в основной файл, после чего журнал изменений удаляется.
+        """
+        records = list(self._records.values())
+        timestamp_format = self.write_format
+        atomic_write_json(self.path, [record.to_dict(timestamp_format) for record in records])
+        self._file_timestamp_format = timestamp_format
+        self._stamp = self._file_stamp()
+        self._remove_log()
+        self._log_stamp = None
+        self._dirty = False
+        self._pending_log = []  # Отложенные операции уже вошли в снимок
+        if self.column_path:
+            self._column_file_pending = (self._stamp, records)
+
+    def _remove_log(self):
+        try:
+            os.remove(self.log_path)
+        except FileNotFoundError:
+            return
+        fsync_directory(self.log_path)
+
+    def unsaved_changes(self):
+        return len(self._pending_log) + (1 if self._dirty else 0)
+
+    def needs_maintenance(self):
+        return self._column_file_pending is not None
+
+    def maintain(self):
+        """
+        Строит столбцовый файл для последнего снимка JSON. Записывается вне блокировки:
+        список записей снимка не меняется, а если к этому времени снимок JSON уже перезаписан,
+        файл просто окажется устаревшим и будет проигнорирован.
+        """
+        with self.lock:
+            pending = self._column_file_pending
+            self._column_file_pending = None
+        if pending is not None:
+            stamp, records = pending
+            write_column_file(self.column_path, records, stamp)
+
+    @synchronized
+    def save(self, path=None):
+        """
+        Сохраняет записи в файл в формате JSON. Если путь не указан или совпадает с файлом журнала,
+        снимок перезаписывается только при наличии изменений, которых еще нет на диске (записи,
+        добавленные в режиме журналирования, уже сохранены), а отложенные операции (write_behind)
+        дописываются в журнал изменений одной записью. Иначе в указанный файл атомарно
+        записывается копия журнала.
+        """
+        if path is None or os.path.abspath(path) == os.path.abspath(self.path):
+            if self._dirty:
+                self.compact()
+            elif self._pending_log:
+                self._flush_log()
+        else:
+            timestamp_format = self.write_format
+            atomic_write_json(path, [record.to_dict(timestamp_format) for record in self._records.values()])
@@ -0,0 +1,171 @@
+"""
+Фоновые задачи для графического интерфейса.
+
+Tkinter однопоточный: пока обработчик кнопки читает файл, разбирает CSV или строит график, окно не
+перерисовывается и не реагирует на действия пользователя. TaskScheduler выполняет тяжелую работу
+в пуле потоков, а результаты возвращает в главный поток опросом через root.after - виджеты меняются
+только из главного потока.
+
+Функция задачи получает первым аргументом объект Task и может:
+- сообщать о ходе работы: task.progress(доля от 0 до 1);
+- проверять, не отменена ли задача: task.cancelled().
+
+У каждой задачи есть ключ (например, 'import' или 'charts'). Пока задача с таким ключом выполняется,
+повторный запуск не ставит ее в очередь еще раз, а возвращает уже работающую задачу: несколько нажатий
+на одну кнопку сливаются в одно выполнение. Так запускаются только чтения (просмотр, статистика, графики),
+результат которых не зависит от нажатия. Изменения журнала (добавление, редактирование, удаление) запускаются
+с merge=False: каждое выполняется отдельно, даже если задача с тем же ключом еще не завершилась.
+
+Используется пул потоков, а не процессов: задачи работают с хранилищем журнала в памяти, которое
+пришлось бы копировать в каждый процесс. Чтение файлов и вычисления NumPy отпускают GIL, поэтому
+интерфейс остается отзывчивым.
+
+Выполнение каждой задачи замеряется (journal/instrumentation.py) под названием "задача <ключ>",
+если замеры включены.
+"""
+
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from journal.instrumentation import instrumentation
+
+POLL_INTERVAL = 50  # Период опроса выполняющихся задач, мс
+MAX_WORKERS = 2  # Количество рабочих потоков
+
+
+class Task:
+    """
+    Фоновая задача: ход выполнения, отмена и обработчики результата.
+    Обработчики вызываются в главном потоке.
+    """
+    def __init__(self, key, on_done=None, on_error=None, on_progress=None, on_cancel=None):
+        self.key = key
+        self.on_finish = None  # on_finish() - вызывается первым при любом завершении (например, закрыть окно)
+        self.on_done = on_done  # on_done(результат)
+        self.on_error = on_error  # on_error(исключение)
+        self.on_progress = on_progress  # on_progress(доля)
+        self.on_cancel = on_cancel  # on_cancel()
+        self.future = None
+        self._cancel_event = threading.Event()
+        self._fraction = None  # Последняя доля, сообщенная рабочим потоком
+        self._reported = None  # Последняя доля, переданная в on_progress
+
+    def progress(self, fraction):
+        """
+        Сообщает о ходе выполнения (вызывается из рабочего потока).
+        """
+        self._fraction = fraction
+
+    def cancel(self):
+        """
+        Просит задачу остановиться. Задача сама проверяет флаг через cancelled().
+        """
+        self._cancel_event.set()
+
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    def _report_progress(self):
+        fraction = self._fraction
+        if self.on_progress and fraction is not None and fraction != self._reported:
+            self._reported = fraction
+            self.on_progress(fraction)
+
+    def _finish(self):
+        """
+        Передает результат задачи обработчикам.
+        """
+        self._report_progress()
+        if self.on_finish:
+            self.on_finish()
+        if self.cancelled() and self.on_cancel:
+            self.on_cancel()
+            return
+        error = self.future.exception()
+        if error is None:
+            if self.on_done:
+                self.on_done(self.future.result())
+        elif self.on_error:
+            self.on_error(error)
+        else:
+            raise error
+
+
+class TaskScheduler:
+    """
+    Планировщик фоновых задач, связанный с главным циклом Tk.
+    """
+    def __init__(self, root, max_workers=MAX_WORKERS, poll_interval=POLL_INTERVAL):
+        self.root = root
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='journal-task')
+        self._tasks = {}  # Ключ -> выполняющаяся задача (для задач без слияния - пара (ключ, номер))
+        self._numbers = itertools.count()
+        self._poll_id = None
+
+    def submit(self, key, func, *args, on_done=None, on_error=None, on_progress=None, on_cancel=None, count=None,
+               merge=True):
+        """
+        Запускает func(task, *args) в рабочем потоке. Если задача с ключом key еще выполняется,
+        новая не запускается и возвращается уже работающая задача. С merge=False задача запускается
+        всегда (для изменений журнала, которые нельзя потерять).
+        count(результат) - количество обработанных записей для замеров.
+        """
+        if merge:
+            task = self._tasks.get(key)
+            if task is not None:
+                return task
+        task = Task(key, on_done, on_error, on_progress, on_cancel)
+        task.future = self._executor.submit(instrumentation.call, f"задача {key}", func, task, *args, count=count)
+        self._tasks[key if merge else (key, next(self._numbers))] = task
+        self._schedule_poll()
+        return task
+
+    def running(self, key):
+        """
+        Возвращает выполняющуюся задачу с ключом key (одну из них, если задачи запущены без слияния) или None.
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = next((task for task in self._tasks.values() if task.key == key), None)
+        return task
+
+    def _schedule_poll(self):
+        if self._poll_id is None:
+            self._poll_id = self.root.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        """
+        Проверяет задачи в главном потоке: передает ход выполнения и результаты завершенных задач.
+        Опрос идет только пока есть выполняющиеся задачи.
+        """
+        self._poll_id = None
+        try:
+            for key, task in list(self._tasks.items()):
+                if task.done():
+                    del self._tasks[key]
+                    task._finish()
+                else:
+                    task._report_progress()
+        finally:
+            # Ошибка в обработчике одной задачи не должна останавливать опрос остальных
+            if self._tasks:
+                self._schedule_poll()
+
+    def shutdown(self, wait=False):
+        """
+        Отменяет все задачи и останавливает пул потоков (при закрытии приложения). С wait=True ждет
+        завершения задач, которые уже выполняются: например, импорт, который прошел проверку отмены,
+        успевает добавить записи до последнего сохранения журнала.
+        """
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        if self._poll_id is not None:
+            self.root.after_cancel(self._poll_id)
+            self._poll_id = None
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,308 @@
+"""
+Журналы команды: каталог с файлами журналов спортсменов и статистика по всем журналам сразу.
+
+Каталог команды содержит по одному файлу журнала на спортсмена (.json или .db/.sqlite/.sqlite3);
+имя спортсмена - имя файла без расширения. Служебные файлы (журналы изменений .wal, столбцовые файлы .cols,
+временные файлы и кэш статистики, имена которых начинаются с точки) журналами не считаются.
+
+TeamStats собирает статистику команды за диапазон дат:
+- по каждому спортсмену: суммарный объем, повторения и подходы по упражнениям и по периодам (PERIODS);
+- по команде: суммы по упражнениям и по периодам и таблицы лидеров по объему каждого упражнения.
+
+Журналы обрабатываются параллельно в пуле процессов (ProcessPoolExecutor): разбор сотен файлов JSON упирается
+в процессор, а потоки из-за GIL выполнялись бы по очереди. Процессы запускаются способом 'spawn' (без fork
+процесса с потоками Tk) один раз и используются повторно до close. Если пересчитать нужно только один журнал,
+он обрабатывается в текущем процессе.
+
+Итоги каждого журнала кэшируются в файле TEAM_CACHE_FILE в каталоге команды вместе с отметкой файла
+(время изменения и размер журнала и его журнала изменений) и параметрами запроса. Пока отметка не изменилась,
+журнал не открывается повторно - ни в этом сеансе, ни в следующем запуске.
+"""
+
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from journal.storage import SQLITE_SUFFIXES, open_storage
+from journal.store import LOG_SUFFIX, atomic_write_json
+
+JOURNAL_SUFFIXES = ('.json',) + SQLITE_SUFFIXES  # Расширения файлов журналов в каталоге команды
+TEAM_CACHE_FILE = '.team_stats.json'  # Кэш итогов журналов в каталоге команды
+# Периоды итогов: единица datetime64 ('week' - недели с понедельника)
+PERIODS = {'day': 'datetime64[D]', 'week': 'datetime64[D]', 'month': 'datetime64[M]', 'year': 'datetime64[Y]'}
+PERIOD_NAMES = {'day': "дни", 'week': "недели", 'month': "месяцы", 'year': "годы"}
+LEADERBOARD_SIZE = 10  # Количество спортсменов в таблице лидеров упражнения
+
+
+def list_journals(directory):
+    """
+    Файлы журналов в каталоге команды: словарь {спортсмен: путь}, упорядоченный по имени спортсмена.
+    """
+    journals = {}
+    for entry in sorted(os.scandir(directory), key=lambda entry: entry.name.lower()):
+        name, suffix = os.path.splitext(entry.name)
+        if entry.is_file() and not entry.name.startswith('.') and suffix.lower() in JOURNAL_SUFFIXES:
+            journals[name] = entry.path
+    return journals
+
+
+def journal_stamp(path):
+    """
+    Отметка журнала: время изменения и размер файла и его журналов изменений (JSON и SQLite).
+    Меняется при любом сохранении журнала. Пустой журнал изменений не учитывается: его создает
+    и чтение базы SQLite, а изменений журнала в нем нет.
+    """
+    stamp = []
+    for file_path in (path, path + LOG_SUFFIX, path + '-wal'):
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            continue
+        if file_path != path and not stat.st_size:
+            continue
+        stamp.extend((stat.st_mtime_ns, stat.st_size))
+    return stamp
+
+
+def _empty_totals():
+    return {'weight': 0.0, 'repetitions': 0, 'count': 0}
+
+
+def _add_totals(totals, other):
+    totals['weight'] += other['weight']
+    totals['repetitions'] += other['repetitions']
+    totals['count'] += other['count']
+
+
+def period_totals(times, weight, repetitions, period='month'):
+    """
+    Суммы по периодам: {начало периода (строка ГГГГ, ГГГГ-ММ или ГГГГ-ММ-ДД): {'weight', 'repetitions', 'count'}}.
+    times - время подходов (datetime64), weight и repetitions - столбцы того же размера.
+    """
+    if not len(times):
+        return {}
+    days = times.astype('datetime64[D]')
+    if period == 'week':
+        keys = days - (days.astype(np.int64) + 3) % 7  # 01.01.1970 - четверг
+    else:
+        keys = days.astype(PERIODS[period])
+    labels, inverse = np.unique(keys, return_inverse=True)
+    repetitions = repetitions.astype(np.int64)
+    volume = np.bincount(inverse, weights=weight.astype(np.float64) * repetitions)
+    repetitions_sum = np.bincount(inverse, weights=repetitions)
+    count = np.bincount(inverse)
+    return {
+        label: {'weight': float(volume[index]), 'repetitions': int(repetitions_sum[index]),
+                'count': int(count[index])}
+        for index, label in enumerate(np.datetime_as_string(labels))
+    }
+
+
+def summarize_journal(path, start_minutes, end_minutes, exercise_filter='', period='month'):
+    """
+    Итоги одного журнала за диапазон времени (выполняется в процессе пула): суммарный объем и повторения,
+    суммы по упражнениям и по периодам. Результат - словарь, который можно передать между процессами
+    и сохранить в JSON. Журнал открывается только для чтения: его файлы не меняются, поэтому отметка журнала,
+    снятая до обработки, остается действительной.
+    """
+    store = open_storage(path, read_only=True)
+    store.load()
+    names_filter = exercise_filter or None
+    total_weight, total_repetitions, exercises = store.statistics(start_minutes, end_minutes, names_filter)
+    times, weight, repetitions = store.series(start_minutes, end_minutes, names_filter)
+    return {
+        'weight': total_weight,
+        'repetitions': total_repetitions,
+        'count': sum(stats['count'] for stats in exercises.values()),
+        'exercises': exercises,
+        'periods': period_totals(times, weight, repetitions, period),
+    }
+
+
+class TeamReport:
+    """
+    Статистика команды: итоги спортсменов, суммы команды и таблицы лидеров.
+    """
+    def __init__(self, period):
+        self.period = period
+        self.athletes = {}  # Спортсмен -> итоги журнала (summarize_journal)
+        self.errors = {}  # Спортсмен -> сообщение об ошибке чтения журнала
+        self.cached = 0  # Сколько журналов взято из кэша без повторного чтения
+
+    def add(self, athlete, summary):
+        self.athletes[athlete] = summary
+
+    def totals(self):
+        """
+        Суммы команды: объем, повторения и подходы.
+        """
+        totals = _empty_totals()
+        for summary in self.athletes.values():
+            _add_totals(totals, summary)
+        return totals
+
+    def exercises(self):
+        """
+        Суммы команды по упражнениям: {упражнение: {'weight', 'repetitions', 'count'}}, по убыванию объема.
+        """
+        exercises = {}
+        for summary in self.athletes.values():
+            for name, stats in summary['exercises'].items():
+                _add_totals(exercises.setdefault(name, _empty_totals()), stats)
+        return dict(sorted(exercises.items(), key=lambda item: -item[1]['weight']))
+
+    def periods(self):
+        """
+        Суммы команды по периодам: {начало периода: {'weight', 'repetitions', 'count'}}, по возрастанию.
+        """
+        periods = {}
+        for summary in self.athletes.values():
+            for label, stats in summary['periods'].items():
+                _add_totals(periods.setdefault(label, _empty_totals()), stats)
+        return dict(sorted(periods.items()))
+
+    def leaderboards(self, size=LEADERBOARD_SIZE):
+        """
+        Таблицы лидеров: {упражнение: [(спортсмен, объем), ...]} - первые size спортсменов по объему.
+        """
+        boards = {}
+        for athlete, summary in self.athletes.items():
+            for name, stats in summary['exercises'].items():
+                boards.setdefault(name, []).append((athlete, stats['weight']))
+        return {name: sorted(board, key=lambda item: -item[1])[:size] for name, board in boards.items()}
+
+    def to_dict(self):
+        return {
+            'period': self.period,
+            'totals': self.totals(),
+            'exercises': self.exercises(),
+            'periods': self.periods(),
+            'leaderboards': {name: [{'athlete': athlete, 'weight': weight} for athlete, weight in board]
+                             for name, board in self.leaderboards().items()},
+            'athletes': self.athletes,
+            'errors': self.errors,
+        }
+
+
+def team_lines(report):
+    """
+    Строки отчета по статистике команды: суммы, упражнения с лидерами и суммы по периодам.
+    """
+    totals = report.totals()
+    lines = [f"Спортсменов: {len(report.athletes)}",
+             f"Суммарный объем: {totals['weight']:.2f} кг",
+             f"Суммарное количество повторений: {totals['repetitions']}",
+             f"Подходов: {totals['count']}",
+             "Упражнения:"]
+    leaderboards = report.leaderboards()
+    for exercise, stats in report.exercises().items():
+        lines.append(f"{exercise}: {stats['weight']:.2f} кг, {stats['repetitions']} повторений")
+        for place, (athlete, weight) in enumerate(leaderboards[exercise], 1):
+            lines.append(f"    {place}. {athlete}: {weight:.2f} кг")
+    lines.append(f"По периодам ({PERIOD_NAMES[report.period]}):")
+    for label, stats in report.periods().items():
+        lines.append(f"{label}: {stats['weight']:.2f} кг, {stats['repetitions']} повторений, {stats['count']} подходов")
+    for athlete, message in report.errors.items():
+        lines.append(f"Ошибка чтения журнала {athlete}: {message}")
+    return lines
+
+
+class TeamStats:
+    """
+    Статистика по всем журналам каталога команды с кэшем итогов журналов и пулом процессов.
+    """
+    def __init__(self, directory, max_workers=None):
+        self.directory = directory
+        self.max_workers = max_workers
+        self.cache_path = os.path.join(directory, TEAM_CACHE_FILE)
+        self._cache = None  # Имя файла журнала -> {'stamp', 'query', 'summary'}
+        self._executor = None
+
+    def journals(self):
+        return list_journals(self.directory)
+
+    def _load_cache(self):
+        if self._cache is None:
+            try:
+                with open(self.cache_path) as file:
+                    self._cache = json.load(file)
+            except (OSError, ValueError):
+                self._cache = {}  # Кэша нет или он поврежден: все журналы будут прочитаны заново
+        return self._cache
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        return self._executor
+
+    def collect(self, start_minutes, end_minutes, exercise_filter='', period='month', progress=None,
+                cancelled=None):
+        """
+        Собирает статистику команды за диапазон времени и возвращает TeamReport.
+        Журналы, которые не изменились с прошлого запроса с теми же параметрами, берутся из кэша,
+        остальные обрабатываются параллельно. progress(доля) сообщает о ходе работы, cancelled() - отмена
+        (уже полученные итоги остаются в кэше).
+        """
+        if period not in PERIODS:
+            raise ValueError(f"Неизвестный период: {period}")
+        cache = self._load_cache()
+        query = [start_minutes, end_minutes, exercise_filter or '', period]
+        report = TeamReport(period)
+        journals = self.journals()
+        stale = {}  # Спортсмен -> (путь, отметка)
+        for athlete, path in journals.items():
+            stamp = journal_stamp(path)
+            entry = cache.get(os.path.basename(path))
+            if entry is not None and entry['stamp'] == stamp and entry['query'] == query:
+                report.add(athlete, entry['summary'])
+                report.cached += 1
+            else:
+                stale[athlete] = (path, stamp)
+
+        def finished(athlete, summary):
+            path, stamp = stale[athlete]
+            cache[os.path.basename(path)] = {'stamp': stamp, 'query': query, 'summary': summary}
+            report.add(athlete, summary)
+            if progress:
+                progress((report.cached + len(report.athletes) + len(report.errors)) / len(journals))
+
+        if len(stale) == 1:
+            athlete, (path, stamp) = next(iter(stale.items()))
+            try:
+                finished(athlete, summarize_journal(path, *query))
+            except Exception as e:  # Поврежденный журнал не мешает статистике остальных
+                report.errors[athlete] = str(e)
+        elif stale:
+            futures = {self._pool().submit(summarize_journal, path, *query): athlete
+                       for athlete, (path, stamp) in stale.items()}
+            for future in as_completed(futures):
+                if cancelled and cancelled():
+                    for pending in futures:
+                        pending.cancel()
+                    break
+                try:
+                    finished(futures[future], future.result())
+                except Exception as e:
+                    report.errors[futures[future]] = str(e)
+
+        # Журналы, которых больше нет в каталоге, удаляются из кэша
+        names = {os.path.basename(path) for path in journals.values()}
+        removed = [name for name in cache if name not in names]
+        for name in removed:
+            del cache[name]
+        if len(report.athletes) > report.cached or removed:
+            atomic_write_json(self.cache_path, cache)
+        report.athletes = dict(sorted(report.athletes.items()))
+        return report
+
+    def close(self):
+        """
+        Останавливает пул процессов.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
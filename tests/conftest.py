@@ -0,0 +1,8 @@
+"""
+Общие настройки тестов: пакет journal импортируется из корня проекта.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
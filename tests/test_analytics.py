@@ -0,0 +1,84 @@
+"""
+Столбцы NumPy журнала (journal/analytics.py): сравнение с расчетом по записям и большие значения повторений.
+"""
+
+import datetime
+
+import numpy as np
+import pytest
+
+from journal.analytics import ColumnarJournal, sort_order
+from journal.csv_io import MAX_REPETITIONS
+from journal.engine import JournalEngine, make_filter, make_record
+from journal.records import Record
+from journal.stats import summarize
+from journal.store import JournalStore
+
+RECORDS = [
+    Record(1000, 'Присед', 100.0, 5, 1),
+    Record(1000 + 60, 'Жим', 80.0, 8, 2),
+    Record(1000 + 1440, 'Присед', 110.0, 3, 3),
+    Record(1000 + 3 * 1440, 'Тяга', 150.5, 2, 4),
+    Record(1000 + 3 * 1440 + 5, 'Жим', 82.5, 6, 5),
+]
+
+
+def test_statistics_match_summarize():
+    columns = ColumnarJournal.from_records(RECORDS)
+    for start, end in [(0, 10**6), (1000, 1000), (1001, 1000 + 3 * 1440), (1000 + 61, 10**6)]:
+        expected = summarize([record for record in RECORDS if start <= record.minutes <= end])
+        assert columns.statistics(start, end) == pytest.approx(expected)
+    expected = summarize([record for record in RECORDS if record.exercise == 'Жим'])
+    assert columns.statistics(0, 10**6, ['Жим']) == pytest.approx(expected)
+
+
+def test_daily_sums():
+    days, volume, repetitions, count = ColumnarJournal.from_records(RECORDS).daily(0, 10**6)
+    assert days.astype(np.int64).tolist() == [0, 1, 3]
+    assert volume.tolist() == pytest.approx([100 * 5 + 80 * 8, 110 * 3, 150.5 * 2 + 82.5 * 6])
+    assert repetitions.tolist() == [13, 3, 8]
+    assert count.tolist() == [2, 1, 2]
+
+
+def test_sort_order_with_and_without_columns():
+    columns = ColumnarJournal.from_records(RECORDS)
+    for attribute in ('minutes', 'exercise', 'weight', 'repetitions'):
+        expected = sorted(range(len(RECORDS)), key=lambda index: getattr(RECORDS[index], attribute))
+        assert sort_order(RECORDS, attribute).tolist() == expected
+        assert sort_order(RECORDS, attribute, columns).tolist() == expected
+
+
+@pytest.mark.parametrize('name', ['journal.json', 'journal.db'])
+def test_large_repetition_count(tmp_path, name):
+    engine = JournalEngine(str(tmp_path / name), chart_directory=str(tmp_path / 'images'))
+    engine.load(create=True)
+    engine.add('01/01/2024 10:00', 'Присед', '100', '40000')
+    engine.add('01/01/2024 11:00', 'Присед', '100', str(MAX_REPETITIONS))
+
+    repetitions = engine.store.series(*make_filter())[2]
+    assert repetitions.tolist() == [40000, MAX_REPETITIONS]
+    assert engine.store.columns().repetitions.tolist() == [40000, MAX_REPETITIONS]
+    # Диапазон не из целых дней считается по столбцам
+    day = datetime.date(2024, 1, 1)
+    start, end, _ = make_filter(day, day)
+    assert engine.store.statistics(start + 1, end)[1] == 40000 + MAX_REPETITIONS
+    assert engine.statistics(make_filter())[1] == 40000 + MAX_REPETITIONS
+
+
+def test_large_repetition_count_from_column_file(tmp_path):
+    path = str(tmp_path / 'journal.json')
+    store = JournalStore(path)
+    store.create_empty()
+    store.add(Record(1000, 'Присед', 100.0, 40000))
+    store.compact()
+    store.maintain()
+
+    reloaded = JournalStore(path)
+    reloaded.load()
+    assert reloaded.columns().repetitions.tolist() == [40000]
+    assert reloaded.statistics(0, 10**6)[1] == 40000
+
+
+def test_repetitions_above_limit_are_rejected():
+    with pytest.raises(ValueError):
+        make_record('01/01/2024 10:00', 'Присед', '100', str(MAX_REPETITIONS + 1))
@@ -0,0 +1,142 @@
+"""
+Отложенное сохранение (journal/autosave.py и режим write_behind хранилища): группировка изменений и повтор после ошибки.
+"""
+
+import types
+
+import pytest
+
+from journal import autosave
+from journal.autosave import Autosave
+from journal.records import Record
+from journal.store import JournalStore
+
+
+class FakeRoot:
+    """
+    Заменяет root.after: запоминает таймеры, тест запускает их сам.
+    """
+    def __init__(self):
+        self.timers = {}
+        self.next_id = 0
+
+    def after(self, delay, callback):
+        self.next_id += 1
+        self.timers[self.next_id] = (delay, callback)
+        return self.next_id
+
+    def after_cancel(self, timer_id):
+        self.timers.pop(timer_id, None)  # Как в Tk: отмена сработавшего таймера ничего не делает
+
+    def fire(self):
+        (timer_id, (delay, callback)), = self.timers.items()
+        del self.timers[timer_id]
+        callback()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = types.SimpleNamespace(now=100.0)
+    monkeypatch.setattr(autosave, 'time', types.SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def test_changes_are_saved_once_after_pause(clock):
+    root = FakeRoot()
+    saves = []
+    saver = Autosave(root, lambda: saves.append(saver.changes), delay=2000, max_delay=30000)
+    for _ in range(50):
+        saver.mark()
+        clock.now += 0.1
+    assert len(root.timers) == 1  # Каждое изменение переносит единственный таймер
+    assert [delay for delay, callback in root.timers.values()] == [2000]
+    root.fire()
+    assert saves == [0]  # Сохранение одно, счетчик сброшен до вызова save
+    assert saver.changes == 0 and not root.timers
+
+
+def test_max_delay_limits_postponing(clock):
+    root = FakeRoot()
+    saver = Autosave(root, lambda: None, delay=2000, max_delay=30000)
+    saver.mark()
+    clock.now += 29.5
+    saver.mark()
+    assert [delay for delay, callback in root.timers.values()] == [500]
+    clock.now += 5
+    saver.mark()
+    assert [delay for delay, callback in root.timers.values()] == [0]
+
+
+def test_failed_save_is_retried(clock):
+    root = FakeRoot()
+    attempts = []
+
+    def save():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError("нет места на диске")
+    saver = Autosave(root, save, delay=2000, retry_delay=10000)
+    saver.mark(3)
+    with pytest.raises(OSError):
+        root.fire()
+    assert saver.changes == 3
+    assert [delay for delay, callback in root.timers.values()] == [10000]
+    root.fire()
+    assert len(attempts) == 2 and saver.changes == 0 and not root.timers
+
+
+def test_retry_after_background_failure(clock):
+    root = FakeRoot()
+    saver = Autosave(root, lambda: None, retry_delay=10000)
+    saver.mark(2)
+    saver.flush()  # Сохранение запущено в фоновой задаче, счетчик сброшен
+    saver.mark(1)  # Новое изменение, пока идет сохранение
+    saver.retry(2)  # Фоновое сохранение не удалось
+    assert saver.changes == 3
+    assert [delay for delay, callback in root.timers.values()] == [10000]
+
+
+def test_cancel_keeps_changes(clock):
+    root = FakeRoot()
+    saver = Autosave(root, lambda: None)
+    saver.mark(4)
+    saver.cancel()
+    assert not root.timers and saver.changes == 4
+
+
+def test_write_behind_saves_group_with_one_log_write(tmp_path):
+    store = JournalStore(str(tmp_path / 'journal.json'), column_file=False, write_behind=True)
+    store.create_empty()
+    store.compact()
+    writes = []
+    append = store._append_log
+    store._append_log = lambda operations: writes.append(len(operations)) or append(operations)
+    for minute in range(50):
+        store.add(Record(minute, 'Жим', 80.0, 5))
+    assert writes == [] and store.unsaved_changes() == 50
+    store.save()
+    assert writes == [50] and store.unsaved_changes() == 0
+
+    reloaded = JournalStore(store.path, column_file=False)
+    reloaded.load()
+    assert reloaded.count() == 50
+
+
+def test_failed_log_write_keeps_pending_changes(tmp_path):
+    store = JournalStore(str(tmp_path / 'journal.json'), column_file=False, write_behind=True)
+    store.create_empty()
+    store.compact()
+    store.add(Record(0, 'Жим', 80.0, 5))
+    append = store._append_log
+
+    def failing(operations):
+        raise OSError("нет места на диске")
+    store._append_log = failing
+    with pytest.raises(OSError):
+        store.save()
+    assert store.unsaved_changes() == 1
+    store._append_log = append
+    store.save()
+    reloaded = JournalStore(store.path, column_file=False)
+    reloaded.load()
+    assert reloaded.count() == 1
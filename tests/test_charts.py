@@ -0,0 +1,81 @@
+"""
+Построение графиков без интерфейса (journal/charts.py): кэш изображений, файлы графиков и прореживание LTTB.
+"""
+
+import os
+
+import numpy as np
+
+from journal.charts import ChartService, lttb
+from journal.records import Record
+from journal.store import JournalStore
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def make_service(tmp_path, count=30, cache_size=8):
+    store = JournalStore(str(tmp_path / 'journal.json'), column_file=False)
+    store.create_empty()
+    store.extend([Record(1440 * day, 'Присед', 100.0 + day, 5) for day in range(count)])
+    service = ChartService(store, str(tmp_path / 'images'), max_points=50, cache_size=cache_size)
+    draws = []
+    draw = service._draw
+    service._draw = lambda *args: draws.append(args) or draw(*args)
+    return store, service, draws
+
+
+def test_render_writes_png_files(tmp_path):
+    store, service, draws = make_service(tmp_path)
+    charts = service.render(0, 10**6)
+    assert [os.path.basename(chart.path) for chart in charts] == ['weight_chart.png', 'repetitions_chart.png']
+    for chart in charts:
+        assert chart.png.startswith(PNG_SIGNATURE)
+        with open(chart.path, 'rb') as file:
+            assert file.read() == chart.png
+
+
+def test_repeated_request_is_served_from_cache(tmp_path):
+    store, service, draws = make_service(tmp_path)
+    first = service.render(0, 10**6)
+    assert service.render(0, 10**6) is first
+    assert len(draws) == 1
+
+    store.add(Record(1440 * 100, 'Присед', 150.0, 3))  # Новая версия журнала - графики перерисовываются
+    assert service.render(0, 10**6) is not first
+    assert len(draws) == 2
+
+
+def test_files_follow_the_last_request(tmp_path):
+    store, service, draws = make_service(tmp_path)
+    everything = service.render(0, 10**6)
+    first_days = service.render(0, 1440 * 5)
+    assert service.render(0, 10**6) is everything
+    with open(everything[0].path, 'rb') as file:
+        assert file.read() == everything[0].png  # Файлы перезаписаны графиками из кэша
+    assert first_days[0].png != everything[0].png
+
+
+def test_cache_is_bounded(tmp_path):
+    store, service, draws = make_service(tmp_path, cache_size=2)
+    for end in (1440, 2 * 1440, 3 * 1440):
+        service.render(0, end)
+    service.render(0, 1440)  # Вытеснен самым старым
+    assert len(draws) == 4
+
+
+def test_no_data_gives_none(tmp_path):
+    store, service, draws = make_service(tmp_path)
+    assert service.render(0, 10**6, 'бег') is None
+    assert not os.path.exists(os.path.join(service.directory, 'weight_chart.png'))
+
+
+def test_lttb_keeps_ends_and_peaks():
+    x = np.arange(10000)
+    y = np.zeros(10000)
+    y[5000] = 100.0
+    selected = lttb(x, y, 100)
+    assert len(selected) == 100
+    assert selected[0] == 0 and selected[-1] == 9999
+    assert 5000 in selected
+    assert np.all(np.diff(selected) > 0)
+    assert lttb(x[:50], y[:50], 100).tolist() == list(range(50))
@@ -0,0 +1,70 @@
+"""
+Столбцовый файл журнала (journal/column_file.py): запись, чтение и отказ от устаревшего снимка.
+"""
+
+from journal.column_file import HEADER, open_column_file, write_column_file
+from journal.fingerprints import record_fingerprints
+from journal.records import Record
+
+RECORDS = [
+    Record(1000, 'Присед', 100.0, 5, 3),
+    Record(-500, 'Жим лежа', 82.5, 8, 7),
+    Record(1000, 'Присед', 100.0, 5, 8),
+    Record(2000, 'Ёлочка', 0.0, 20, 1),
+]
+STAMP = (1_700_000_000_123_456_789, 4096)
+
+
+def fields(records):
+    return [(record.id, record.minutes, record.exercise, record.weight, record.repetitions) for record in records]
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'journal.json.cols')
+    write_column_file(path, RECORDS, STAMP)
+    column_file = open_column_file(path, STAMP)
+    assert column_file is not None
+    try:
+        assert len(column_file) == len(RECORDS)
+        assert fields(column_file.records()) == fields(RECORDS)
+        assert column_file.names == sorted({record.exercise for record in RECORDS})
+        assert column_file.fingerprints.tolist() == record_fingerprints(RECORDS).tolist()
+    finally:
+        column_file.close()
+
+
+def test_empty_journal(tmp_path):
+    path = str(tmp_path / 'journal.json.cols')
+    write_column_file(path, [], STAMP)
+    column_file = open_column_file(path, STAMP)
+    assert column_file is not None
+    assert column_file.records() == []
+    column_file.close()
+
+
+def test_stale_stamp_is_rejected(tmp_path):
+    path = str(tmp_path / 'journal.json.cols')
+    write_column_file(path, RECORDS, STAMP)
+    assert open_column_file(path, (STAMP[0] + 1, STAMP[1])) is None
+    assert open_column_file(path, (STAMP[0], STAMP[1] + 1)) is None
+
+
+def test_other_format_version_is_rejected(tmp_path):
+    path = str(tmp_path / 'journal.json.cols')
+    write_column_file(path, RECORDS, STAMP)
+    with open(path, 'r+b') as file:
+        header = bytearray(file.read(HEADER.size))
+        magic, version, *rest = HEADER.unpack(header)
+        file.seek(0)
+        file.write(HEADER.pack(magic, version - 1, *rest))
+    assert open_column_file(path, STAMP) is None
+
+
+def test_damaged_file_is_rejected(tmp_path):
+    path = str(tmp_path / 'journal.json.cols')
+    write_column_file(path, RECORDS, STAMP)
+    with open(path, 'r+b') as file:
+        file.truncate(HEADER.size + 10)
+    assert open_column_file(path, STAMP) is None
+    assert open_column_file(str(tmp_path / 'missing.cols'), STAMP) is None
+
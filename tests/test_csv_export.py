@@ -0,0 +1,92 @@
+"""
+Потоковый экспорт CSV (journal/csv_io.py, JournalEngine.export_csv): пачки строк, фильтр и отмена.
+"""
+
+import csv
+import os
+
+import pytest
+
+from journal.csv_io import CSV_HEADER, ExportCancelled, export_csv, import_csv
+from journal.engine import JournalEngine, make_filter
+from journal.records import Record
+from journal.store import JournalStore
+
+
+def read_csv(file_name):
+    with open(file_name, newline='', encoding='utf-8') as file:
+        return list(csv.reader(file))
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = JournalEngine(str(tmp_path / 'journal.json'), chart_directory=str(tmp_path / 'images'))
+    engine.load(create=True)
+    for day in range(1, 11):
+        engine.add(f'{day:02}/01/2024 10:00', 'Жим' if day % 2 else 'Присед', str(60 + day), '5')
+    return engine
+
+
+def test_export_whole_journal(tmp_path, engine):
+    file_name = str(tmp_path / 'export.csv')
+    assert engine.export_csv(file_name) == 10
+    rows = read_csv(file_name)
+    assert rows[0] == CSV_HEADER
+    assert rows[1] == ['01/01/2024 10:00', 'Жим', '61', '5']
+    assert len(rows) == 11
+
+
+def test_export_with_filter(tmp_path, engine):
+    file_name = str(tmp_path / 'export.csv')
+    assert engine.export_csv(file_name, make_filter(exercise_filter='присед')) == 5
+    assert {row[1] for row in read_csv(file_name)[1:]} == {'Присед'}
+
+
+def test_export_round_trip(tmp_path, engine):
+    file_name = str(tmp_path / 'export.csv')
+    engine.export_csv(file_name)
+    store = JournalStore(str(tmp_path / 'copy.json'), column_file=False)
+    store.create_empty()
+    report = import_csv(file_name, store)
+    assert (report.imported, report.error_count) == (10, 0)
+    assert sorted(record.values() for record in store.records) == \
+        sorted(record.values() for record in engine.store.records)
+
+
+def test_batches_and_progress(tmp_path):
+    records = [Record(minute, 'Жим', 80.0, 5) for minute in range(25)]
+    fractions = []
+    file_name = str(tmp_path / 'export.csv')
+    assert export_csv(file_name, records, batch_size=10, progress=fractions.append) == 25
+    assert fractions == [0.4, 0.8, 1.0]
+    assert len(read_csv(file_name)) == 26
+
+
+def test_cancelled_export_leaves_no_file(tmp_path):
+    records = [Record(minute, 'Жим', 80.0, 5) for minute in range(25)]
+    file_name = str(tmp_path / 'export.csv')
+    calls = []
+    with pytest.raises(ExportCancelled):
+        export_csv(file_name, records, batch_size=10, cancelled=lambda: calls.append(1) or len(calls) > 1)
+    assert os.listdir(tmp_path) == []
+
+
+def test_failed_export_keeps_previous_file(tmp_path):
+    file_name = str(tmp_path / 'export.csv')
+    export_csv(file_name, [Record(0, 'Жим', 80.0, 5)])
+    previous = read_csv(file_name)
+
+    class Broken(list):
+        def __getitem__(self, index):
+            raise OSError("сбой чтения")
+    with pytest.raises(OSError):
+        export_csv(file_name, Broken([Record(0, 'Присед', 100.0, 5)]))
+    assert read_csv(file_name) == previous
+    assert sorted(os.listdir(tmp_path)) == ['export.csv']
+
+
+def test_export_snapshot_ignores_later_changes(tmp_path, engine):
+    records = engine.store.snapshot()
+    engine.add('20/01/2024 10:00', 'Тяга', '120', '3')
+    file_name = str(tmp_path / 'export.csv')
+    assert export_csv(file_name, records) == 10
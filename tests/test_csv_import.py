@@ -0,0 +1,106 @@
+"""
+Потоковый импорт CSV (journal/csv_io.py): проверка строк пачками, отчет об ошибках и одна пачка добавлений.
+"""
+
+import pytest
+
+from journal.csv_io import ImportCancelled, MAX_REPORTED_ERRORS, import_csv, iter_batches
+from journal.store import JournalStore
+
+
+def write_csv(path, lines, header="Дата,Упражнение,Вес,Повторения"):
+    path.write_text("\n".join([header, *lines]) + "\n", encoding='utf-8-sig')
+    return str(path)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JournalStore(str(tmp_path / 'journal.json'), column_file=False)
+    store.create_empty()
+    return store
+
+
+def test_errors_are_reported_with_line_numbers(tmp_path, store):
+    file_name = write_csv(tmp_path / 'import.csv', [
+        "01/01/2024 10:00,Жим,80,5",
+        "31/02/2024 10:00,Жим,80,5",
+        "",
+        "01/01/2024 11:00,,80,5",
+        "01/01/2024 12:00,Присед,-5,5",
+        "01/01/2024 13:00,Присед,100,ноль",
+        "01/01/2024 14:00,Присед",
+        "02/01/2024 10:00,Присед,100,3",
+    ])
+    report = import_csv(file_name, store, batch_size=3)
+    assert report.rows_read == 7
+    assert report.imported == 2
+    assert [line for line, message in report.errors] == [3, 5, 6, 7, 8]
+    assert "Некорректная дата" in report.errors[0][1]
+    assert report.summary() == "Импортировано записей: 2 из 7. Строк с ошибками: 5."
+    assert sorted(record.exercise for record in store.records) == ['Жим', 'Присед']
+
+
+def test_columns_in_any_order(tmp_path, store):
+    file_name = write_csv(tmp_path / 'import.csv', ["5,Жим,80,01/01/2024 10:00"],
+                          header="Повторения,Упражнение,Вес,Дата")
+    assert import_csv(file_name, store).imported == 1
+    record = next(iter(store.records))
+    assert record.values() == ('01/01/2024 10:00', 'Жим', '80', '5')
+
+
+def test_missing_columns_are_fatal(tmp_path, store):
+    file_name = write_csv(tmp_path / 'import.csv', ["01/01/2024 10:00,Жим,80"], header="Дата,Упражнение,Вес")
+    report = import_csv(file_name, store)
+    assert report.fatal_error and report.imported == 0
+    assert store.count() == 0
+
+
+def test_all_records_are_added_in_one_batch(tmp_path, store):
+    file_name = write_csv(tmp_path / 'import.csv', [f"01/01/2024 10:{minute:02},Жим,80,5" for minute in range(50)])
+    version = store.version
+    writes = []
+    log = store._log
+    store._log = lambda operations: writes.append(len(operations)) or log(operations)
+    report = import_csv(file_name, store, batch_size=7)
+    assert report.imported == 50
+    assert store.version == version + 1
+    assert writes == [50]  # Одна запись в журнал изменений
+
+    reloaded = JournalStore(store.path, column_file=False)
+    reloaded.load()
+    assert reloaded.count() == 50
+
+
+def test_duplicates_are_skipped(tmp_path, store):
+    lines = ["01/01/2024 10:00,Жим,80,5", "01/01/2024 10:00,жим,80.0,5", "01/01/2024 11:00,Жим,80,5"]
+    file_name = write_csv(tmp_path / 'import.csv', lines)
+    assert import_csv(file_name, store).imported == 3
+    report = import_csv(file_name, store)
+    assert (report.imported, report.duplicates) == (0, 3)
+    assert import_csv(file_name, store, skip_duplicates=False).imported == 3
+
+
+def test_progress_and_cancel(tmp_path, store):
+    file_name = write_csv(tmp_path / 'import.csv', [f"01/01/2024 10:{minute:02},Жим,80,5" for minute in range(30)])
+    fractions = []
+    import_csv(file_name, store, batch_size=10, progress=fractions.append)
+    assert fractions == sorted(fractions) and fractions[-1] == 1.0 and len(fractions) > 1
+
+    count = store.count()
+    with pytest.raises(ImportCancelled):
+        import_csv(file_name, store, batch_size=10, cancelled=lambda: True)
+    assert store.count() == count
+
+
+def test_error_list_is_capped(tmp_path, store):
+    file_name = write_csv(tmp_path / 'import.csv', ["плохая строка,Жим,80,5"] * (MAX_REPORTED_ERRORS + 5))
+    report = import_csv(file_name, store)
+    assert report.error_count == MAX_REPORTED_ERRORS + 5
+    assert len(report.errors) == MAX_REPORTED_ERRORS
+
+
+def test_batches_have_requested_size(tmp_path):
+    file_name = write_csv(tmp_path / 'import.csv', [f"01/01/2024 10:{minute:02},Жим,80,5" for minute in range(25)])
+    batches = iter_batches(file_name, batch_size=10)
+    assert next(batches) == [0, 1, 2, 3]
+    assert [len(batch) for batch in batches] == [10, 10, 5]
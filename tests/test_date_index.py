@@ -0,0 +1,92 @@
+"""
+Индекс дат (journal/index.py, DateIndex): выборка диапазона двоичным поиском и поддержка индекса при изменениях.
+"""
+
+import random
+
+import pytest
+
+from journal.index import DateIndex
+from journal.records import Record
+from journal.store import JournalStore
+
+
+def brute_range(records, start, end):
+    """
+    Ожидаемая выборка: записи диапазона в порядке времени, равные по времени - в порядке добавления.
+    """
+    return sorted((record for record in records if start <= record.minutes <= end), key=lambda r: r.minutes)
+
+
+def make_records(count, generator, start_id=0):
+    return [Record(generator.randint(0, 200), 'Жим', 80.0, 5, start_id + number) for number in range(count)]
+
+
+def test_range_bounds_are_inclusive():
+    records = [Record(minutes, 'Жим', 80.0, 5, minutes) for minutes in (10, 20, 20, 30)]
+    index = DateIndex(records)
+    assert [record.id for record in index.range(20, 20)] == [20, 20]
+    assert [record.minutes for record in index.range(10, 29)] == [10, 20, 20]
+    assert index.range(31, 100) == []
+    assert index.range(0, 9) == []
+
+
+def test_range_matches_brute_force_after_changes():
+    generator = random.Random(4)
+    index = DateIndex()
+    present = []
+    next_id = 0
+    for step in range(300):
+        action = generator.random()
+        if action < 0.5 or not present:
+            record = make_records(1, generator, next_id)[0]
+            index.insert(record)
+            present.append(record)
+            next_id += 1
+        elif action < 0.6:
+            batch = make_records(generator.choice([2, 50]), generator, next_id)  # По одной и пересборкой
+            index.extend(batch)
+            present.extend(batch)
+            next_id += len(batch)
+        else:
+            record = present.pop(generator.randrange(len(present)))
+            index.remove(record)
+        start = generator.randint(0, 200)
+        end = start + generator.randint(0, 60)
+        assert index.range(start, end) == brute_range(present, start, end)
+    assert len(index) == len(present)
+    assert list(index) == brute_range(present, 0, 200)
+
+
+def test_equal_times_keep_insertion_order():
+    index = DateIndex()
+    records = [Record(100, 'Жим', 80.0, 5, number) for number in range(5)]
+    for record in records:
+        index.insert(record)
+    index.insert(Record(50, 'Жим', 80.0, 5, 99))
+    assert [record.id for record in index.range(100, 100)] == [0, 1, 2, 3, 4]
+
+
+def test_remove_finds_record_by_identity():
+    same_time = [Record(100, 'Жим', 80.0, 5, number) for number in range(3)]
+    index = DateIndex(same_time)
+    index.remove(same_time[1])
+    assert [record.id for record in index] == [0, 2]
+    with pytest.raises(ValueError):
+        index.remove(Record(100, 'Жим', 80.0, 5, 0))  # Равная, но другая запись
+
+
+def test_store_select_follows_edits(tmp_path):
+    store = JournalStore(str(tmp_path / 'journal.json'), column_file=False)
+    store.create_empty()
+    store.extend([Record(minutes, 'Жим', 80.0, 5) for minutes in (1000, 2000, 3000)])
+    moved = store.select(2000, 2000)[0]
+    store.update(moved.id, Record(5000, 'Жим', 80.0, 5))
+    assert [record.minutes for record in store.select(0, 10000)] == [1000, 3000, 5000]
+    assert store.select(2000, 2000) == []
+    store.remove([store.select(3000, 3000)[0].id])
+    assert [record.minutes for record in store.select(0, 10000)] == [1000, 5000]
+
+    reloaded = JournalStore(store.path, column_file=False)
+    reloaded.load()
+    assert [record.minutes for record in reloaded.select(0, 10000)] == [1000, 5000]
@@ -0,0 +1,68 @@
+"""
+Словарь упражнений (journal/index.py, ExerciseIndex): фильтр по подстроке без учета регистра и выборки по упражнениям.
+"""
+
+import random
+
+from journal.index import ExerciseIndex
+from journal.records import Record
+from journal.store import JournalStore
+
+NAMES = ['Жим лежа', 'Жим стоя', 'Присед', 'Становая тяга', 'Тяга в наклоне', 'ЁЛОЧКА', 'Pull-up']
+
+
+def test_match_is_case_insensitive_substring():
+    index = ExerciseIndex([Record(0, name, 50.0, 5) for name in NAMES])
+    assert sorted(index.match('жим')) == ['Жим лежа', 'Жим стоя']
+    assert sorted(index.match('ТЯГА')) == ['Становая тяга', 'Тяга в наклоне']
+    assert index.match('ёлоч') == ['ЁЛОЧКА']
+    assert index.match('PULL') == ['Pull-up']
+    assert index.match('бег') == []
+    assert sorted(index.match('')) == sorted(NAMES)
+
+
+def test_range_merges_exercises_in_time_order():
+    generator = random.Random(5)
+    records = [Record(generator.randint(0, 1000), generator.choice(NAMES), 50.0, 5, number)
+               for number in range(500)]
+    index = ExerciseIndex(records)
+    names = index.match('тяга')
+    selected = index.range(names, 200, 700)
+    expected = [record for record in sorted(records, key=lambda r: r.minutes)
+                if record.exercise in names and 200 <= record.minutes <= 700]
+    assert [record.minutes for record in selected] == [record.minutes for record in expected]
+    assert sorted(record.id for record in selected) == sorted(record.id for record in expected)
+
+
+def test_names_follow_inserts_and_removals():
+    index = ExerciseIndex()
+    version = index.names_version
+    squat = Record(10, 'Присед', 100.0, 5)
+    index.insert(squat)
+    index.extend([Record(20, 'Жим', 80.0, 5), Record(30, 'Присед', 100.0, 5)])
+    assert index.names == ['Жим', 'Присед']
+    assert index.count('Присед') == 2
+    assert index.names_version > version
+
+    version = index.names_version
+    index.remove(squat)
+    assert index.names == ['Жим', 'Присед']
+    assert index.names_version == version  # Список названий не изменился
+    index.remove(index.records('Присед')[0])
+    assert index.names == ['Жим']
+    assert index.names_version > version
+    assert index.records('Присед') == []
+
+
+def test_store_filter_matches_brute_force(tmp_path):
+    generator = random.Random(6)
+    store = JournalStore(str(tmp_path / 'journal.json'), column_file=False)
+    store.create_empty()
+    store.extend([Record(generator.randint(0, 10000), generator.choice(NAMES), 50.0, 5) for _ in range(300)])
+    for query in ('жим', 'ТЯГ', 'ё', 'нет такого'):
+        expected = sorted((record for record in store.records if query.casefold() in record.exercise.casefold()),
+                          key=lambda record: (record.minutes, record.id))
+        selected = store.select(0, 10000, query)
+        assert sorted(selected, key=lambda record: (record.minutes, record.id)) == expected
+        assert [record.minutes for record in selected] == [record.minutes for record in expected]
+        assert set(store.statistics(0, 10 * 1440 - 1, query)[2]) == {record.exercise for record in expected}
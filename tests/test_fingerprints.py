@@ -0,0 +1,79 @@
+"""
+Отпечатки записей (journal/fingerprints.py): скалярный и векторный расчет, нормализация и поиск повторов.
+"""
+
+import random
+
+import numpy as np
+
+from journal.fingerprints import (FingerprintIndex, MERGE_SIZE, drop_duplicates, fingerprint, fingerprint_columns,
+                                  record_fingerprint, record_fingerprints)
+from journal.records import Record
+
+NAMES = ['Присед', 'присед ', 'Жим  лежа', 'жим лежа', 'Deadlift', 'Ёлочка', '']
+
+
+def random_records(count, seed=1):
+    generator = random.Random(seed)
+    return [
+        Record(generator.randint(-10**9, 10**9), generator.choice(NAMES),
+               generator.choice([0.0, 0.5, 82.5, 100.0, 100.005, 1e6, generator.uniform(0, 300)]),
+               generator.randint(0, 10**5), record_id)
+        for record_id in range(count)
+    ]
+
+
+def test_scalar_and_vectorized_agree():
+    records = random_records(5000)
+    vectorized = record_fingerprints(records)
+    assert vectorized.dtype == np.int64
+    assert vectorized.tolist() == [record_fingerprint(record) for record in records]
+
+
+def test_columns_agree_with_scalar():
+    names = ['Жим', 'Тяга']
+    minutes = np.array([0, -1, 2**40], dtype=np.int64)
+    exercise = np.array([1, 0, 1], dtype=np.int32)
+    weight = np.array([100.0, 0.01, 57.25])
+    repetitions = np.array([5, 0, 12], dtype=np.int32)
+    expected = [fingerprint(int(minutes[i]), names[exercise[i]], float(weight[i]), int(repetitions[i]))
+                for i in range(3)]
+    assert fingerprint_columns(minutes, exercise, weight, repetitions, names).tolist() == expected
+
+
+def test_normalized_fields_give_same_fingerprint():
+    assert fingerprint(1000, 'Присед', 100, 5) == fingerprint(1000, '  присед ', 100.0, 5)
+    assert fingerprint(1000, 'Жим лежа', 80, 5) == fingerprint(1000, 'жим   лежа', 80.0, 5)
+    assert fingerprint(1000, 'Присед', 100, 5) != fingerprint(1001, 'Присед', 100, 5)
+    assert fingerprint(1000, 'Присед', 100, 5) != fingerprint(1000, 'Присед', 100.01, 5)
+    assert fingerprint(1000, 'Присед', 100, 5) != fingerprint(1000, 'Присед', 100, 6)
+
+
+def test_index_counts_small_and_large_batches():
+    records = random_records(MERGE_SIZE + 10, seed=2)
+    values = record_fingerprints(records)
+    index = FingerprintIndex(values[:10])
+    index.extend(values[10:20])  # Маленькая пачка - в словарь изменений
+    index.extend(values[20:])  # Большая - в отсортированный массив
+    index.add(int(values[0]))
+    index.remove(int(values[1]))
+    counts = index.counts(values[:3].tolist())
+    assert counts.get(int(values[0])) == 2
+    assert int(values[1]) not in counts
+    assert counts.get(int(values[2])) == 1
+
+
+class FakeStore:
+    def __init__(self, records):
+        self.index = FingerprintIndex(record_fingerprints(records))
+
+    def fingerprint_counts(self, fingerprints):
+        return self.index.counts(fingerprints)
+
+
+def test_drop_duplicates_is_multiset():
+    journal = [Record(1000, 'Жим', 80, 5), Record(1000, 'Жим', 80, 5), Record(2000, 'Тяга', 100, 3)]
+    incoming = [Record(1000, 'жим', 80.0, 5) for _ in range(3)] + [Record(3000, 'Тяга', 100, 3)]
+    unique, duplicates = drop_duplicates(incoming, FakeStore(journal))
+    assert duplicates == 2
+    assert [(record.minutes, record.exercise) for record in unique] == [(1000, 'жим'), (3000, 'Тяга')]
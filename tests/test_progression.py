@@ -0,0 +1,110 @@
+"""
+Личные рекорды (journal/progression.py): формулы e1RM и рекорды хранилищ после добавления задним числом,
+изменения и удаления подходов в сравнении с рекордами, пересчитанными заново.
+"""
+
+import random
+
+import pytest
+
+from journal.progression import E1RM_MAX_REPETITIONS, ExerciseProgress, brzycki, epley, estimate_1rm
+from journal.records import MINUTES_PER_DAY, Record
+from journal.sqlite_store import SqliteStore
+from journal.store import JournalStore
+
+NAMES = ['Жим лежа', 'Присед', 'Становая тяга']
+
+
+def test_formulas():
+    assert epley(100, 1) == 100
+    assert epley(100, 10) == pytest.approx(133.33, abs=0.01)
+    assert brzycki(100, 10) == pytest.approx(133.33, abs=0.01)
+    assert estimate_1rm(100, E1RM_MAX_REPETITIONS) is not None
+    assert estimate_1rm(100, E1RM_MAX_REPETITIONS + 1) is None
+    assert estimate_1rm(100, 0) is None
+
+
+def test_exercise_progress():
+    records = [Record(1000, 'Жим', 100.0, 5, 1), Record(2000, 'Жим', 90.0, 10, 2),
+               Record(3000, 'Жим', 110.0, 1, 3), Record(4000, 'Жим', 60.0, 20, 4)]
+    progress = ExerciseProgress(records)
+    assert progress.best_weight.id == 3
+    assert progress.best_volume.id == 4
+    assert progress.best_e1rm['epley'][1].id == 2  # 90 x 10 ~ 120 кг
+    assert [record.id for record in progress.history] == [1, 2]
+    result = progress.to_dict()
+    assert result['best_weight']['weight'] == 110.0
+    assert set(result['rep_ranges']) == {'1', '4-6', '7-10', '16+'}
+    assert progress.involves(Record(0, 'Жим', 0.0, 1, 4))
+    assert not progress.involves(Record(0, 'Жим', 0.0, 1, 5))
+
+
+def fields(record):
+    return None if record is None else (record.weight, record.repetitions)
+
+
+def summary(progress):
+    """
+    Рекорды упражнения для сравнения. У лучших подходов сравниваются вес и повторения: подходы с одинаковыми
+    весом и повторениями равноценны, а история рекордов сравнивается вместе со временем подходов.
+    """
+    return (fields(progress.best_weight), fields(progress.best_volume),
+            {formula: (round(best, 6), fields(record)) for formula, (best, record) in progress.best_e1rm.items()},
+            [fields(record) for record in progress.ranges],
+            [(record.minutes, record.weight, record.repetitions) for record in progress.history])
+
+
+def recomputed(store):
+    records = {}
+    for record in store.snapshot():
+        records.setdefault(record.exercise, []).append(record)
+    return {name: summary(ExerciseProgress(exercise_records)) for name, exercise_records in sorted(records.items())}
+
+
+def random_record(generator, minutes):
+    return Record(minutes, generator.choice(NAMES), generator.choice([40.0, 60.0, 80.0, 100.0, 120.0]),
+                  generator.randint(1, 20))
+
+
+@pytest.fixture(params=['json', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'json':
+        store = JournalStore(str(tmp_path / 'journal.json'), column_file=False)
+    else:
+        store = SqliteStore(str(tmp_path / 'journal.db'))
+    store.create_empty()
+    return store
+
+
+def test_records_follow_changes(store):
+    generator = random.Random(25)
+    minutes = generator.sample(range(365 * MINUTES_PER_DAY), 2000)  # Разное время: порядок подходов однозначен
+    # Подходы добавляются вперемешку по времени, поэтому многие из них добавлены задним числом
+    for start in range(0, 300, 30):
+        store.extend([random_record(generator, minute) for minute in minutes[start:start + 30]])
+        assert {name: summary(progress) for name, progress in store.personal_records().items()} == recomputed(store)
+    for step in range(150):
+        ids = [record.id for record in store.snapshot()]
+        action = generator.random()
+        if action < 0.4:
+            store.add(random_record(generator, minutes[300 + step]))
+        elif action < 0.7:
+            store.update(generator.choice(ids), random_record(generator, minutes[500 + step]))
+        else:
+            store.remove(generator.sample(ids, generator.randint(1, 3)))
+        if step % 5 == 0:
+            assert {name: summary(progress) for name, progress in store.personal_records().items()} == \
+                recomputed(store)
+    assert {name: summary(progress) for name, progress in store.personal_records().items()} == recomputed(store)
+
+
+def test_record_history(store):
+    generator = random.Random(7)
+    minutes = generator.sample(range(100 * MINUTES_PER_DAY), 400)
+    store.extend([random_record(generator, minute) for minute in minutes])
+    start, end = 20 * MINUTES_PER_DAY, 60 * MINUTES_PER_DAY
+    expected = sorted((minute, weight, repetitions)
+                      for name, (*_, history) in recomputed(store).items() if 'жим' in name.casefold()
+                      for minute, weight, repetitions in history if start <= minute <= end)
+    history = store.record_history(start, end, 'ЖИМ')
+    assert [(record.minutes, record.weight, record.repetitions) for record in history] == expected
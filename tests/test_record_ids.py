@@ -0,0 +1,73 @@
+"""
+Постоянные номера записей (id): редактирование и удаление по номеру в хранилищах JSON и SQLite.
+"""
+
+import json
+
+import pytest
+
+from journal.engine import JournalEngine, make_filter
+from journal.store import JournalStore
+
+
+@pytest.fixture(params=['journal.json', 'journal.db'])
+def engine(request, tmp_path):
+    engine = JournalEngine(str(tmp_path / request.param), chart_directory=str(tmp_path / 'images'))
+    engine.load(create=True)
+    return engine
+
+
+def rows(engine):
+    return [(record.id, *record.values()) for record in engine.select(make_filter())]
+
+
+def test_ids_are_unique_and_stable(engine):
+    first = engine.add('01/01/2024 10:00', 'Жим', '80', '5')
+    second = engine.add('01/01/2024 10:00', 'Жим', '80', '5')  # Такая же запись
+    assert first.id != second.id
+    engine.remove([first.id])
+    third = engine.add('02/01/2024 10:00', 'Присед', '100', '5')
+    assert third.id not in (first.id, second.id)
+    engine.save()
+
+    reloaded = JournalEngine(engine.path)
+    reloaded.load()
+    assert [record.id for record in reloaded.select(make_filter())] == [second.id, third.id]
+
+
+def test_edit_and_delete_identical_records_by_id(engine):
+    records = [engine.add('01/01/2024 10:00', 'Жим', '80', '5') for _ in range(3)]
+    engine.update(records[1].id, '01/01/2024 10:00', 'Жим', '85', '5')
+    assert {row[0]: row[3] for row in rows(engine)} == {records[0].id: '80', records[1].id: '85', records[2].id: '80'}
+    assert engine.store.get(records[1].id).weight == 85.0
+
+    engine.remove([records[2].id])
+    assert sorted(row[0] for row in rows(engine)) == [records[0].id, records[1].id]
+    engine.save()
+    reloaded = JournalEngine(engine.path)
+    reloaded.load()
+    assert sorted(rows(reloaded)) == sorted(rows(engine))
+
+
+def test_update_missing_record_raises_key_error(engine):
+    record = engine.add('01/01/2024 10:00', 'Жим', '80', '5')
+    engine.remove([record.id])
+    engine.remove([record.id])  # Повторное удаление пропускается
+    with pytest.raises(KeyError):
+        engine.update(record.id, '01/01/2024 10:00', 'Жим', '85', '5')
+
+
+def test_legacy_journal_gets_ids(tmp_path):
+    path = tmp_path / 'journal.json'
+    entries = [{'datetime': '01/01/2024 10:00', 'exercise': 'Жим', 'weight': '80', 'repetitions': '5'}] * 2
+    entries.append({'id': 1, 'datetime': '02/01/2024 10:00', 'exercise': 'Присед', 'weight': '100',
+                    'repetitions': '5'})
+    path.write_text(json.dumps(entries), encoding='utf-8')
+
+    store = JournalStore(str(path), column_file=False)
+    store.load()
+    ids = sorted(record.id for record in store.records)
+    assert len(set(ids)) == 3 and 1 in ids
+    store.save()
+    saved = json.loads(path.read_text(encoding='utf-8'))
+    assert sorted(entry['id'] for entry in saved) == ids
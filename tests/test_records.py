@@ -0,0 +1,55 @@
+"""
+Типизированные записи журнала (journal/records.py): разбор словаря из файла и обратное преобразование.
+"""
+
+import pytest
+
+from journal.records import Record, format_weight, parse_datetime
+
+
+def test_from_dict_parses_fields_once():
+    record = Record.from_dict({'id': '7', 'datetime': '26/11/2024 07:11', 'exercise': 'Отжимания',
+                               'weight': '62.5', 'repetitions': '4'})
+    assert record.id == 7
+    assert record.minutes == parse_datetime('26/11/2024 07:11')
+    assert (record.exercise, record.weight, record.repetitions) == ('Отжимания', 62.5, 4)
+    assert record.volume == 250.0
+
+
+def test_legacy_entry_without_id():
+    record = Record.from_dict({'datetime': '01/01/2024 10:00', 'exercise': 'Жим', 'weight': '80',
+                               'repetitions': '5'})
+    assert record.id is None
+
+
+def test_round_trip_keeps_file_strings():
+    entry = {'id': 3, 'datetime': '05/03/2023 18:30', 'exercise': 'Присед', 'weight': '110', 'repetitions': '8'}
+    record = Record.from_dict(entry)
+    assert record.to_dict() == entry
+    assert record.values() == ('05/03/2023 18:30', 'Присед', '110', '8')
+
+
+def test_exercise_names_are_interned():
+    first = Record(0, ''.join(['Ста', 'нова', 'я тяга']), 100.0, 5)
+    second = Record(1, ''.join(['Станов', 'ая тяга']), 100.0, 5)
+    assert first.exercise is second.exercise
+
+
+def test_records_have_no_instance_dict():
+    with pytest.raises(AttributeError):
+        Record(0, 'Жим', 80.0, 5).note = "лишнее поле"
+
+
+@pytest.mark.parametrize('weight, text', [(110.0, '110'), (62.5, '62.5'), (0.25, '0.25'), (100, '100')])
+def test_format_weight(weight, text):
+    assert format_weight(weight) == text
+
+
+@pytest.mark.parametrize('entry', [
+    {'datetime': '01/01/2024 10:00', 'exercise': 'Жим', 'weight': 'восемьдесят', 'repetitions': '5'},
+    {'datetime': '01/01/2024 10:00', 'exercise': 'Жим', 'weight': '80', 'repetitions': '5.5'},
+    {'datetime': '32/01/2024 10:00', 'exercise': 'Жим', 'weight': '80', 'repetitions': '5'},
+])
+def test_invalid_entry_raises_value_error(entry):
+    with pytest.raises(ValueError):
+        Record.from_dict(entry)
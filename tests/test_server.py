@@ -0,0 +1,123 @@
+"""
+Локальный сервер журнала (journal/server.py): задача-писатель и ответы на добавления.
+"""
+
+import asyncio
+import json
+from urllib.parse import quote
+
+from journal.engine import JournalEngine
+from journal.server import JournalServer
+
+
+async def request(server, method, target, data=None):
+    reader, writer = await asyncio.open_connection(server.host, server.port)
+    body = json.dumps(data).encode('utf-8') if data is not None else b''
+    writer.write(f"{method} {target} HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+                 .encode('latin-1') + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    return int(head.split(b' ')[1]), json.loads(body)
+
+
+def record(minute, exercise='Присед', weight='100', repetitions='5'):
+    return {'datetime': f'01/01/2024 10:{minute:02}', 'exercise': exercise, 'weight': weight,
+            'repetitions': repetitions}
+
+
+def run_server(tmp_path, scenario):
+    engine = JournalEngine(str(tmp_path / 'journal.json'), chart_directory=str(tmp_path / 'images'),
+                           write_behind=True)
+    engine.load(create=True)
+
+    async def main():
+        server = JournalServer(engine, port=0)
+        await server.start()
+        try:
+            # Ответ не должен зависнуть, даже если писатель остановился
+            return await asyncio.wait_for(scenario(server, engine), 10)
+        finally:
+            await server.close()
+    return asyncio.run(main())
+
+
+def test_concurrent_adds_are_saved(tmp_path):
+    async def scenario(server, engine):
+        responses = await asyncio.gather(*(request(server, 'POST', '/records', record(minute))
+                                           for minute in range(20)))
+        assert [status for status, body in responses] == [201] * 20
+        status, body = await request(server, 'GET', '/records')
+        assert body['total'] == 20
+    run_server(tmp_path, scenario)
+    reloaded = JournalEngine(str(tmp_path / 'journal.json'))
+    assert reloaded.load() == 20
+
+
+def test_invalid_fields_do_not_affect_batch(tmp_path):
+    async def scenario(server, engine):
+        responses = await asyncio.gather(request(server, 'POST', '/records', record(1)),
+                                         request(server, 'POST', '/records', record(2, weight='тяжело')),
+                                         request(server, 'POST', '/records', record(3)))
+        assert [status for status, body in responses] == [201, 400, 201]
+        assert engine.store.count() == 2
+    run_server(tmp_path, scenario)
+
+
+def test_writer_survives_unexpected_add_error(tmp_path):
+    async def scenario(server, engine):
+        add = engine.add
+
+        def failing_add(*fields):
+            raise RuntimeError("сбой")
+        engine.add = failing_add
+        status, body = await request(server, 'POST', '/records', record(1))
+        assert status == 500
+        engine.add = add
+        status, body = await request(server, 'POST', '/records', record(2))
+        assert status == 201
+    run_server(tmp_path, scenario)
+
+
+def test_writer_survives_save_error(tmp_path):
+    async def scenario(server, engine):
+        save = engine.save
+
+        def failing_save(path=None):
+            raise RuntimeError("диск недоступен")
+        engine.save = failing_save
+        status, body = await request(server, 'POST', '/records', record(1))
+        assert status == 500
+        assert "диск недоступен" in body['error']
+        engine.save = save
+        status, body = await request(server, 'POST', '/records', record(2))
+        assert status == 201
+    run_server(tmp_path, scenario)
+
+
+def test_writer_survives_executor_error(tmp_path):
+    async def scenario(server, engine):
+        apply = server._apply
+
+        def broken(batch):
+            raise MemoryError()
+        server._apply = broken
+        status, body = await request(server, 'POST', '/records', record(1))
+        assert status == 500
+        server._apply = apply
+        status, body = await request(server, 'POST', '/records', record(2))
+        assert status == 201
+    run_server(tmp_path, scenario)
+
+
+def test_statistics_and_errors(tmp_path):
+    async def scenario(server, engine):
+        await request(server, 'POST', '/records', record(1, weight='100', repetitions='5'))
+        status, body = await request(server, 'GET', '/stats?exercise=' + quote('прис'))
+        assert status == 200
+        assert body['weight'] == 500 and body['repetitions'] == 5
+        assert (await request(server, 'GET', '/nowhere'))[0] == 404
+        assert (await request(server, 'DELETE', '/records'))[0] == 405
+        assert (await request(server, 'GET', '/stats?from=31/02/2024'))[0] == 400
+    run_server(tmp_path, scenario)
@@ -0,0 +1,149 @@
+"""
+Хранилище SQLite (journal/sqlite_store.py): те же ответы, что у хранилища JSON, на тех же данных; перенос записей.
+"""
+
+import random
+import sqlite3
+
+import numpy as np
+import pytest
+
+from journal.fingerprints import record_fingerprint
+from journal.records import MINUTES_PER_DAY, Record
+from journal.sqlite_store import SqliteStore
+from journal.store import JournalStore
+
+NAMES = ['Жим лежа', 'Жим стоя', 'Присед', 'Становая тяга', 'ЁЛОЧКА']
+DAYS = 60
+
+
+def random_records(generator, count):
+    minutes = generator.sample(range(DAYS * MINUTES_PER_DAY), count)  # Разное время: порядок однозначен
+    return [Record(minute, generator.choice(NAMES), generator.choice([40.0, 62.5, 100.0, 142.5]),
+                   generator.randint(1, 15)) for minute in minutes]
+
+
+def copy(record):
+    return Record(record.minutes, record.exercise, record.weight, record.repetitions)
+
+
+@pytest.fixture
+def stores(tmp_path):
+    """
+    Хранилища JSON и SQLite с одинаковыми записями и одинаковыми изменениями.
+    """
+    generator = random.Random(14)
+    json_store = JournalStore(str(tmp_path / 'journal.json'), column_file=False)
+    sqlite_store = SqliteStore(str(tmp_path / 'journal.db'))
+    for store in (json_store, sqlite_store):
+        store.create_empty()
+    records = random_records(generator, 400)
+    json_store.extend([copy(record) for record in records])
+    sqlite_store.extend([copy(record) for record in records])
+    assert sorted(record.id for record in json_store.records) == sorted(record.id for record in sqlite_store.records)
+
+    ids = sorted(record.id for record in json_store.records)
+    replacements = random_records(generator, 30)
+    for record_id, new in zip(generator.sample(ids, 30), replacements):
+        json_store.update(record_id, copy(new))
+        sqlite_store.update(record_id, copy(new))
+    removed = generator.sample(ids, 40)
+    json_store.remove(removed)
+    sqlite_store.remove(removed)
+    return json_store, sqlite_store
+
+
+def fields(records):
+    return [(record.id, record.minutes, record.exercise, record.weight, record.repetitions) for record in records]
+
+
+FILTERS = [(0, DAYS * MINUTES_PER_DAY - 1, None), (10 * MINUTES_PER_DAY, 20 * MINUTES_PER_DAY - 1, 'жим'),
+           (12345, 45678, None), (12345, 45678, 'ТЯГА'), (0, DAYS * MINUTES_PER_DAY, 'ё'),
+           (0, DAYS * MINUTES_PER_DAY, 'нет такого')]
+
+
+def test_same_records(stores):
+    json_store, sqlite_store = stores
+    assert json_store.count() == sqlite_store.count() == 360
+    assert fields(json_store.snapshot()) == fields(sqlite_store.snapshot())
+    assert fields(json_store.ordered()) == fields(sqlite_store.ordered())
+    assert list(json_store.exercise_names()) == list(sqlite_store.exercise_names())
+    some_id = json_store.snapshot()[7].id
+    assert fields([json_store.get(some_id)]) == fields([sqlite_store.get(some_id)])
+
+
+@pytest.mark.parametrize('start, end, exercise_filter', FILTERS)
+def test_same_queries(stores, start, end, exercise_filter):
+    json_store, sqlite_store = stores
+    assert fields(json_store.select(start, end, exercise_filter)) == \
+        fields(sqlite_store.select(start, end, exercise_filter))
+
+    expected = json_store.statistics(start, end, exercise_filter)
+    actual = sqlite_store.statistics(start, end, exercise_filter)
+    assert actual[0] == pytest.approx(expected[0])
+    assert actual[1] == expected[1]
+    assert set(actual[2]) == set(expected[2])
+    for name, stats in expected[2].items():
+        assert actual[2][name]['weight'] == pytest.approx(stats['weight'])
+        assert (actual[2][name]['repetitions'], actual[2][name]['count']) == (stats['repetitions'], stats['count'])
+
+    for expected_column, actual_column in zip(json_store.series(start, end, exercise_filter),
+                                              sqlite_store.series(start, end, exercise_filter)):
+        assert actual_column.tolist() == expected_column.tolist()
+
+
+def test_same_columns_and_records(stores):
+    json_store, sqlite_store = stores
+    expected, actual = json_store.columns(), sqlite_store.columns()
+    assert expected.names == actual.names
+    for name in ('minutes', 'weight', 'repetitions', 'exercise'):
+        assert np.array_equal(getattr(expected, name), getattr(actual, name))
+
+    json_records = json_store.personal_records()
+    sqlite_records = sqlite_store.personal_records()
+    assert set(json_records) == set(sqlite_records)
+    for name, progress in json_records.items():
+        assert sqlite_records[name].to_dict() == progress.to_dict()
+
+
+def test_same_fingerprint_counts(stores):
+    json_store, sqlite_store = stores
+    records = json_store.snapshot()[:20] + [Record(1, 'Жим лежа', 40.0, 1)]
+    fingerprints = [record_fingerprint(record) for record in records]
+    assert json_store.fingerprint_counts(fingerprints) == sqlite_store.fingerprint_counts(fingerprints)
+
+
+def test_changes_survive_reopen(stores, tmp_path):
+    json_store, sqlite_store = stores
+    reopened = SqliteStore(sqlite_store.path)
+    reopened.load()
+    assert fields(reopened.snapshot()) == fields(json_store.snapshot())
+
+
+def test_migration_from_json(stores, tmp_path):
+    json_store, sqlite_store = stores
+    json_store.save()
+    migrated = SqliteStore(str(tmp_path / 'migrated.db'), migrate_from=json_store.path)
+    migrated.load()
+    assert fields(migrated.snapshot()) == fields(json_store.snapshot())
+
+    migrated.remove([record.id for record in migrated.snapshot()[:10]])
+    again = SqliteStore(migrated.path, migrate_from=json_store.path)  # Перенос выполняется один раз
+    again.load()
+    assert again.count() == json_store.count() - 10
+
+
+def test_missing_database_without_migration(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        SqliteStore(str(tmp_path / 'missing.db')).load()
+    with pytest.raises(FileNotFoundError):
+        SqliteStore(str(tmp_path / 'missing.db'), migrate_from=str(tmp_path / 'missing.json')).load()
+
+
+def test_read_only_database(stores):
+    json_store, sqlite_store = stores
+    reader = SqliteStore(sqlite_store.path, read_only=True)
+    reader.load()
+    assert reader.count() == sqlite_store.count()
+    with pytest.raises(sqlite3.OperationalError):
+        reader.add(Record(0, 'Жим лежа', 40.0, 1))
@@ -0,0 +1,96 @@
+"""
+Инкрементальная статистика (journal/stats.py, StatsEngine): сравнение с пересчетом по всем записям.
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from journal.records import MINUTES_PER_DAY, Record
+from journal.stats import StatsEngine, summarize
+from journal.store import JournalStore
+
+NAMES = ['Жим', 'Присед', 'Тяга', 'Подтягивания']
+
+
+def random_record(generator):
+    return Record(generator.randint(0, 30 * MINUTES_PER_DAY), generator.choice(NAMES),
+                  generator.choice([20.0, 62.5, 80.0, 101.25]), generator.randint(1, 12))
+
+
+def assert_same_statistics(actual, expected):
+    total_weight, total_repetitions, exercises = actual
+    assert total_weight == pytest.approx(expected[0])
+    assert total_repetitions == expected[1]
+    assert set(exercises) == set(expected[2])
+    for name, stats in expected[2].items():
+        assert exercises[name]['weight'] == pytest.approx(stats['weight'])
+        assert (exercises[name]['repetitions'], exercises[name]['count']) == (stats['repetitions'], stats['count'])
+
+
+def recomputed(records, start_day, end_day, names=None):
+    return summarize([record for record in records
+                      if start_day <= record.minutes // MINUTES_PER_DAY <= end_day
+                      and (names is None or record.exercise in names)])
+
+
+def test_incremental_updates_match_recompute():
+    generator = random.Random(6)
+    engine = StatsEngine()
+    present = []
+    for step in range(400):
+        if generator.random() < 0.65 or not present:
+            record = random_record(generator)
+            engine.add(record)
+            present.append(record)
+        elif generator.random() < 0.5:
+            engine.remove(present.pop(generator.randrange(len(present))))
+        else:  # Редактирование - удаление старой записи и добавление новой
+            index = generator.randrange(len(present))
+            engine.remove(present[index])
+            present[index] = random_record(generator)
+            engine.add(present[index])
+        if step % 20 == 0:
+            start_day = generator.randint(0, 30)
+            end_day = start_day + generator.randint(0, 10)
+            assert_same_statistics(engine.query(start_day, end_day), recomputed(present, start_day, end_day))
+            names = generator.sample(NAMES, 2)
+            assert_same_statistics(engine.query(start_day, end_day, names),
+                                   recomputed(present, start_day, end_day, names))
+    assert_same_statistics(engine.query(0, 30), recomputed(present, 0, 30))
+
+
+def test_removing_everything_leaves_no_exercises():
+    records = [Record(day * MINUTES_PER_DAY, 'Жим', 80.0, 5) for day in range(3)]
+    engine = StatsEngine(records)
+    for record in records:
+        engine.remove(record)
+    assert engine.query(0, 10) == (0.0, 0, {})
+
+
+def test_rebuild_arrays_matches_rebuild():
+    generator = random.Random(7)
+    records = [random_record(generator) for _ in range(500)]
+    names = sorted(NAMES)
+    codes = {name: code for code, name in enumerate(names)}
+    engine = StatsEngine()
+    engine.rebuild_arrays(np.array([record.minutes for record in records], dtype=np.int64),
+                          np.array([record.weight for record in records]),
+                          np.array([record.repetitions for record in records], dtype=np.int32),
+                          np.array([codes[record.exercise] for record in records], dtype=np.int32), names)
+    assert_same_statistics(engine.query(0, 30), StatsEngine(records).query(0, 30))
+    assert_same_statistics(engine.query(5, 9, ['Тяга']), recomputed(records, 5, 9, ['Тяга']))
+
+
+def test_store_statistics_follow_edits(tmp_path):
+    store = JournalStore(str(tmp_path / 'journal.json'), column_file=False)
+    store.create_empty()
+    generator = random.Random(8)
+    store.extend([random_record(generator) for _ in range(200)])
+    for record in list(store.records)[:20]:
+        store.update(record.id, random_record(generator))
+    store.remove([record.id for record in list(store.records)[20:40]])
+    end = 31 * MINUTES_PER_DAY - 1
+    assert_same_statistics(store.statistics(0, end), recomputed(store.records, 0, 30))
+    assert_same_statistics(store.statistics(0, end, 'ПРИ'), recomputed(store.records, 0, 30, ['Присед']))
@@ -0,0 +1,92 @@
+"""
+Журнал изменений хранилища JSON (journal/store.py): восстановление после сбоя и журнал чужого снимка.
+"""
+
+import json
+import os
+
+from journal.records import Record
+from journal.store import JournalStore, atomic_write_json
+
+
+def make_store(path, count=2):
+    store = JournalStore(str(path), column_file=False)
+    store.create_empty()
+    for minute in range(count):
+        store.add(Record(1000 + minute, 'Жим', 80 + minute, 5))
+    return store
+
+
+def summary(store):
+    return sorted((record.id, record.minutes, record.exercise, record.weight, record.repetitions)
+                  for record in store.records)
+
+
+def test_torn_last_line_is_dropped_and_truncated(tmp_path):
+    path = tmp_path / 'journal.json'
+    store = make_store(path)
+    log_path = store.log_path
+    valid_size = os.path.getsize(log_path)
+    with open(log_path, 'a') as file:
+        file.write('{"op": "add", "record": {"id": 9, "date')  # Сбой посреди записи строки
+
+    reloaded = JournalStore(str(path), column_file=False)
+    reloaded.load()
+    assert summary(reloaded) == summary(store)
+    assert os.path.getsize(log_path) == valid_size
+
+    # Следующая операция не склеивается с обрезанной строкой
+    reloaded.add(Record(2000, 'Присед', 100, 3))
+    again = JournalStore(str(path), column_file=False)
+    again.load()
+    assert summary(again) == summary(reloaded)
+    assert len(again.records) == 3
+
+
+def test_unparsable_operation_stops_replay(tmp_path):
+    path = tmp_path / 'journal.json'
+    store = make_store(path)
+    with open(store.log_path, 'a') as file:
+        file.write('не JSON\n')
+        file.write(json.dumps({'op': 'del', 'id': 1}) + '\n')
+
+    reloaded = JournalStore(str(path), column_file=False)
+    reloaded.load()
+    assert summary(reloaded) == summary(store)
+
+
+def test_log_of_another_snapshot_is_discarded(tmp_path):
+    path = tmp_path / 'journal.json'
+    store = make_store(path)
+    assert os.path.exists(store.log_path)
+
+    # Снимок заменен (например, свернут другим процессом): журнал изменений относится к прежнему снимку
+    atomic_write_json(str(path), [Record(5000, 'Тяга', 120, 3, 1).to_dict()])
+    reloaded = JournalStore(str(path), column_file=False)
+    reloaded.load()
+    assert summary(reloaded) == [(1, 5000, 'Тяга', 120.0, 3)]
+    assert not os.path.exists(store.log_path)
+
+
+def test_log_without_header_is_discarded(tmp_path):
+    path = tmp_path / 'journal.json'
+    store = make_store(path, count=0)
+    with open(store.log_path, 'w') as file:
+        file.write(json.dumps({'op': 'add', 'record': Record(1000, 'Жим', 80, 5, 1).to_dict()}) + '\n')
+
+    reloaded = JournalStore(str(path), column_file=False)
+    reloaded.load()
+    assert summary(reloaded) == []
+
+
+def test_read_only_store_leaves_files_untouched(tmp_path):
+    path = tmp_path / 'journal.json'
+    store = make_store(path)
+    with open(store.log_path, 'a') as file:
+        file.write('{"op": "add"')
+    size = os.path.getsize(store.log_path)
+
+    reader = JournalStore(str(path), journal_mode=False, column_file=False, read_only=True)
+    reader.load()
+    assert summary(reader) == summary(store)
+    assert os.path.getsize(store.log_path) == size
@@ -0,0 +1,92 @@
+"""
+Планировщик фоновых задач (journal/tasks.py) с поддельным главным циклом Tk.
+"""
+
+import threading
+import time
+
+from journal.tasks import TaskScheduler
+
+
+class FakeRoot:
+    """
+    Заменяет root.after: отложенные вызовы выполняются в тесте методом run.
+    """
+    def __init__(self):
+        self.callbacks = {}
+        self.next_id = 0
+
+    def after(self, delay, callback):
+        self.next_id += 1
+        self.callbacks[self.next_id] = callback
+        return self.next_id
+
+    def after_cancel(self, callback_id):
+        self.callbacks.pop(callback_id, None)
+
+    def run(self, timeout=5):
+        deadline = time.monotonic() + timeout
+        while self.callbacks and time.monotonic() < deadline:
+            callback_id = min(self.callbacks)
+            self.callbacks.pop(callback_id)()
+            time.sleep(0.001)
+
+
+def test_reads_with_same_key_are_merged():
+    root = FakeRoot()
+    scheduler = TaskScheduler(root)
+    release = threading.Event()
+    results = []
+    first = scheduler.submit('charts', lambda task: release.wait(5) and 1, on_done=results.append)
+    second = scheduler.submit('charts', lambda task: 2, on_done=results.append)
+    assert second is first
+    release.set()
+    root.run()
+    assert results == [1]
+    scheduler.shutdown(wait=True)
+
+
+def test_mutations_are_not_merged():
+    root = FakeRoot()
+    scheduler = TaskScheduler(root)
+    release = threading.Event()
+    results = []
+    first = scheduler.submit('add', lambda task: release.wait(5) and 'первая', on_done=results.append, merge=False)
+    second = scheduler.submit('add', lambda task: 'вторая', on_done=results.append, merge=False)
+    assert second is not first
+    assert scheduler.running('add') is not None
+    release.set()
+    root.run()
+    assert sorted(results) == ['вторая', 'первая']
+    assert scheduler.running('add') is None
+    scheduler.shutdown(wait=True)
+
+
+def test_error_and_progress_are_delivered():
+    root = FakeRoot()
+    scheduler = TaskScheduler(root)
+    errors = []
+    fractions = []
+
+    def failing(task):
+        task.progress(0.5)
+        raise ValueError("ошибка")
+    scheduler.submit('import', failing, on_error=errors.append, on_progress=fractions.append)
+    root.run()
+    assert [str(error) for error in errors] == ["ошибка"]
+    assert fractions == [0.5]
+    scheduler.shutdown(wait=True)
+
+
+def test_shutdown_waits_for_running_task():
+    root = FakeRoot()
+    scheduler = TaskScheduler(root)
+    finished = []
+
+    def slow(task):
+        time.sleep(0.1)
+        finished.append(task.cancelled())
+    scheduler.submit('import', slow)
+    time.sleep(0.02)
+    scheduler.shutdown(wait=True)
+    assert finished == [True]
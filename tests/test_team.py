@@ -0,0 +1,241 @@
+"""
+Статистика команды (journal/team.py): итоги, пересчитанные напрямую по записям, кэш итогов журналов
+и чтение чужих журналов без изменения их файлов.
+"""
+
+import datetime
+import gc
+import json
+import os
+import random
+
+import pytest
+
+from journal.records import MINUTES_PER_DAY, Record
+from journal.sqlite_store import SqliteStore
+from journal.store import JournalStore
+from journal.team import TEAM_CACHE_FILE, TeamStats, journal_stamp, list_journals, team_lines
+
+NAMES = ['Жим лежа', 'Жим стоя', 'Присед', 'Становая тяга']
+DAYS = 90
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def random_records(generator, count):
+    return [Record(generator.randrange(DAYS * MINUTES_PER_DAY), generator.choice(NAMES),
+                   generator.choice([40.0, 62.5, 100.0]), generator.randint(1, 12)) for _ in range(count)]
+
+
+def write_journal(path, records):
+    """
+    Записывает журнал спортсмена и закрывает его (соединение SQLite закрывается сборщиком мусора:
+    хранилище входит в цикл ссылок), чтобы файлы журнала больше не менялись.
+    """
+    store = SqliteStore(str(path)) if path.suffix == '.db' else JournalStore(str(path), column_file=False)
+    store.create_empty()
+    store.extend(records)
+    store.save()
+    del store
+    gc.collect()
+
+
+def files_state(directory):
+    """
+    Содержимое и время изменения всех файлов каталога (кроме кэша статистики).
+    """
+    state = {}
+    for entry in os.scandir(directory):
+        if entry.name != TEAM_CACHE_FILE:
+            with open(entry.path, 'rb') as file:
+                state[entry.name] = (file.read(), entry.stat().st_mtime_ns)
+    return state
+
+
+def period_label(minutes, period):
+    day = (EPOCH + datetime.timedelta(minutes=minutes)).date()
+    if period == 'week':
+        return (day - datetime.timedelta(days=day.weekday())).isoformat()
+    if period == 'month':
+        return day.isoformat()[:7]
+    return day.isoformat()
+
+
+def expected_summary(records, start, end, exercise_filter, period):
+    """
+    Итоги журнала, посчитанные перебором записей.
+    """
+    summary = {'weight': 0.0, 'repetitions': 0, 'count': 0, 'exercises': {}, 'periods': {}}
+    for record in records:
+        if not start <= record.minutes <= end or exercise_filter.casefold() not in record.exercise.casefold():
+            continue
+        for totals in (summary, summary['exercises'].setdefault(record.exercise, {'weight': 0.0, 'repetitions': 0,
+                                                                                  'count': 0}),
+                       summary['periods'].setdefault(period_label(record.minutes, period),
+                                                     {'weight': 0.0, 'repetitions': 0, 'count': 0})):
+            totals['weight'] += record.weight * record.repetitions
+            totals['repetitions'] += record.repetitions
+            totals['count'] += 1
+    return summary
+
+
+def assert_summary(actual, expected):
+    assert actual['weight'] == pytest.approx(expected['weight'])
+    assert (actual['repetitions'], actual['count']) == (expected['repetitions'], expected['count'])
+    for key in ('exercises', 'periods'):
+        assert set(actual[key]) == set(expected[key])
+        for name, totals in expected[key].items():
+            assert actual[key][name]['weight'] == pytest.approx(totals['weight'])
+            assert actual[key][name]['repetitions'] == totals['repetitions']
+            assert actual[key][name]['count'] == totals['count']
+
+
+@pytest.fixture
+def team(tmp_path):
+    """
+    Каталог команды с журналами JSON и SQLite и записи каждого спортсмена.
+    """
+    generator = random.Random(22)
+    athletes = {}
+    for name in ('Иванов.json', 'Петров.json', 'Сидоров.db'):
+        records = random_records(generator, 300)
+        write_journal(tmp_path / name, records)
+        athletes[os.path.splitext(name)[0]] = records
+    return tmp_path, athletes
+
+
+def test_list_journals_skips_service_files(tmp_path):
+    for name in ('b.json', 'A.db', 'c.sqlite3', 'b.json.wal', 'b.json.cols', '.team_stats.json', '.tmp.json',
+                 'notes.txt', 'A.db-wal'):
+        (tmp_path / name).write_text('')
+    (tmp_path / 'folder.json').mkdir()
+    assert list(list_journals(str(tmp_path))) == ['A', 'b', 'c']
+
+
+def test_journal_stamp_changes_on_save(tmp_path):
+    path = tmp_path / 'journal.json'
+    store = JournalStore(str(path), column_file=False)
+    store.create_empty()
+    store.add(Record(1000, 'Жим', 80.0, 5))
+    store.save()
+    stamp = journal_stamp(str(path))
+    assert journal_stamp(str(path)) == stamp
+    store.add(Record(2000, 'Жим', 85.0, 5))
+    store.save()
+    assert journal_stamp(str(path)) != stamp
+
+    # Пустой журнал изменений SQLite (его создает и чтение базы) отметку не меняет
+    db_path = tmp_path / 'journal.db'
+    write_journal(db_path, [Record(1000, 'Жим', 80.0, 5)])
+    stamp = journal_stamp(str(db_path))
+    open(str(db_path) + '-wal', 'wb').close()
+    assert journal_stamp(str(db_path)) == stamp
+
+
+@pytest.mark.parametrize('start, end, exercise_filter, period', [
+    (0, DAYS * MINUTES_PER_DAY - 1, '', 'month'),
+    (10 * MINUTES_PER_DAY, 40 * MINUTES_PER_DAY - 1, 'ЖИМ', 'week'),
+    (12345, 98765, 'тяга', 'day'),
+])
+def test_collect_matches_recomputed_totals(team, start, end, exercise_filter, period):
+    directory, athletes = team
+    stats = TeamStats(str(directory), max_workers=2)
+    try:
+        report = stats.collect(start, end, exercise_filter, period)
+    finally:
+        stats.close()
+    assert not report.errors
+    assert list(report.athletes) == sorted(athletes)
+    expected = {athlete: expected_summary(records, start, end, exercise_filter, period)
+                for athlete, records in athletes.items()}
+    for athlete, summary in expected.items():
+        assert_summary(report.athletes[athlete], summary)
+
+    totals = report.totals()
+    assert totals['weight'] == pytest.approx(sum(summary['weight'] for summary in expected.values()))
+    assert totals['count'] == sum(summary['count'] for summary in expected.values())
+    assert list(report.periods()) == sorted(report.periods())
+    for exercise, board in report.leaderboards().items():
+        volumes = sorted(((summary['exercises'][exercise]['weight'], athlete)
+                          for athlete, summary in expected.items() if exercise in summary['exercises']),
+                         reverse=True)
+        assert [athlete for athlete, _ in board] == [athlete for _, athlete in volumes]
+    assert team_lines(report)[0] == f"Спортсменов: {len(athletes)}"
+
+
+def test_cache_reuses_unchanged_journals(team):
+    directory, athletes = team
+    query = (0, DAYS * MINUTES_PER_DAY - 1, '', 'month')
+    stats = TeamStats(str(directory), max_workers=2)
+    try:
+        first = stats.collect(*query)
+        assert first.cached == 0
+        assert os.path.exists(directory / TEAM_CACHE_FILE)
+
+        # Повторный запрос - весь из кэша, в том числе в новом сеансе
+        assert stats.collect(*query).cached == len(athletes)
+        assert TeamStats(str(directory)).collect(*query).cached == len(athletes)
+
+        # Изменился один журнал: пересчитывается только он
+        store = JournalStore(str(directory / 'Петров.json'), column_file=False)
+        store.load()
+        added = Record(5 * MINUTES_PER_DAY, 'Присед', 200.0, 1)
+        store.add(added)
+        store.save()
+        report = stats.collect(*query)
+        assert report.cached == len(athletes) - 1
+        assert_summary(report.athletes['Петров'], expected_summary(athletes['Петров'] + [added], *query))
+
+        # Другие параметры запроса кэшем не обслуживаются
+        assert stats.collect(0, DAYS * MINUTES_PER_DAY - 1, '', 'year').cached == 0
+
+        # Удаленный журнал исчезает из отчета и из кэша
+        os.remove(directory / 'Иванов.json')
+        os.remove(str(directory / 'Иванов.json') + '.wal')
+        report = stats.collect(*query)
+        assert 'Иванов' not in report.athletes
+        with open(directory / TEAM_CACHE_FILE) as file:
+            assert 'Иванов.json' not in json.load(file)
+    finally:
+        stats.close()
+
+
+def test_damaged_journal_is_reported(team):
+    directory, athletes = team
+    (directory / 'Сломанный.json').write_text('[{"datetime": "01/01/2024 10:00", "exercise"')
+    stats = TeamStats(str(directory), max_workers=2)
+    try:
+        report = stats.collect(0, DAYS * MINUTES_PER_DAY - 1)
+    finally:
+        stats.close()
+    assert list(report.errors) == ['Сломанный']
+    assert list(report.athletes) == sorted(athletes)
+
+
+def test_journals_are_read_without_changes(tmp_path):
+    # Старый журнал без номеров записей: при обычном открытии номера сохранились бы в файл
+    legacy = [{'datetime': '01/01/1970 10:00', 'exercise': 'Жим', 'weight': '80', 'repetitions': '5'},
+              {'datetime': '02/01/1970 10:00', 'exercise': 'Присед', 'weight': '100', 'repetitions': '3'}]
+    (tmp_path / 'Старый.json').write_text(json.dumps(legacy, ensure_ascii=False))
+
+    # Журнал изменений с недописанной последней строкой: при обычном открытии она была бы обрезана
+    records = [Record(1000, 'Жим', 80.0, 5), Record(3000, 'Жим', 85.0, 5)]
+    write_journal(tmp_path / 'Новый.json', records)
+    with open(tmp_path / 'Новый.json.wal', 'a') as file:
+        file.write('{"op": "add", "record": {"id": 9, "date')
+    write_journal(tmp_path / 'База.db', records)
+
+    state = files_state(tmp_path)
+    stamps = {name: journal_stamp(str(tmp_path / name)) for name in state}
+    stats = TeamStats(str(tmp_path), max_workers=2)
+    try:
+        report = stats.collect(0, DAYS * MINUTES_PER_DAY - 1)
+    finally:
+        stats.close()
+    assert not report.errors
+    assert report.athletes['Старый']['repetitions'] == 8
+    assert report.athletes['Новый']['count'] == report.athletes['База']['count'] == 2
+    # Файлы журналов не изменились; новыми могут быть только служебные файлы чтения базы SQLite в режиме WAL
+    after = files_state(tmp_path)
+    assert {name: after[name] for name in state} == state
+    assert set(after) - set(state) <= {'База.db-wal', 'База.db-shm'}
+    assert {name: journal_stamp(str(tmp_path / name)) for name in state} == stamps
@@ -0,0 +1,86 @@
+"""
+Разбор и форматы даты и времени (journal/records.py): быстрый разбор фиксированного формата, ISO и минуты эпохи.
+"""
+
+import json
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from journal.records import (Record, datetime_to_minutes, format_datetime, format_iso_datetime, parse_datetime,
+                             parse_iso_datetime, parse_timestamp, timestamp_format_of)
+from journal.store import JournalStore
+
+
+def test_fast_parser_matches_strptime():
+    generator = random.Random(20)
+    start = datetime(1900, 1, 1)
+    for _ in range(2000):
+        moment = start + timedelta(minutes=generator.randint(0, 250 * 365 * 1440))
+        text = moment.strftime('%d/%m/%Y %H:%M')
+        expected = datetime_to_minutes(datetime.strptime(text, '%d/%m/%Y %H:%M'))
+        assert parse_datetime(text) == expected
+        assert format_datetime(expected) == text
+        iso = format_iso_datetime(expected)
+        assert iso == moment.strftime('%Y-%m-%dT%H:%M')
+        assert parse_iso_datetime(iso) == parse_timestamp(iso) == expected
+
+
+def test_dates_without_leading_zeros():
+    assert parse_datetime('1/2/2024 7:05') == parse_datetime('01/02/2024 07:05')
+
+
+@pytest.mark.parametrize('text', ['31/02/2024 10:00', '01/13/2024 10:00', '01/01/2024 24:00', '01/01/2024 10:60',
+                                  '01-01-2024 10:00', '2024/01/01 10:00', '01/01/2024', '', 'ab/cd/efgh ij:kl',
+                                  '０1/01/2024 10:00', '01/01/2024 10:00 '])
+def test_invalid_dates_are_rejected(text):
+    with pytest.raises(ValueError):
+        parse_datetime(text)
+
+
+@pytest.mark.parametrize('text', ['2024-02-30T10:00', '2024-01-01 10:00', '2024-01-01T10:00Z'])
+def test_invalid_iso_dates_are_rejected(text):
+    with pytest.raises(ValueError):
+        parse_iso_datetime(text)
+
+
+@pytest.mark.parametrize('timestamp_format, key', [('legacy', 'datetime'), ('iso', 'datetime'), ('epoch', 'minutes')])
+def test_record_round_trip_in_every_format(timestamp_format, key):
+    record = Record(parse_datetime('26/11/2024 07:11'), 'Отжимания', 110.0, 4, 1)
+    entry = record.to_dict(timestamp_format)
+    assert key in entry
+    assert timestamp_format_of(entry) == timestamp_format
+    restored = Record.from_dict(json.loads(json.dumps(entry)))
+    assert (restored.id, restored.minutes, restored.exercise) == (1, record.minutes, 'Отжимания')
+
+
+@pytest.mark.parametrize('timestamp_format', ['legacy', 'iso', 'epoch'])
+def test_store_keeps_file_format(tmp_path, timestamp_format):
+    path = str(tmp_path / 'journal.json')
+    store = JournalStore(path, column_file=False, timestamp_format=timestamp_format)
+    store.create_empty()
+    store.add(Record(parse_datetime('26/11/2024 07:11'), 'Отжимания', 110.0, 4))
+    store.compact()
+    with open(path, encoding='utf-8') as file:
+        assert timestamp_format_of(json.load(file)[0]) == timestamp_format
+
+    # Без явного формата сохраняется формат файла
+    reopened = JournalStore(path, column_file=False)
+    reopened.load()
+    reopened.add(Record(parse_datetime('27/11/2024 07:11'), 'Отжимания', 110.0, 4))
+    reopened.compact()
+    with open(path, encoding='utf-8') as file:
+        assert {timestamp_format_of(entry) for entry in json.load(file)} == {timestamp_format}
+
+
+def test_mixed_formats_are_read(tmp_path):
+    path = tmp_path / 'journal.json'
+    entries = [{'id': 1, 'datetime': '26/11/2024 07:11', 'exercise': 'Жим', 'weight': '80', 'repetitions': '5'},
+               {'id': 2, 'datetime': '2024-11-26T07:11', 'exercise': 'Жим', 'weight': '80', 'repetitions': '5'},
+               {'id': 3, 'minutes': parse_datetime('26/11/2024 07:11'), 'exercise': 'Жим', 'weight': '80',
+                'repetitions': '5'}]
+    path.write_text(json.dumps(entries), encoding='utf-8')
+    store = JournalStore(str(path), column_file=False)
+    store.load()
+    assert {record.minutes for record in store.records} == {parse_datetime('26/11/2024 07:11')}
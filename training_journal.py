@@ -10,6 +10,9 @@
 
 =========================================
 Описание импортов:
+* import time, argparse: замер времени запуска приложения (параметр командной строки --timings)
+и разбор параметров командной строки;
+
 * import os: стандартная библиотека в Python, которая позволяет работать с операционной системой,
 включая файловую систему, процессы и переменные окружения.
 Модуль os обеспечивает платформонезависимый доступ к различным функциям, что делает код более переносимым;
@@ -22,24 +25,25 @@
 3. модуль messagebox позволяет отображать всплывающие окна с сообщениями, такими как предупреждения или ошибки.
 4. модуль filedialog предоставляет функции для открытия и сохранения файлов через диалоговые окна.
 
-* from PIL import Image, ImageTk:
+* from PIL import Image (в функции resize_image):
 1. PIL (Pillow): библиотека для работы с изображениями, которая позволяет открывать, изменять и сохранять
 различные форматы изображений.
 2. класс Image предоставляет методы для создания, открытия и манипуляции изображениями.
 С его помощью можно выполнять такие операции, как изменение размера, поворот, обрезка, фильтрация и многое другое.
-3. модуль ImageTk обеспечивает связь между библиотекой PIL и tkinter, позволяя использовать изображения
-в графических интерфейсах.
+PIL импортируется только при первом уменьшении иконки: готовые иконки загружаются из кэша средствами tk.PhotoImage.
 
 * import json: позволяет преобразовывать в строку (и преобразовывать из строки) данные в формате JSON
 
-* модуль csv: предоставляет инструменты для чтения и записи данных в формате CSV.
-Он поддерживает различные конфигурации, включая разные разделители, кавычки и кодировки.
+* from journal.engine import JournalEngine, make_filter, statistics_lines:
+1. класс JournalEngine выполняет все операции с журналом без графического интерфейса: добавление, редактирование
+и удаление записей с проверкой значений, фильтрацию, статистику, потоковые импорт и экспорт CSV, построение
+графиков. Ошибки ввода сообщаются исключением ValueError, приложение показывает их в окнах сообщений;
+2. функция make_filter создает фильтр записей (диапазон дат в минутах от начала эпохи и фильтр по упражнению);
+3. функция statistics_lines формирует строки отчета по статистике.
 
-* from datetime import datetime, time:
-1. класс datetime предоставляет методы для работы с датами и временем. Это позволяет выполнять такие операции,
-как получение текущей даты и времени, форматирование и арифметику дат.
-2. класс time представляет собой объект времени (час, минуты, секунды, микросекунды) без привязки к конкретной дате.
-Он позволяет создавать, сравнивать и выполнять операции с временными значениями.
+* from journal.instrumentation import BUCKET_LABELS, instrumentation, instrumented: замеры времени операций
+приложения (включаются параметрами --diagnostics и --profile). Декоратор instrumented замеряет функцию или метод,
+объект instrumentation хранит скользящее окно замеров каждой операции и сохраняет профили cProfile.
 
 * from tkcalendar import DateEntry:
 1. библиотека tkcalendar расширяет возможности стандартной библиотеки tkinter, добавляя функциональность для работы
@@ -47,70 +51,186 @@
 2. класс DateEntry представляет собой виджет, который позволяет пользователю выбирать дату из выпадающего календаря
 или вручную вводить дату в текстовое поле. Это удобно для форм, где требуется вводить даты.
 
-* from matplotlib.figure import Figure:
+* Построение графиков (journal/charts.py, через JournalEngine):
 1. библиотека matplotlib используется для построения графиков и визуализации данных в Python. Она позволяет
 создавать статические, анимационные и интерактивные графики.
-2. класс Figure представляет собой основное окно для построения графиков. Он управляет размещением этих окон,
-их размерами и другими параметрами.
-
-* from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg:
-1. модуль matplotlib.backends.backend_tkagg используется для интеграции графиков Matplotlib в приложения на tkinter;
-2. класс FigureCanvasTkAgg связывает объект Figure (график Matplotlib) с виджетами tkinter.
-Он позволяет отображать графики в tkinter приложениях.
+2. класс ChartService рисует графики средствами matplotlib (вывод Agg, без tkinter) в фоновом потоке
+и хранит готовые изображения в кэше. В окнах приложения графики показываются как изображения tk.PhotoImage.
+matplotlib импортируется только при первом построении графиков, а не при запуске приложения.
 =========================================
 
 Структура программы:
 ** В директории "icons" содержатся файлы с иконками, соответствующие основным действиям пользователя
 (добавление, просмотр, фильтрация записей и др.)
 
-** Переменная data_file хранит имя файла по умолчанию, в который будут сохраняться данные о тренировках в формате JSON
+** Переменная data_file хранит имя файла по умолчанию, в который будут сохраняться данные о тренировках в формате JSON.
+Другой файл журнала можно указать при запуске: "python training_journal.py training_log.db". Для файлов .db, .sqlite
+и .sqlite3 используется хранилище SQLite; при первом открытии в базу переносятся записи из файла data_file.
+Если указать каталог ("python training_journal.py team/"), он открывается как каталог журналов команды: по одному
+файлу журнала на спортсмена, спортсмен выбирается в списке вверху окна, а кнопка "Статистика команды" показывает
+суммы и таблицы лидеров по всем журналам (journal/team.py).
 
 ** Основные функции программы:
 - resize_image: для изменения размера изображения иконок. Новые размеры для каждой иконки указываются
-в соответствующем методе класса TrainingLogApp;
-- load_data: загрузка из JSON файла данных о тренировках. Применены обработки исключений для обработки возможных ошибок;
-- save_data: принимает данные о тренировках в виде списка словарей и сохраняет их в файл в формате JSON.
-Данные форматируются с отступом для лучшей читаемости.
+в соответствующем методе класса TrainingLogApp. Уменьшенные иконки сохраняются в папке "icons/cache"
+и при следующих запусках загружаются оттуда;
+- report_timings: выводит отчет о времени запуска (импорт модулей, построение виджетов, загрузка журнала);
+- load_data: загрузка из JSON файла данных о тренировках в рабочем потоке фоновой задачи. Применены обработки
+исключений для обработки возможных ошибок: ошибка возвращается, чтобы сообщить о ней в главном потоке.
+Файл читается один раз и перечитывается, только если он был изменен на диске;
+- report_load_error и show_load_error: сообщают об ошибке загрузки журнала (при открытии журнала
+и при перечитывании перед операцией);
+- save_data: сохраняет несохраненные изменения журнала одной записью на диск, а если выбран файл копии -
+записывает в него копию журнала в формате JSON с отступом для лучшей читаемости. Изменения дописываются
+в журнал изменений (файл "training_log.json.wal"), поэтому основной файл перезаписывается только
+при сворачивании журнала изменений. Запись выполняется атомарно (временный файл + fsync + переименование).
+Диалогов функция не показывает: сохранение выполняется автоматически (см. TrainingLogApp.changed).
+
+** Пакет journal содержит логику работы с журналом без графического интерфейса:
+- JournalEngine (journal/engine.py): операции с журналом (добавление, редактирование, удаление, фильтрация,
+статистика, импорт и экспорт CSV, графики), которые используют и приложение, и командная строка;
+- командная строка (journal/cli.py): "python -m journal stats --from 01/11/2024 --exercise Присед" - команды add, list,
+stats, export, import, charts, team и serve для сценариев и сервера без дисплея;
+- столбцовый файл (journal/column_file.py): двоичная копия снимка JSON ("training_log.json.cols") в виде столбцов,
+которая открывается через mmap без разбора JSON; строится заново в фоне, если устарела;
+- Storage, open_storage (journal/storage.py): общий интерфейс хранилищ журнала и выбор хранилища по расширению файла;
+- SqliteStore (journal/sqlite_store.py): хранилище в базе SQLite (режим WAL, индексы по времени и по упражнению и
+времени); выборки, статистика и графики - параметризованные запросы, редактирование и удаление меняют одну строку;
+- JournalStore (journal/store.py): хранилище журнала в памяти, единственное место обращения к файлу журнала.
+В режиме журналирования новые записи дописываются в журнал изменений в формате JSON-lines, который при превышении
+заданного размера сворачивается в основной файл.
+- Record (journal/records.py): компактная запись журнала с постоянным номером (id) и заранее разобранными датой,
+весом и повторениями. Строки дат разбираются срезами без регулярных выражений, с кэшем результатов; формат даты
+и времени в файле JSON (TIMESTAMP_FORMATS: 'legacy', 'iso' или 'epoch' - число минут без разбора) задается
+параметром --timestamps;
+- DateIndex (journal/index.py): индекс записей, упорядоченный по времени, для выборки диапазона дат за O(log N + k);
+- ExerciseIndex (journal/index.py): словарь упражнений с ключами для поиска без учета регистра и записями
+каждого упражнения, упорядоченными по времени;
+- StatsEngine (journal/stats.py): суммы по упражнениям и дням для статистики с префиксными суммами по дням;
+- ColumnarJournal (journal/analytics.py): журнал в виде столбцов NumPy для векторной фильтрации, статистики
+и рядов графиков;
+- import_csv, export_csv (journal/csv_io.py): потоковый импорт записей из CSV с отчетом об ошибках ImportReport
+и потоковый экспорт записей пачками строк;
+- отпечатки записей (journal/fingerprints.py): 64-битный хеш нормализованных даты и времени, упражнения, веса
+и повторений. Импорт пропускает записи, которые уже есть в журнале (повторный импорт того же файла ничего
+не добавляет), а добавление предупреждает о повторе. Отпечатки хранятся вместе с журналом: в столбцовом файле
+и в индексированном столбце базы SQLite;
+- ProgressTracker (journal/progression.py): личные рекорды и e1RM (формулы Эпли и Бжицки) по упражнениям.
+Рекорды обновляются при добавлении записи, а после изменения или удаления записи-рекорда пересчитываются
+только по записям этого упражнения;
+- ChartService (journal/charts.py): построение графиков без Tk с кэшем изображений и прореживанием
+длинных рядов (LTTB);
+- instrumentation (journal/instrumentation.py): замеры времени операций и количества обработанных записей
+со скользящей гистограммой в памяти, сводка в JSON и профилирование команд cProfile (файлы .pstats);
+- TeamStats (journal/team.py): статистика по всем журналам каталога команды - параллельно в пуле процессов,
+с кэшем итогов каждого журнала, который действует, пока файл журнала не изменится;
+- Autosave (journal/autosave.py): отложенное сохранение изменений группой по таймеру root.after;
+- JournalServer (journal/server.py): локальный сервер HTTP/JSON на asyncio ("python -m journal serve") - записи,
+добавление, статистика, упражнения и графики PNG; чтения выполняются в пуле потоков (вызовы хранилища - по очереди
+под его блокировкой), добавления - через одну задачу-писатель, которая сохраняет накопившиеся добавления
+одной записью на диск;
+- TaskScheduler (journal/tasks.py): фоновые задачи в пуле потоков. Результаты и ход выполнения передаются
+в главный поток опросом через root.after; повторные запуски чтения с тем же ключом сливаются в одно выполнение,
+а каждое добавление, редактирование и удаление записи выполняется отдельной задачей.
+
+** Пакет benchmarks: замеры производительности операций журнала без графического интерфейса на синтетических
+журналах (10 тыс. - 10 млн записей) с записью результатов в JSON и сравнением с базовыми ("python -m benchmarks"); нагрузочный тест сервера журнала
+с процентилями времени ответа ("python -m benchmarks.load").
+
+** Класс RecordsView: таблица записей с виртуальной прокруткой. Элементы Treeview создаются только для видимых строк
+и заменяются при прокрутке (колесом мыши, полосой прокрутки, клавишами), поэтому открытие окна записей не зависит
+от размера журнала. Таблица показывает снимок записей, взятый в фоновой задаче под блокировкой хранилища
+(функция view_snapshot), поэтому главный поток не ждет сохранения или импорта. Сортировка по щелчку на заголовке
+столбца выполняется в памяти в фоновой задаче, а не средствами Tk. Снимок всего журнала обновляется после его
+изменения, а выбранная запись находится в новом снимке по номеру (id).
 
 ** Класс TrainingLogApp:
 - конструктор класса __init__: принимает объект root, который является главным окном приложения, и вызывает метод
-create_widgets для создания виджетов интерфейса;
+create_widgets для создания виджетов интерфейса. Все операции с журналом приложение выполняет через
+JournalEngine (атрибут engine). Журнал загружается в фоновой задаче, после загрузки
+вызывается метод loaded;
+- методы changed, save и save_as: отложенное сохранение (write-behind). Добавление, редактирование, удаление и импорт
+только отмечают изменения (changed), а журнал сохраняется группой в фоновой задаче (save) через 2 секунды после
+последнего изменения (journal/autosave.py), по кнопке "Сохранить" или при закрытии приложения. Серия быстрых
+добавлений подходов записывается на диск одной записью. Файл копии журнала выбирается один раз за сеанс
+кнопкой "Сохранить как..." (save_as); рядом с кнопками показывается количество несохраненных изменений;
+- метод schedule_maintenance: фоновое обслуживание хранилища (перестроение столбцового файла);
+- метод show_diagnostics: окно диагностики (кнопка "Диагностика" при запуске с параметром --diagnostics) - таблица
+замеров операций (вызовы, среднее время, процентили, гистограмма), сохранение сводки в JSON и переключатель
+профилирования команд cProfile;
+- метод on_close: при закрытии приложения отменяет фоновые задачи, дожидается завершения уже выполняющихся
+и затем сохраняет несохраненные изменения;
+- методы open_journal и select_athlete: открытие журнала (загрузка в фоновой задаче) и переключение
+на журнал другого спортсмена каталога команды (изменения текущего журнала сначала сохраняются);
+- методы show_team_statistics и show_team_statistics_window: статистика команды в фоновой задаче с индикатором
+прогресса и окно с суммами, таблицами лидеров и суммами по периодам;
 - метод create_widgets: создает виджеты для ввода данных, кнопки для добавления записи о тренировке, просмотра
 и фильтрации сохраненных записей. Также реализованы кнопки экспорта записей в файлы CSV формата и импорта записей
 из них, кнопки формирования статистической информации и построения графиков;
-- метод update_exercise_filter: обновляет список доступных упражнений для фильтрации;
-- метод add_entry: считывает данные из полей ввода, проверяет их наличие, создает словарь с информацией о тренировке,
-добавляет его в список с данными и сохраняет изменения в файл;
-- метод view_records: загружает сохраненные данные и отображает их в новом окне с помощью виджета Treeview.
-Для каждой записи создается строка в таблице;
-- метод filter_records: метод фильтрации записей по диапазону дат и упражнению;
+- метод journal_task: операция с журналом в фоновой задаче. Журнал перечитывается (load_data) в рабочем потоке,
+а не в обработчике кнопки: пока сохранение или импорт держат блокировку хранилища, окно не зависает.
+Через него выполняются добавление, просмотр, фильтрация, редактирование и удаление записей, импорт, экспорт,
+статистика и графики;
+- метод update_exercise_filter: обновляет список доступных упражнений для фильтрации из словаря упражнений хранилища;
+- метод add_entry: считывает данные из полей ввода и добавляет запись через JournalEngine (значения полей
+проверяются при добавлении), затем отмечает изменение для отложенного сохранения. Если такая же запись уже есть
+в журнале, спрашивает, добавить ли повтор;
+- метод view_records: загружает сохраненные данные и отображает снимок журнала, взятый в фоновой задаче,
+в новом окне в таблице RecordsView (метод show_records_window);
+- метод filter_records: метод фильтрации записей по диапазону дат (двоичным поиском по индексу дат) и упражнению;
+- метод get_filter: считывает из виджетов диапазон дат и фильтр по упражнению;
 - метод export_to_csv: применяется для экспорта данных в формат CSV. Пользователь задает имя файла в диалоговом окне,
-а файл сохраняется в папке files внутри проекта;
+а файл сохраняется в папке files внутри проекта. Можно экспортировать весь журнал или только записи по текущему
+фильтру. Файл пишется потоково пачками строк в фоновой задаче с индикатором прогресса (итог - метод export_finished);
 - метод import_from_csv: используется для импорта данных из CSV файла. Пользователь выбирает файл, и данные из него
-добавляются в журнал;
-- метод edit_record: необходим для редактирования выбранной записи;
-- метод delete_record используется для удаления выбранной записи;
-- метод show_statistics: отображение статистики по выполненным упражнениям;
+добавляются в журнал; записи, которые уже есть в журнале, пропускаются и подсчитываются в отчете.
+Файл читается потоково, ошибки строк собираются в отчет (метод show_import_report),
+импорт выполняется в фоновой задаче, ход импорта показывается в окне с индикатором и кнопкой отмены
+(метод show_progress), результат обрабатывается методом import_finished;
+- метод edit_record: необходим для редактирования выбранной записи. Запись находится по ее постоянному номеру (id);
+- метод delete_record используется для удаления выбранной записи по ее номеру;
+- метод show_statistics: отображение статистики по выполненным упражнениям. Статистика собирается в фоновой
+задаче из сумм по упражнениям и дням, которые обновляются при каждом изменении журнала. В окне статистики также
+показываются личные рекорды упражнений: лучший вес, объем, расчетный разовый максимум (e1RM) и лучшие подходы
+по диапазонам повторений;
 - метод show_charts: для визуализации прогресса по упражнениям. Применяется для построения графиков изменения веса
-и количества повторов упражнений. Графики также сохраняются в формате "png" в директории "images".
+и количества повторов упражнений. Ряды для графиков берутся срезами столбцов NumPy. Графики строятся в фоновой задаче сервисом ChartService
+(или берутся из его кэша), окна с изображениями открываются в главном потоке (show_chart_windows).
+На графике веса отмечены подходы, которые обновили рекорд e1RM упражнения.
+Графики также сохраняются в формате "png" в директории "images" (файлы weight_chart.png и repetitions_chart.png
+перезаписываются).
 
 ** Функция main:
+- Разбирает параметры командной строки: файл журнала и флаг --timings ("python training_journal.py --timings"),
+с которым после загрузки журнала в поток ошибок выводится время этапов запуска. Флаг --diagnostics включает
+замеры операций (функции load_data, save_data, команды TrainingLogApp, отрисовка таблицы записей и фоновые задачи)
+и окно диагностики, флаг --profile выполняет каждую команду под cProfile и сохраняет профили в папку "profiles".
+Параметр --timestamps legacy|iso|epoch задает формат даты и времени в файле журнала JSON (для нового журнала сразу,
+для существующего - при следующей перезаписи снимка).
 - Создает экземпляр Tk, который является главным окном приложения.
 - Создает экземпляр приложения TrainingLogApp, передавая ему главное окно.
 - Запускает главный цикл обработки событий Tkinter, чтобы окно приложения отображалось и реагировало
 на действия пользователя.
 """
 
+import time
+import_started = time.perf_counter()  # Начало импорта модулей (для отчета о времени запуска)
+import argparse
 import os
+import sys
 import tkinter as tk
 from tkinter import ttk, Toplevel, messagebox, filedialog
-from PIL import Image, ImageTk
 import json
-import csv
-from datetime import datetime, time
 from tkcalendar import DateEntry
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from journal.analytics import OrderedRecords, sort_order
+from journal.autosave import Autosave
+from journal.engine import JournalEngine, make_filter, statistics_lines
+from journal.instrumentation import BUCKET_LABELS, instrumentation, instrumented
+from journal.progression import progress_lines
+from journal.records import TIMESTAMP_FORMATS
+from journal.tasks import TaskScheduler
+from journal.team import PERIOD_NAMES, TeamStats, list_journals, team_lines
+import_finished = time.perf_counter()
 
 # Файлы с иконками
 add_icon_path = 'icons/add.png'
@@ -120,6 +240,10 @@ export_icon_path = 'icons/export.png'
 import_icon_path = 'icons/import.png'
 stats_icon_path = 'icons/stats.png'
 chart_icon_path = 'icons/chart.png'
+# Папка для иконок, уменьшенных до размеров кнопок
+icon_cache_directory = 'icons/cache'
+# Папка для профилей cProfile (файлы .pstats)
+profile_directory = 'profiles'
 
 # Файл (по умолчанию) для сохранения данных
 data_file = 'training_log.json'
@@ -129,49 +253,85 @@ os.makedirs('files', exist_ok=True)
 
 def resize_image(image_path, new_width, new_height):
     """
-    Функция для изменения размера изображения иконок
+    Функция для изменения размера изображения иконок.
+    Уменьшенная иконка сохраняется в папке icon_cache_directory и при следующих запусках загружается оттуда
+    без PIL. Иконка из кэша используется, пока она не старше исходного файла.
+    """
+    name = os.path.splitext(os.path.basename(image_path))[0]
+    cached_path = os.path.join(icon_cache_directory, f"{name}_{new_width}x{new_height}.png")
+    try:
+        fresh = os.path.getmtime(cached_path) >= os.path.getmtime(image_path)
+    except OSError:
+        fresh = False
+    if not fresh:
+        # PIL нужен только для первого уменьшения иконки
+        from PIL import Image
+        os.makedirs(icon_cache_directory, exist_ok=True)
+        resized_image = Image.open(image_path).resize((new_width, new_height))
+        temp_path = cached_path + '.tmp'
+        resized_image.save(temp_path, format='PNG')
+        os.replace(temp_path, cached_path)
+    return tk.PhotoImage(file=cached_path)
+
+def report_timings(timings):
+    """
+    Выводит отчет о времени запуска приложения (список пар (этап, секунды)) в поток ошибок.
     """
-    image = Image.open(image_path)
-    resized_image = image.resize((new_width, new_height))
-    return ImageTk.PhotoImage(resized_image)
+    print("Время запуска:", file=sys.stderr)
+    for step, seconds in timings:
+        print(f"  {step}: {seconds * 1000:.1f} мс", file=sys.stderr)
+    print(f"  Всего: {sum(seconds for step, seconds in timings) * 1000:.1f} мс", file=sys.stderr)
 
-def load_data():
+@instrumented('load_data')
+def load_data(store):
     """
-    Загрузка данных о тренировках из JSON файла. Применены обработки исключений для обработки возможных ошибок.
+    Загрузка данных о тренировках из JSON файла в рабочем потоке фоновой задачи: в главном потоке чтение
+    ждало бы блокировку хранилища, пока идет сохранение или импорт. Файл читается заново, только если
+    он был изменен с момента последнего чтения; если файла нет, создается пустой журнал.
+    Ошибка загрузки не прерывает операцию, а возвращается, чтобы сообщить о ней в главном потоке
+    (show_load_error); без ошибки возвращается None.
     """
     try:
-        with open(data_file, 'r') as file:
-            return json.load(file)
-    except FileNotFoundError:
+        store.load()
+    except FileNotFoundError as e:
         # Создание пустого файла, если он не существует
-        with open(data_file, 'w') as file:
-            json.dump([], file)  # создаем пустой список
-        messagebox.showerror("Внимание!", "Файл журнала тренировок не найден. Создан новый файл")
-        return []
-    except json.JSONDecodeError:
-        messagebox.showerror("Внимание!", "Ошибка при разборе данных из файла или журнал пустой.")
-        return []
+        store.create_empty()
+        return e
     except Exception as e:
-        messagebox.showerror("Ошибка!", f"Произошла ошибка: {e}")
-        return []
+        return e
+    return None
+
+def report_load_error(store, error):
+    """
+    Сообщает пользователю об ошибке загрузки журнала в фоновой задаче открытия журнала.
+    Если файла нет, создается пустой журнал.
+    """
+    if isinstance(error, FileNotFoundError):
+        store.create_empty()
+    show_load_error(error)
+    return store.records
 
-def save_data(data):
+def show_load_error(error):
     """
-    Принимает данные о тренировках в виде списка словарей и сохраняет их в файл в формате JSON.
-    Данные форматируются с отступом для лучшей читаемости
+    Окно с сообщением об ошибке загрузки журнала.
     """
-    messagebox.showinfo("Сохранение файла", "Выберите, куда сохранить ваш журнал тренировок "
-                                            "или нажмите отмену для сохранения в файл по умолчанию")
-    file_path = filedialog.asksaveasfilename(
-        defaultextension=".json",
-        filetypes=[("JSON files", ".json"), ("ALL files", '*.*')],
-        title="Сохранить файл как"
-    )
-    if not file_path:  # Если пользователь отменил действие, используем файл по умолчанию
-        file_path = data_file
+    if isinstance(error, FileNotFoundError):
+        messagebox.showerror("Внимание!", "Файл журнала тренировок не найден. Создан новый файл")
+    elif isinstance(error, json.JSONDecodeError):
+        messagebox.showerror("Внимание!", "Ошибка при разборе данных из файла или журнал пустой.")
+    else:
+        messagebox.showerror("Ошибка!", f"Произошла ошибка: {error}")
 
-    with open(file_path, 'w') as file:
-        json.dump(data, file, indent=4)
+@instrumented('save_data')
+def save_data(store, file_path=None):
+    """
+    Сохраняет несохраненные изменения хранилища в файл журнала (одной записью на диск).
+    Если выбран другой файл (file_path), в него записывается копия журнала в формате JSON
+    с отступом для лучшей читаемости. Диалогов не показывает: функция вызывается и в фоновой задаче.
+    """
+    store.save()
+    if file_path:
+        store.save(file_path)
 
 
 class DateTimePicker(ttk.Frame):
@@ -217,18 +377,499 @@ class DateTimePicker(ttk.Frame):
         return f"{date_str} {time_str}"
 
 
+def view_snapshot(task, store, records=None, sort=None, selected_id=None):
+    """
+    Строки таблицы записей (в рабочем потоке фоновой задачи). Если records не передан, берется снимок
+    всего журнала: версия, список записей и (для сортировки) столбцы NumPy читаются вместе под блокировкой
+    хранилища и поэтому соответствуют друг другу. sort - пара (поле записи, по убыванию) или None.
+    Возвращает версию журнала (None для переданных записей), записи, строки в порядке отображения
+    и позицию записи с номером selected_id среди строк (None, если ее нет).
+    """
+    version = columns = None
+    if records is None:
+        with store.lock:
+            version = store.version
+            records = store.snapshot()
+            if sort is not None:
+                columns = store.columns()
+    rows = records
+    if sort is not None:
+        attribute, reverse = sort
+        order = sort_order(records, attribute, columns)
+        rows = OrderedRecords(records, order[::-1] if reverse else order)
+    selected_index = None
+    if selected_id is not None:
+        selected_index = next((index for index in range(len(rows)) if rows[index].id == selected_id), None)
+    return version, records, rows, selected_index
+
+
+class RecordsView(ttk.Frame):
+    """
+    Таблица записей с виртуальной прокруткой. Элементы Treeview создаются только для видимых строк,
+    при прокрутке они заменяются строками из нового окна. Поэтому открытие таблицы стоит одинаково
+    для 100 и для 1 000 000 записей. Сортировка по столбцу выполняется в памяти (journal.analytics.sort_order)
+    в фоновой задаче (view_snapshot), а не средствами Tk.
+
+    Таблица показывает список записей records, а не хранилище: главный поток не берет блокировку хранилища
+    и не ждет сохранения, сворачивания журнала изменений или импорта. Если передана версия журнала version,
+    records - снимок всего журнала store; когда журнал изменился (добавление из главного окна, импорт,
+    перечитывание файла), новый снимок берется в фоновой задаче с сохранением сортировки. Выбранная запись
+    после этого находится по номеру (id), поэтому редактируется и удаляется именно она, а не запись,
+    оказавшаяся на той же позиции. submit - запуск фоновой задачи (как TaskScheduler.submit).
+    """
+    columns = ("Дата", "Упражнение", "Вес", "Повторения")
+    sort_attributes = {"Дата": 'minutes', "Упражнение": 'exercise', "Вес": 'weight', "Повторения": 'repetitions'}
+    row_height = 20  # Высота строки Treeview по умолчанию, пикселей
+
+    def __init__(self, parent, store, submit, records, version=None, *args, **kwargs):
+        super().__init__(parent, *args, **kwargs)
+        self.store = store
+        self.submit = submit
+        self.live = version is not None  # Снимок всего журнала, который обновляется после его изменения
+        self.version = version  # Версия журнала, по которой взят снимок
+        self.requested_version = version  # Версия журнала на момент последнего запроса нового снимка
+        self.request = 0  # Номер последнего запроса строк в фоновой задаче
+        self.records = records  # Последовательность с len и доступом по индексу
+        self.rows = self.records  # Записи в порядке отображения
+        self.offset = 0  # Индекс первой видимой строки
+        self.visible_rows = 20
+        self.selected_index = None  # Индекс выбранной строки в self.rows
+        self.selected = None  # Выбранная запись
+        self.visible = {}  # Идентификатор строки Treeview -> индекс в self.rows для видимых строк
+        self.sort_column = None
+        self.sort_reverse = False
+
+        self.tree = ttk.Treeview(self, columns=self.columns, show="headings", height=self.visible_rows,
+                                 selectmode='browse')
+        for column in self.columns:
+            self.tree.heading(column, text=column, command=lambda c=column: self.sort_by(c))
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.on_scrollbar)
+
+        self.tree.grid(column=0, row=0, sticky=tk.NSEW)
+        self.scrollbar.grid(column=1, row=0, sticky=tk.NS)
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        self.tree.bind('<Configure>', self.on_resize)
+        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+        self.tree.bind('<MouseWheel>', lambda event: self.scroll(-3 if event.delta > 0 else 3))
+        self.tree.bind('<Button-4>', lambda event: self.scroll(-3))
+        self.tree.bind('<Button-5>', lambda event: self.scroll(3))
+        self.tree.bind('<Up>', lambda event: self.move_selection(-1))
+        self.tree.bind('<Down>', lambda event: self.move_selection(1))
+        self.tree.bind('<Prior>', lambda event: self.move_selection(-self.visible_rows))
+        self.tree.bind('<Next>', lambda event: self.move_selection(self.visible_rows))
+        self.render()
+
+    @property
+    def selected_id(self):
+        return self.selected.id if self.selected is not None else None
+
+    @instrumented('RecordsView.render')
+    def render(self):
+        """
+        Заполняет Treeview строками видимого окна.
+        """
+        self.refresh()
+        self.offset = max(0, min(self.offset, len(self.rows) - self.visible_rows))
+        end = min(len(self.rows), self.offset + self.visible_rows)
+
+        # Идентификатор строки Treeview - номер записи в журнале
+        self.tree.delete(*self.tree.get_children())
+        self.visible = {}
+        for index in range(self.offset, end):
+            record = self.rows[index]
+            iid = self.tree.insert('', tk.END, iid=str(record.id), values=record.values())
+            self.visible[iid] = index
+        if self.selected is not None and str(self.selected.id) in self.visible:
+            self.selected_index = self.visible[str(self.selected.id)]
+            self.tree.selection_set(str(self.selected.id))
+
+        if self.rows:
+            self.scrollbar.set(self.offset / len(self.rows), end / len(self.rows))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def refresh(self):
+        """
+        Запрашивает новый снимок всего журнала, если журнал изменился и снимок этой версии еще не запрошен:
+        позиции строк после изменения журнала уже не соответствуют прежним записям.
+        """
+        if self.live and self.store.version not in (self.version, self.requested_version):
+            self.reload()
+
+    def reload(self):
+        """
+        Запускает фоновую задачу, которая берет снимок журнала (для таблицы всего журнала) и сортирует строки.
+        Результат запроса, после которого был сделан новый, не применяется.
+        """
+        self.request += 1
+        request = self.request
+        sort = None
+        if self.sort_column is not None:
+            sort = (self.sort_attributes[self.sort_column], self.sort_reverse)
+        if self.live:
+            self.requested_version = self.store.version
+        selected_id = self.selected_id
+        self.submit('records', view_snapshot, self.store, None if self.live else self.records, sort, selected_id,
+                    on_done=lambda result: self.loaded(request, selected_id, result), merge=False)
+
+    def loaded(self, request, selected_id, result):
+        """
+        Строки таблицы получены (в главном потоке): сохраняется сортировка, выделение - по номеру записи.
+        """
+        if request != self.request or not self.winfo_exists():
+            return
+        version, self.records, self.rows, selected_index = result
+        if self.live:
+            self.version = version
+        self.selected_index = None
+        if selected_id == self.selected_id:  # Пока шла задача, выбрана могла быть другая запись
+            self.selected = self.rows[selected_index] if selected_index is not None else None
+            self.selected_index = selected_index
+        self.render()
+
+    def scroll(self, rows):
+        """
+        Прокручивает таблицу на заданное количество строк.
+        """
+        self.offset += rows
+        self.render()
+        return 'break'
+
+    def on_scrollbar(self, action, *args):
+        """
+        Обработка полосы прокрутки: перемещение ползунка (moveto) и прокрутка по строкам/страницам (scroll).
+        """
+        if action == 'moveto':
+            self.offset = int(float(args[0]) * len(self.rows))
+            self.render()
+        elif action == 'scroll':
+            step = self.visible_rows if args[1] == 'pages' else 1
+            self.scroll(int(args[0]) * step)
+
+    def on_resize(self, event):
+        """
+        Пересчитывает количество видимых строк при изменении размера окна (одна строка - заголовок).
+        """
+        visible_rows = max(1, event.height // self.row_height - 1)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.render()
+
+    def on_select(self, event=None):
+        selection = self.tree.selection()
+        if selection and selection[0] in self.visible:
+            self.selected_index = self.visible[selection[0]]
+            self.selected = self.rows[self.selected_index]
+
+    def move_selection(self, rows):
+        """
+        Перемещает выделение на заданное количество строк с прокруткой таблицы за пределы видимого окна.
+        """
+        self.refresh()
+        if not self.rows:
+            return 'break'
+        index = self.offset if self.selected_index is None else self.selected_index + rows
+        self.selected_index = max(0, min(index, len(self.rows) - 1))
+        self.selected = self.rows[self.selected_index]
+        if self.selected_index < self.offset:
+            self.offset = self.selected_index
+        elif self.selected_index >= self.offset + self.visible_rows:
+            self.offset = self.selected_index - self.visible_rows + 1
+        self.render()
+        return 'break'
+
+    def sort_by(self, column):
+        """
+        Сортирует записи по столбцу в фоновой задаче. Повторное нажатие на заголовок меняет направление сортировки.
+        """
+        self.sort_reverse = column == self.sort_column and not self.sort_reverse
+        self.sort_column = column
+        self.offset = 0
+        self.reload()
+
+    def selected_record(self):
+        """
+        Выбранная запись (Record), даже если она прокручена за пределы окна. Запись берется из снимка таблицы;
+        после изменения журнала она находится в новом снимке по номеру, а не по позиции строки.
+        Если запись не выбрана или ее уже нет в журнале, выбрасывается IndexError.
+        """
+        if self.selected is None:
+            raise IndexError("Запись не выбрана")
+        return self.selected
+
+
 class TrainingLogApp:
     """
     Основной класс проекта.
     """
-    def __init__(self, root):
+    def __init__(self, root, journal_path=data_file, timings=None, timestamp_format=None):
         self.root = root
-        root.geometry("500x400")
-        root.title("Дневник тренировок")
+        self.timings = timings  # Список (этап, секунды) для отчета о времени запуска или None
+        self.timestamp_format = timestamp_format
         self.exercises = []  # Список для хранения уникальных упражнений
-        self.chart_counter = 1  # Инициализация счетчика графиков
+        self.exercises_version = None  # Версия списка упражнений, показанного в Combobox
+        self.records_window = None  # Окно записей текущего журнала
+        # Каталог команды: журналы спортсменов (journal/team.py), в окне выбирается спортсмен
+        self.team = None
+        self.athletes = {}  # Спортсмен -> файл журнала
+        if os.path.isdir(journal_path):
+            self.team = TeamStats(journal_path)
+            self.athletes = list_journals(journal_path)
+            journal_path = next(iter(self.athletes.values()), os.path.join(journal_path, data_file))
+        root.geometry("500x480" if self.team else "500x440")
+        self.tasks = TaskScheduler(root)  # Фоновые задачи: загрузка, импорт, экспорт, статистика, графики
+        self.autosave = Autosave(root, self.save)  # Отложенное сохранение изменений группой
+        self.save_target = None  # Файл копии журнала, выбранный один раз за сеанс ("Сохранить как...")
+        root.protocol("WM_DELETE_WINDOW", self.on_close)
+        started = time.perf_counter()
         self.create_widgets()
-        self.update_exercise_filter()  # Обновляем список упражнений
+        if timings is not None:
+            timings.append(("Построение виджетов", time.perf_counter() - started))
+        self.open_journal(journal_path)
+
+    def open_journal(self, journal_path):
+        """
+        Открывает журнал: создает JournalEngine и загружает журнал в фоновой задаче,
+        после загрузки обновляется список упражнений.
+        """
+        # Операции с журналом без графического интерфейса (journal/engine.py). Изменения сохраняются
+        # не сразу, а группой по таймеру (write_behind, Autosave). В каталоге команды записи из файла
+        # по умолчанию в новые базы SQLite не переносятся: он не относится ни к одному спортсмену
+        self.engine = JournalEngine(journal_path, migrate_from=None if self.team else data_file,
+                                    timestamp_format=self.timestamp_format, write_behind=True)
+        # Хранилище журнала: JSON (в памяти, файл читается только при изменении) или база SQLite
+        self.store = self.engine.store
+        self.exercises_version = None
+        if self.team:
+            athlete = os.path.splitext(os.path.basename(journal_path))[0]
+            self.athlete_entry.set(athlete)
+            self.root.title(f"Дневник тренировок - {athlete}")
+        else:
+            self.root.title("Дневник тренировок")
+        self.load_started = time.perf_counter()
+        self.tasks.submit('load', lambda task: self.store.load(), count=len,
+                          on_done=lambda records: self.loaded(),
+                          on_error=self.on_load_error)
+
+    def loaded(self):
+        """
+        Журнал загружен: обновляем список упражнений и запускаем фоновое обслуживание хранилища.
+        """
+        if self.timings is not None:
+            self.timings.append(("Загрузка журнала", time.perf_counter() - self.load_started))
+            report_timings(self.timings)
+            self.timings = None
+        self.update_exercise_filter()
+        self.schedule_maintenance()
+
+    def schedule_maintenance(self):
+        """
+        Запускает фоновое обслуживание хранилища, если оно нужно (например, перестроение
+        столбцового файла после чтения или перезаписи снимка JSON).
+        """
+        if self.store.needs_maintenance():
+            # Столбцовый файл - только ускорение запуска, ошибка его записи не мешает работе
+            self.tasks.submit('maintenance', lambda task: self.store.maintain(), on_error=lambda e: None)
+
+    def changed(self, count=1):
+        """
+        Журнал изменен (count изменений): сохранение откладывается, чтобы серия быстрых изменений
+        была записана на диск одной записью.
+        """
+        self.autosave.mark(count)
+        self.update_save_status()
+
+    def save(self):
+        """
+        Сохраняет изменения журнала (и копию в выбранный файл) в фоновой задаче.
+        """
+        self.save_status['text'] = "Сохранение..."
+        self.tasks.submit('save', lambda task: self.write_journal(), on_done=self.saved, on_error=self.on_save_error)
+
+    def write_journal(self):
+        """
+        Записывает изменения на диск (в рабочем потоке) и возвращает версию журнала на начало записи.
+        """
+        version = self.store.version
+        save_data(self.store, self.save_target)
+        return version
+
+    def saved(self, version):
+        """
+        Журнал сохранен: если во время записи появились новые изменения, они сохраняются следующей группой.
+        """
+        if version != self.store.version or self.store.unsaved_changes():
+            self.autosave.mark(0)
+        self.update_save_status()
+        self.schedule_maintenance()
+
+    def on_save_error(self, error):
+        # Изменения остаются в памяти, сохранение повторяется по таймеру (а также при закрытии)
+        self.autosave.retry()
+        self.show_task_error(error)
+        self.update_save_status()
+
+    def save_as(self):
+        """
+        Выбор файла, в который до конца сеанса вместе с журналом сохраняется его копия, и сохранение.
+        """
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("JSON files", ".json"), ("ALL files", '*.*')],
+            title="Сохранить файл как"
+        )
+        if not file_path:
+            return
+        self.save_target = file_path
+        self.autosave.flush()
+
+    def update_save_status(self):
+        """
+        Показывает, есть ли несохраненные изменения.
+        """
+        if self.tasks.running('save'):
+            return
+        changes = max(self.autosave.changes, self.store.unsaved_changes())
+        target = f" (копия: {os.path.basename(self.save_target)})" if self.save_target else ""
+        self.save_status['text'] = (f"Не сохранено изменений: {changes}" if changes
+                                    else "Все изменения сохранены") + target
+
+    def on_load_error(self, error):
+        report_load_error(self.store, error)
+        self.update_exercise_filter()
+
+    def show_task_error(self, error):
+        """
+        Сообщает об ошибке фоновой задачи.
+        """
+        messagebox.showerror("Ошибка!", f"Произошла ошибка: {error}")
+
+    def show_input_error(self, error):
+        """
+        Сообщает об ошибке добавления или изменения записи: неверные значения полей (ValueError)
+        или запись, которой уже нет в журнале (KeyError).
+        """
+        if isinstance(error, ValueError):
+            messagebox.showerror("Ошибка!", str(error))
+        elif isinstance(error, KeyError):
+            messagebox.showerror("Ошибка!", "Запись не найдена: возможно, она уже удалена.")
+        else:
+            self.show_task_error(error)
+
+    def journal_task(self, key, func, on_done=None, on_error=None, **options):
+        """
+        Операция с журналом в фоновой задаче: в рабочем потоке журнал сначала перечитывается, если файл
+        изменился на диске (load_data), затем выполняется func(task). Главный поток не ждет блокировку
+        хранилища, которую держат сохранение, сворачивание журнала изменений или импорт. Об ошибке
+        перечитывания сообщается в главном потоке перед on_done. Остальные параметры - как у TaskScheduler.submit.
+        """
+        load_errors = []
+
+        def run(task):
+            error = load_data(self.store)
+            if error is not None:
+                load_errors.append(error)
+            return func(task)
+
+        def done(result):
+            if load_errors:
+                show_load_error(load_errors[0])
+            if on_done:
+                on_done(result)
+
+        return self.tasks.submit(key, run, on_done=done, on_error=on_error or self.show_task_error, **options)
+
+    def on_close(self):
+        """
+        Закрытие приложения: выполняющиеся фоновые задачи отменяются, а после их завершения
+        несохраненные изменения записываются (в том числе записи импорта, который успел их добавить).
+        """
+        self.autosave.cancel()
+        self.tasks.shutdown(wait=True)
+        try:
+            save_data(self.store, self.save_target)
+        except Exception as e:
+            if not messagebox.askyesno("Ошибка!", f"Не удалось сохранить журнал: {e}\n"
+                                                  "Закрыть приложение без сохранения изменений?"):
+                # Приложение продолжает работу: нужен новый планировщик фоновых задач
+                self.tasks = TaskScheduler(self.root)
+                self.update_save_status()
+                return
+        if self.team:
+            self.team.close()
+        self.root.destroy()
+
+    def select_athlete(self, event=None):
+        """
+        Переключение на журнал другого спортсмена каталога команды. Изменения текущего журнала
+        сначала сохраняются; пока идут загрузка, изменение записей, импорт, экспорт или сохранение,
+        журнал не переключается.
+        """
+        athlete = self.athlete_entry.get()
+        current = os.path.splitext(os.path.basename(self.engine.path))[0]
+        journal_path = self.athletes.get(athlete)
+        if journal_path is None or athlete == current:
+            return
+        if any(self.tasks.running(key) for key in ('load', 'add', 'update', 'delete', 'import', 'export', 'save')):
+            messagebox.showerror("Ошибка!", "Дождитесь завершения операции с текущим журналом.")
+            self.athlete_entry.set(current)
+            return
+        self.autosave.cancel()
+        try:
+            save_data(self.store, self.save_target)
+        except Exception as e:
+            messagebox.showerror("Ошибка!", f"Не удалось сохранить журнал: {e}")
+            self.athlete_entry.set(current)
+            return
+        self.autosave.changes = 0
+        self.save_target = None  # Файл копии относится к журналу прежнего спортсмена
+        if self.records_window is not None and self.records_window.winfo_exists():
+            self.records_window.destroy()  # Записи прежнего журнала больше не редактируются
+        self.open_journal(journal_path)
+        self.update_save_status()
+
+    @instrumented()
+    def show_team_statistics(self):
+        """
+        Статистика команды по всем журналам каталога за выбранный диапазон дат: журналы обрабатываются
+        параллельно в пуле процессов, неизмененные журналы берутся из кэша.
+        """
+        record_filter = self.get_filter()
+        if record_filter is None:
+            return
+        period = next(key for key, name in PERIOD_NAMES.items() if name == self.period_entry.get())
+        task = self.tasks.submit('team', self.collect_team, record_filter, period,
+                                 count=lambda report: len(report.athletes),
+                                 on_done=self.show_team_statistics_window, on_error=self.show_task_error)
+        self.show_progress("Статистика команды", task)
+
+    def collect_team(self, task, record_filter, period):
+        """
+        Сохраняет изменения текущего журнала (статистика читает файлы) и собирает статистику команды.
+        """
+        save_data(self.store)
+        return self.team.collect(*record_filter, period=period, progress=task.progress, cancelled=task.cancelled)
+
+    @instrumented()
+    def show_team_statistics_window(self, report):
+        """
+        Окно статистики команды: суммы, упражнения с таблицами лидеров и суммы по периодам.
+        """
+        team_window = Toplevel(self.root)
+        team_window.title("Статистика команды")
+        team_window.geometry("500x500")
+        journals = len(report.athletes) + len(report.errors)
+        ttk.Label(team_window,
+                  text=f"Журналов: {journals}, из кэша (без повторного чтения): {report.cached}").pack(pady=5)
+        text = tk.Text(team_window, wrap=tk.WORD)
+        scrollbar = ttk.Scrollbar(team_window, orient=tk.VERTICAL, command=text.yview)
+        text.configure(yscrollcommand=scrollbar.set)
+        text.insert(tk.END, "\n".join(team_lines(report)))
+        text.configure(state=tk.DISABLED)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        text.pack(expand=True, fill=tk.BOTH, padx=5, pady=5)
 
     def create_widgets(self):
         """
@@ -237,6 +878,23 @@ class TrainingLogApp:
         кнопки формирования статистической информации и построения графиков
         """
 
+        # Выбор спортсмена и статистика команды (только для каталога журналов)
+        if self.team:
+            self.team_frame = ttk.Frame(self.root)
+            self.team_frame.pack(padx=10, pady=(10, 0), fill=tk.X)
+            ttk.Label(self.team_frame, text="Спортсмен:").pack(side=tk.LEFT)
+            self.athlete_entry = ttk.Combobox(self.team_frame, values=list(self.athletes), state='readonly',
+                                              width=20)
+            self.athlete_entry.pack(side=tk.LEFT, padx=5)
+            self.athlete_entry.bind('<<ComboboxSelected>>', self.select_athlete)
+            self.period_entry = ttk.Combobox(self.team_frame, values=list(PERIOD_NAMES.values()), state='readonly',
+                                             width=8)
+            self.period_entry.set(PERIOD_NAMES['month'])
+            self.period_entry.pack(side=tk.RIGHT)
+            self.team_button = ttk.Button(self.team_frame, text="Статистика команды",
+                                          command=self.show_team_statistics)
+            self.team_button.pack(side=tk.RIGHT, padx=5)
+
         self.main_frame = ttk.Frame(self.root)
         self.main_frame.pack(padx=10, pady=10, expand=True, fill=tk.BOTH)
 
@@ -324,6 +982,15 @@ class TrainingLogApp:
         )
         self.export_button.grid(column=0, row=0, padx=(0, 10), sticky=tk.E)
 
+        # Флажок экспорта только записей по текущему фильтру (диапазон дат и упражнение)
+        self.export_filtered = tk.BooleanVar(value=False)
+        self.export_filtered_check = ttk.Checkbutton(
+            self.csv_frame,
+            text="Экспортировать только по фильтру",
+            variable=self.export_filtered
+        )
+        self.export_filtered_check.grid(column=0, row=1, columnspan=2, pady=(5, 0))
+
         # Кнопка импорта из файла формата CSV
         self.import_icon = resize_image(import_icon_path, 20, 20)
         self.import_button = ttk.Button(
@@ -363,135 +1030,156 @@ class TrainingLogApp:
         )
         self.chart_button.grid(column=1, row=0, padx=5, sticky=tk.W)
 
+        # Сохранение: изменения сохраняются автоматически, кнопки сохраняют сразу или выбирают файл копии
+        self.save_frame = ttk.Frame(self.main_frame)
+        self.save_frame.grid(column=0, row=12, columnspan=2, pady=5, sticky=tk.EW)
+        self.save_frame.columnconfigure(2, weight=1)
+        self.save_button = ttk.Button(self.save_frame, text="Сохранить", command=self.autosave.flush)
+        self.save_button.grid(column=0, row=0, padx=(0, 5))
+        self.save_as_button = ttk.Button(self.save_frame, text="Сохранить как...", command=self.save_as)
+        self.save_as_button.grid(column=1, row=0, padx=5)
+        self.save_status = ttk.Label(self.save_frame, text="Все изменения сохранены")
+        self.save_status.grid(column=2, row=0, padx=(5, 0), sticky=tk.W)
+
+        # Кнопка окна диагностики (только если замеры включены)
+        if instrumentation.enabled:
+            self.diagnostics_button = ttk.Button(self.main_frame, text="Диагностика",
+                                                 command=self.show_diagnostics)
+            self.diagnostics_button.grid(column=0, row=13, columnspan=2, pady=5)
+
         # Настройки колонок в основном фрейме при изменении размера окна
         self.main_frame.columnconfigure(1, weight=1)
 
     def update_exercise_filter(self):
         """
-        Обновляет список доступных упражнений для фильтрации.
+        Обновляет список доступных упражнений для фильтрации. Список берется из словаря упражнений
+        хранилища в фоновой задаче, Combobox обновляется только если набор упражнений изменился.
         """
-        data = load_data()
-        self.exercises = sorted(set(entry['exercise'] for entry in data))  # Получаем уникальные упражнения
+        if self.exercises_version == self.store.names_version:
+            return
+        self.tasks.submit('exercises', lambda task: (self.store.names_version, list(self.store.exercise_names())),
+                          on_done=self.set_exercises, on_error=lambda e: None)
+
+    def set_exercises(self, result):
+        self.exercises_version, self.exercises = result  # Уникальные упражнения и версия их списка
         self.exercise_filter_entry['values'] = self.exercises  # Устанавливаем значения в Combobox
 
+    @instrumented()
     def add_entry(self):
         """
-        Этот метод считывает данные из полей ввода, проверяет их наличие, создает словарь с информацией о тренировке,
-        добавляет его в список с данными и сохраняет изменения в файл.
+        Этот метод считывает данные из полей ввода, проверяет их наличие, создает запись с информацией о тренировке,
+        добавляет ее в журнал и отмечает изменение для отложенного сохранения. Если такая же запись уже есть
+        в журнале, сначала спрашивает, добавить ли повтор. Запись добавляется в фоновой задаче.
         """
-        datetime_str = self.datetime_picker.get()
-        exercise = self.exercise_entry.get()
-        weight = self.weight_entry.get()
-        repetitions = self.repetitions_entry.get()
-
-        if not (exercise and weight and repetitions):
-            messagebox.showerror("Ошибка!", "Все поля должны быть заполнены!")
-            return
-
-        # Проверка на корректность указанного веса
-        try:
-            weight_value = float(weight)  # Пробуем преобразовать вес в число с плавающей запятой
-            if weight_value <= 0 or weight_value > 200:
-                messagebox.showerror("Ошибка!", "Вес должен быть положительным числом до 200 кг.")
+        fields = (self.datetime_picker.get(), self.exercise_entry.get(), self.weight_entry.get(),
+                  self.repetitions_entry.get())
+        # Значения полей проверяются при добавлении (дата, вес, повторения)
+        # Каждое добавление - отдельная задача: второе нажатие с другими значениями не сливается с первым
+        self.journal_task('add', lambda task: self.engine.add(*fields, skip_duplicate=True), merge=False,
+                          on_done=lambda record: self.entry_added(fields, record), on_error=self.show_input_error)
+
+    def entry_added(self, fields, record):
+        """
+        Завершение добавления записи (в главном потоке). Если запись не добавлена, потому что такая же
+        уже есть в журнале, спрашивает, добавить ли повтор.
+        """
+        if record is None:
+            if not messagebox.askyesno("Повтор записи", "Такая запись уже есть в журнале (те же дата и время, "
+                                                        "упражнение, вес и повторения).\nДобавить еще одну?"):
                 return
-        except ValueError:
-            messagebox.showerror("Ошибка!", "Вес должен быть числом")
-            return
-
-        # Проверка на корректность указанных повторений
-        if not repetitions.isdigit() or int(repetitions) <= 0:
-            messagebox.showerror("Ошибка!", "Количество повторений должно быть целым положительным числом")
+            self.journal_task('add', lambda task: self.engine.add(*fields), merge=False,
+                              on_done=lambda record: self.entry_added(fields, record), on_error=self.show_input_error)
             return
-
-        entry = {
-            'datetime': datetime_str,
-            'exercise': exercise,
-            'weight': weight,
-            'repetitions': repetitions
-        }
-
-        data = load_data()
-        data.append(entry)
-        save_data(data)
+        self.changed()  # Запись сохранится на диск вместе с соседними изменениями
 
         self.update_exercise_filter()
 
-        # Очистка полей ввода после добавления
-        self.exercise_entry.delete(0, tk.END)
-        self.weight_entry.delete(0, tk.END)
-        self.repetitions_entry.delete(0, tk.END)
+        # Очистка полей ввода после добавления, если в них все еще значения этой записи, а не уже введенная следующая
+        entries = (self.exercise_entry, self.weight_entry, self.repetitions_entry)
+        if tuple(entry.get() for entry in entries) == fields[1:]:
+            for entry in entries:
+                entry.delete(0, tk.END)
         messagebox.showinfo("Успешно!", "Запись успешно добавлена!")
 
-    def view_records(self, records=None):
+    @instrumented()
+    def view_records(self):
         """
-        Загружает сохраненные данные и отображает их в новом окне с помощью виджета Treeview.
-        Для каждой записи создается строка в таблице.
+        Загружает сохраненные данные в фоновой задаче и отображает весь журнал в новом окне.
         """
-        if records is None:
-            records = load_data()
+        self.journal_task('view', lambda task: view_snapshot(task, self.store),
+                          on_done=lambda view: self.show_records_window(view[1], view[0]))
 
+    @instrumented()
+    def show_records_window(self, records, version=None):
+        """
+        Окно с записями records в таблице с виртуальной прокруткой: строки Treeview создаются только для видимой
+        части записей. Если передана версия журнала version, records - снимок всего журнала, который таблица
+        обновляет после изменения журнала.
+        """
         # Создаем новое окно для отображения записей
-        records_window = Toplevel(self.root)
+        records_window = self.records_window = Toplevel(self.root)
         records_window.title("Записи тренировок")
 
-        # Создаем Treeview и сохраняем его в атрибут класса
-        self.tree = ttk.Treeview(records_window, columns=("Дата", "Упражнение", "Вес", "Повторения"), show="headings")
-        self.tree.heading('Дата', text="Дата")
-        self.tree.heading('Упражнение', text="Упражнение")
-        self.tree.heading('Вес', text="Вес")
-        self.tree.heading('Повторения', text="Повторения")
-
-        # Добавляем строки в Treeview
-        for entry in records:
-            self.tree.insert('', tk.END, values=(
-            entry.get('datetime', 'Неизвестно'),
-            entry.get('exercise', ''),
-            entry.get('weight', ''),
-            entry.get('repetitions', '')
-            ))
-
-        # Отображаем Treeview
-        self.tree.pack(expand=True, fill=tk.BOTH)
+        # Создаем таблицу с виртуальной прокруткой и сохраняем ее в атрибут класса
+        # Задачи таблицы запускаются через текущий планировщик (после неудачного закрытия он создается заново)
+        self.records_view = RecordsView(records_window, self.store,
+                                        lambda *args, **options: self.tasks.submit(*args, **options),
+                                        records, version)
+        self.records_view.pack(expand=True, fill=tk.BOTH)
 
         # Кнопки для редактирования и удаления
         ttk.Button(records_window, text="Редактировать", command=self.edit_record).pack(side=tk.LEFT, padx=5, pady=5)
         ttk.Button(records_window, text="Удалить", command=self.delete_record).pack(side=tk.LEFT, padx=5, pady=5)
 
+    @instrumented()
     def filter_records(self):
         """
-        Метод фильтрации записей по диапазону дат и упражнению
+        Метод фильтрации записей по диапазону дат и упражнению. Записи выбираются в фоновой задаче
+        двоичным поиском по индексу дат хранилища (по каждому подходящему упражнению).
+        """
+        record_filter = self.get_filter()
+        if record_filter is None:
+            return
+
+        # Отображаем отфильтрованные записи, упорядоченные по времени
+        self.journal_task('filter', lambda task: self.engine.select(record_filter), count=len,
+                          on_done=self.show_records_window)
+
+    def get_filter(self):
+        """
+        Считывает условия фильтрации из виджетов: начало и конец диапазона (в минутах от начала эпохи)
+        и фильтр по упражнению. Если дата начала позже даты окончания, показывает ошибку и возвращает None.
         """
         # Получаем даты из виджетов DateEntry
         start_date = self.start_date_entry.get_date()
         end_date = self.end_date_entry.get_date()
         exercise_filter = self.exercise_filter_entry.get().strip()
 
-        # Преобразуем даты в объекты datetime, добавляя время начала и конца дня
-        start_datetime = datetime.combine(start_date, time.min)  # 00:00
-        end_datetime = datetime.combine(end_date, time.max)  # 23:59:59
-
-        if start_datetime > end_datetime:
-            messagebox.showerror("Ошибка!", "Дата начала не может быть позже даты окончания.")
-            return
-
-        # Загружаем данные и фильтруем
-        data = load_data()
-        filtered_records = [
-            entry for entry in data
-            if start_datetime <= datetime.strptime(entry['datetime'], '%d/%m/%Y %H:%M') <= end_datetime
-               and (exercise_filter.lower() in entry['exercise'].lower() if exercise_filter else True)
-        ]
-
-        # Отображаем отфильтрованные записи
-        self.view_records(filtered_records)
+        # Преобразуем даты в минуты от начала эпохи, добавляя время начала и конца дня
+        try:
+            return make_filter(start_date, end_date, exercise_filter)
+        except ValueError as e:
+            messagebox.showerror("Ошибка!", str(e))
+            return None
 
+    @instrumented()
     def export_to_csv(self):
         """
         Метод для экспорта данных в формат CSV. Пользователь задает имя файла в диалоговом окне,
-        а файл сохраняется в папке files внутри проекта.
+        а файл сохраняется в папке files внутри проекта. Если отмечен флажок "Экспортировать только по фильтру",
+        экспортируются только записи за выбранный диапазон дат и упражнение.
+        Файл пишется потоково пачками строк в фоновой задаче с индикатором прогресса.
         """
-        data = load_data()
-        if not data:
+        if self.tasks.running('export'):
+            return
+        record_filter = None
+        if self.export_filtered.get():
+            record_filter = self.get_filter()
+            if record_filter is None:
+                return
+
+        # Журнал перечитывается в задаче экспорта; здесь проверяются записи, уже загруженные в память
+        if not self.store.count():
             messagebox.showerror("Ошибка!", "Нет данных для экспорта")
             return
 
@@ -505,20 +1193,31 @@ class TrainingLogApp:
         if not file_name:
             return
 
-        try:
-            with open(file_name, mode='w', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(["Дата", "Упражнение", "Вес", "Повторения"])
-                for entry in data:
-                    writer.writerow([entry['datetime'], entry['exercise'], entry['weight'], entry['repetitions']])
+        task = self.journal_task(
+            'export',
+            lambda task: self.engine.export_csv(file_name, record_filter, task.progress, task.cancelled),
+            on_done=lambda count: self.export_finished(file_name, count),
+            on_error=lambda e: messagebox.showerror("Ошибка", f"Ошибка экспорта данных: {e}"),
+            on_cancel=lambda: messagebox.showinfo("Экспорт отменен", "Экспорт отменен, файл не создан."),
+            count=lambda count: count
+        )
+        self.show_progress("Экспорт в CSV", task)
 
-            messagebox.showinfo("Успешно", f"Данные успешно экспортированы в файл: {file_name}")
-        except Exception as e:
-            messagebox.showerror("Ошибка", f"Ошибка экспорта данных: {e}")
+    def export_finished(self, file_name, count):
+        """
+        Завершение экспорта в CSV (в главном потоке).
+        """
+        if not count:
+            messagebox.showerror("Ошибка!", "Нет данных для экспорта")
+            return
+        messagebox.showinfo("Успешно", f"Данные успешно экспортированы в файл: {file_name}\nЗаписей: {count}")
 
+    @instrumented()
     def import_from_csv(self):
         """
         Метод для импорта данных из CSV файла. Пользователь выбирает файл, и данные из него добавляются в журнал.
+        Файл читается потоково пачками строк; строки с ошибками не прерывают импорт, а попадают в отчет.
+        Записи, которые уже есть в журнале, пропускаются; все новые записи добавляются в журнал одной пачкой.
         """
         file_name = filedialog.askopenfilename(
             initialdir="files",
@@ -526,72 +1225,86 @@ class TrainingLogApp:
             filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
         )
 
-        if not file_name:
+        if not file_name or self.tasks.running('import'):
             return
 
-        try:
-            with open(file_name, mode='r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                imported_data = []
-                for row in reader:
-                    # Проверяем наличие всех необходимых полей в строке
-                    if "Дата" in row and "Упражнение" in row and "Вес" in row and "Повторения" in row:
-                        try:
-                            # Проверяем правильность формата даты
-                            datetime.strptime(row["Дата"], '%d/%m/%Y %H:%M')
-
-                            # Проверяем корректность значения "Вес"
-                            weight = float(row["Вес"])
-                            if weight <= 0 or weight > 200:
-                                messagebox.showerror("Ошибка!",
-                                                     f"Некорректное значение веса: {row['Вес']}. Вес должен быть положительным числом не более 200.")
-                                return
-
-                            # Проверяем корректность значения "Повторения"
-                            repetitions = int(row["Повторения"])
-                            if repetitions <= 0:
-                                messagebox.showerror("Ошибка!",
-                                                     f"Некорректное значение повторений: {row['Повторения']}. Повторения должны быть целым положительным числом.")
-                                return
-
-                            # Если все проверки пройдены, добавляем запись
-                            imported_data.append({
-                                "datetime": row["Дата"],
-                                "exercise": row["Упражнение"],
-                                "weight": row["Вес"],
-                                "repetitions": row["Повторения"]
-                            })
-                        except ValueError as e:
-                            messagebox.showerror("Ошибка!", f"Ошибка в строке: {row}. Проверьте формат данных. {e}")
-                            return
-                    else:
-                        messagebox.showerror("Ошибка!", "Некорректный формат данных в файле. Убедитесь, что файл "
-                                                        "содержит столбцы 'Дата', 'Упражнение', 'Вес', 'Повторения'.")
-                        return
-            if imported_data:
-                # Загружаем текущие данные, добавляем новые и сохраняем
-                data = load_data()
-                data.extend(imported_data)
-                save_data(data)
-                self.update_exercise_filter()
-                messagebox.showinfo("Успешно!", f"Данные успешно импортированы из файла: {file_name}")
-            else:
-                messagebox.showerror("Ошибка", "Файл не содержит данных для импорта.")
-
-        except Exception as e:
-            messagebox.showerror("Ошибка", f"Ошибка импорта данных: {e}")
+        # Журнал перечитывается и файл читается в фоновой задаче, ход импорта показывается в окне
+        # с индикатором и кнопкой отмены
+        task = self.journal_task(
+            'import',
+            lambda task: self.engine.import_csv(file_name, progress=task.progress, cancelled=task.cancelled),
+            on_done=lambda report: self.import_finished(file_name, report),
+            on_error=lambda e: messagebox.showerror("Ошибка", f"Ошибка импорта данных: {e}"),
+            on_cancel=lambda: messagebox.showinfo("Импорт отменен", "Импорт отменен, журнал не изменен."),
+            count=lambda report: report.rows_read
+        )
+        self.show_progress("Импорт из CSV", task)
 
+    def import_finished(self, file_name, report):
+        """
+        Завершение импорта из CSV (в главном потоке): сохранение журнала и отчет об ошибках.
+        """
+        if report.fatal_error:
+            messagebox.showerror("Ошибка!", report.fatal_error)
+            return
+        if report.imported:
+            self.changed(report.imported)
+            self.update_exercise_filter()
+        if report.errors:
+            self.show_import_report(report)
+        if report.imported:
+            messagebox.showinfo("Успешно!", f"Данные импортированы из файла: {file_name}\n{report.summary()}")
+        elif report.duplicates:
+            messagebox.showinfo("Нет новых записей", f"Все записи файла {file_name} уже есть в журнале.\n"
+                                                     f"{report.summary()}")
+        else:
+            messagebox.showerror("Ошибка", f"Файл не содержит корректных данных для импорта.\n{report.summary()}")
+
+    def show_progress(self, title, task):
+        """
+        Открывает окно с индикатором прогресса фоновой задачи task и кнопкой отмены.
+        Окно закрывается, когда задача завершается.
+        """
+        progress_window = Toplevel(self.root)
+        progress_window.title(title)
+        progress_window.geometry("300x100")
+        progress_window.transient(self.root)
+        progress_window.protocol("WM_DELETE_WINDOW", task.cancel)
+        progress_bar = ttk.Progressbar(progress_window, length=260, maximum=1.0)
+        progress_bar.pack(padx=20, pady=10)
+        ttk.Button(progress_window, text="Отмена", command=task.cancel).pack(pady=5)
+
+        task.on_progress = lambda fraction: progress_bar.configure(value=fraction)
+        task.on_finish = progress_window.destroy
+        return progress_window
+
+    def show_import_report(self, report):
+        """
+        Показывает отчет об ошибках импорта: номер строки файла и описание ошибки.
+        """
+        report_window = Toplevel(self.root)
+        report_window.title("Ошибки импорта")
+        report_window.geometry("600x300")
+        ttk.Label(report_window, text=report.summary()).pack(pady=5)
+        text = tk.Text(report_window, wrap=tk.WORD)
+        text.insert(tk.END, "\n".join(f"Строка {line}: {message}" for line, message in report.errors))
+        if report.error_count > len(report.errors):
+            text.insert(tk.END, f"\n... и еще {report.error_count - len(report.errors)} строк с ошибками")
+        text.configure(state=tk.DISABLED)
+        text.pack(expand=True, fill=tk.BOTH, padx=5, pady=5)
+
+    @instrumented()
     def edit_record(self):
         """
         Метод для редактирования выбранной записи.
         """
         # Окно с записями должно быть открыто
         try:
-            selected_item = self.tree.selection()[0]  # Получаем выбранную строку
-            values = self.tree.item(selected_item, "values")  # Считываем данные строки
+            record = self.records_view.selected_record()  # Получаем выбранную запись
         except IndexError:
             messagebox.showerror("Ошибка!", "Выберите запись для редактирования")
             return
+        values = record.values()  # Считываем данные записи
 
         # Открываем окно для редактирования
         edit_window = Toplevel(self.root)
@@ -622,57 +1335,28 @@ class TrainingLogApp:
             """
             Сохраняем изменения в файл.
             """
-            new_datetime = datetime_entry.get().strip()
-            new_exercise = exercise_entry.get().strip()
-            new_weight = weight_entry.get().strip()
-            new_repetitions = repetitions_entry.get().strip()
-
-            # Проверяем корректность данных
-            try:
-                datetime.strptime(new_datetime, '%d/%m/%Y %H:%M')  # Проверяем формат даты
-            except ValueError:
-                messagebox.showerror("Ошибка!", "Некорректный формат даты. Формат: ДД/ММ/ГГГГ ЧЧ:ММ")
-                return
-
-            try:
-                new_weight = float(new_weight)
-                if new_weight <= 0 or new_weight > 200:
-                    messagebox.showerror("Ошибка!", "Вес должен быть положительным числом не более 200 кг.")
-                    return
-            except ValueError:
-                messagebox.showerror("Ошибка!", "Вес должен быть числом.")
-                return
-
-            if not new_repetitions.isdigit() or int(new_repetitions) <= 0:
-                messagebox.showerror("Ошибка!", "Повторения должны быть целым положительным числом.")
-                return
-
-            # Загружаем текущие данные
-            data = load_data()
-            for entry in data:
-                if entry["datetime"] == values[0] and entry["exercise"] == values[1]:
-                    # Обновляем запись
-                    entry["datetime"] = new_datetime
-                    entry["exercise"] = new_exercise
-                    entry["weight"] = str(new_weight)
-                    entry["repetitions"] = new_repetitions
-                    break
-
-            # Сохраняем изменения
-            save_data(data)
+            # Загружаем текущие данные и обновляем запись по ее номеру в фоновой задаче
+            # (значения полей проверяются при замене)
+            fields = (datetime_entry.get(), exercise_entry.get(), weight_entry.get(), repetitions_entry.get())
+            self.journal_task('update', lambda task: self.engine.update(record.id, *fields), merge=False,
+                              on_done=lambda new: updated(), on_error=self.show_input_error)
+
+        def updated():
+            # Отмечаем изменение для отложенного сохранения
+            self.changed()
             messagebox.showinfo("Успешно!", "Запись успешно обновлена.")
             edit_window.destroy()
             self.view_records()  # Обновляем отображение записей
 
         ttk.Button(edit_window, text="Сохранить", command=save_changes).pack(pady=10)
 
+    @instrumented()
     def delete_record(self):
         """
         Метод для удаления выбранной записи.
         """
         try:
-            selected_item = self.tree.selection()[0]  # Получаем выбранную строку
-            values = self.tree.item(selected_item, "values")  # Считываем данные строки
+            record = self.records_view.selected_record()  # Получаем выбранную запись
         except IndexError:
             messagebox.showerror("Ошибка!", "Выберите запись для удаления.")
             return
@@ -682,157 +1366,163 @@ class TrainingLogApp:
         if not confirm:
             return
 
-        # Удаляем запись из данных
-        data = load_data()
-        data = [entry for entry in data if not (
-                entry["datetime"] == values[0] and
-                entry["exercise"] == values[1] and
-                entry["weight"] == values[2] and
-                entry["repetitions"] == values[3]
-        )]
-
-        # Сохраняем изменения
-        save_data(data)
+        # Удаляем запись из данных по ее номеру в фоновой задаче
+        self.journal_task('delete', lambda task: self.engine.remove([record.id]), merge=False,
+                          on_done=lambda result: self.record_deleted())
+
+    def record_deleted(self):
+        # Отмечаем изменение для отложенного сохранения
+        self.changed()
         messagebox.showinfo("Успешно!", "Запись успешно удалена.")
         self.view_records()  # Обновляем отображение записей
 
+    @instrumented()
     def show_statistics(self):
         """
         Метод для отображения статистики по выполненным упражнениям.
         """
-        # Получаем диапазон дат
-        start_date = self.start_date_entry.get_date()
-        end_date = self.end_date_entry.get_date()
-        exercise_filter = self.exercise_filter_entry.get().strip()
-
-        # Преобразуем даты в объекты datetime
-        start_datetime = datetime.combine(start_date, time.min)
-        end_datetime = datetime.combine(end_date, time.max)
-
-        if start_datetime > end_datetime:
-            messagebox.showerror("Ошибка!", "Дата начала не может быть позже даты окончания.")
+        record_filter = self.get_filter()
+        if record_filter is None:
             return
 
-        # Загружаем данные и фильтруем по датам и упражнению
-        data = load_data()
-        filtered_records = [
-            entry for entry in data
-            if start_datetime <= datetime.strptime(entry['datetime'], '%d/%m/%Y %H:%M') <= end_datetime
-               and (exercise_filter.lower() in entry['exercise'].lower() if exercise_filter else True)
-        ]
-
-        # Вычисляем статистику
-        total_weight = 0
-        total_repetitions = 0
-        exercises_stats = {}
-
-        for entry in filtered_records:
-            weight = float(entry['weight'])
-            repetitions = int(entry['repetitions'])
-            total_weight += weight * repetitions
-            total_repetitions += repetitions
-
-            exercise = entry['exercise']
-            if exercise not in exercises_stats:
-                exercises_stats[exercise] = {'weight': 0, 'repetitions': 0}
-            exercises_stats[exercise]['weight'] += weight * repetitions
-            exercises_stats[exercise]['repetitions'] += repetitions
+        # Статистика собирается в фоновой задаче из сумм по дням, а рекорды - из рекордов по упражнениям,
+        # которые хранилище обновляет при каждом изменении журнала
+        self.journal_task('statistics', lambda task: (self.engine.statistics(record_filter),
+                                                      self.engine.personal_records(record_filter)),
+                          count=lambda result: sum(stats['count'] for stats in result[0][2].values()),
+                          on_done=self.show_statistics_window)
 
+    @instrumented()
+    def show_statistics_window(self, result):
+        """
+        Окно статистики: суммарные значения, статистика по упражнениям и личные рекорды упражнений.
+        """
+        statistics, records = result
         # Создаем окно для отображения статистики
         stats_window = Toplevel(self.root)
         stats_window.title("Статистика тренировок")
-        stats_window.geometry("400x300")
-
-        # Общая статистика
-        ttk.Label(stats_window, text=f"Суммарный вес: {total_weight:.2f} кг").pack(pady=5)
-        ttk.Label(stats_window, text=f"Суммарное количество повторений: {total_repetitions}").pack(pady=5)
-
-        # Статистика по упражнениям
-        ttk.Label(stats_window, text="Упражнения:").pack(pady=5)
-        for exercise, stats in exercises_stats.items():
-            ttk.Label(
-                stats_window,
-                text=f"{exercise}: {stats['weight']:.2f} кг, {stats['repetitions']} повторений").pack(pady=2)
-
+        stats_window.geometry("500x500" if records else "400x300")
+
+        # Общая статистика (три первые строки отчета) и статистика по упражнениям
+        lines = statistics_lines(statistics)
+        for number, line in enumerate(lines):
+            ttk.Label(stats_window, text=line).pack(pady=5 if number < 3 else 2)
+
+        # Личные рекорды: лучший вес, объем, e1RM и лучшие подходы по диапазонам повторений
+        if records:
+            ttk.Label(stats_window, text="Личные рекорды (за все время):").pack(pady=5)
+            text = tk.Text(stats_window, wrap=tk.WORD, height=12)
+            scrollbar = ttk.Scrollbar(stats_window, orient=tk.VERTICAL, command=text.yview)
+            text.configure(yscrollcommand=scrollbar.set)
+            text.insert(tk.END, "\n".join(progress_lines(records)))
+            text.configure(state=tk.DISABLED)
+            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            text.pack(expand=True, fill=tk.BOTH, padx=5, pady=5)
+
+    @instrumented()
     def show_charts(self):
         """
         Метод для визуализации прогресса по упражнениям.
         """
-        # Получаем диапазон дат
-        start_date = self.start_date_entry.get_date()
-        end_date = self.end_date_entry.get_date()
-        exercise_filter = self.exercise_filter_entry.get().strip()
-
-        start_datetime = datetime.combine(start_date, time.min)
-        end_datetime = datetime.combine(end_date, time.max)
-
-        if start_datetime > end_datetime:
-            messagebox.showerror("Ошибка!", "Дата начала не может быть позже даты окончания.")
+        record_filter = self.get_filter()
+        if record_filter is None:
             return
 
-        # Фильтрация данных
-        data = load_data()
-        filtered_records = [
-            entry for entry in data
-            if start_datetime <= datetime.strptime(entry['datetime'], '%d/%m/%Y %H:%M') <= end_datetime
-               and (exercise_filter.lower() in entry['exercise'].lower() if exercise_filter else True)
-        ]
+        # Графики строятся в фоновой задаче (или берутся из кэша, если журнал не менялся)
+        self.journal_task('charts', lambda task: self.engine.render_charts(record_filter),
+                          on_done=self.show_chart_windows)
 
-        if not filtered_records:
+    @instrumented()
+    def show_chart_windows(self, charts):
+        """
+        Открывает окна с готовыми графиками (в главном потоке).
+        """
+        if charts is None:
             messagebox.showinfo("Нет данных", "Нет данных для отображения графиков.")
             return
 
-        # Данные для графиков
-        dates = [datetime.strptime(entry['datetime'], '%d/%m/%Y %H:%M') for entry in filtered_records]
-        weights = [float(entry['weight']) for entry in filtered_records]
-        repetitions = [int(entry['repetitions']) for entry in filtered_records]
-
-        # Уникальный идентификатор для файлов с графиками
-        file_id = self.chart_counter  # Используем счетчик
-        self.chart_counter += 1  # Увеличиваем счетчик для следующего графика
-
-        # График веса
-        fig1 = Figure(figsize=(8, 6), dpi=100)
-        weight_ax = fig1.add_subplot(111)
-        weight_ax.plot(dates, weights, marker='o', label='Вес (кг)', color='blue')
-        weight_ax.set_title("Изменение веса")
-        weight_ax.set_ylabel("Вес (кг)")
-        weight_ax.grid()
-        weight_path = os.path.join('images', f'weight_chart_{file_id}.png')
-        fig1.savefig(weight_path)
-
-        # Открытие окна для графика веса
-        weight_window = Toplevel(self.root)
-        weight_window.title("График веса")
-        weight_window.geometry("800x600")
-        canvas1 = FigureCanvasTkAgg(fig1, master=weight_window)
-        canvas1.draw()
-        canvas1.get_tk_widget().pack(expand=True, fill=tk.BOTH)
-
-        # График повторений
-        fig2 = Figure(figsize=(8, 6), dpi=100)
-        repetition_ax = fig2.add_subplot(111)
-        repetition_ax.plot(dates, repetitions, marker='o', label='Повторения', color='green')
-        repetition_ax.set_title("Изменение повторений")
-        repetition_ax.set_ylabel("Повторения")
-        repetition_ax.grid()
-        repetition_path = os.path.join('images', f'repetitions_chart_{file_id}.png')
-        fig2.savefig(repetition_path)
-
-        # Открытие окна для графика повторений
-        repetition_window = Toplevel(self.root)
-        repetition_window.title("График повторений")
-        repetition_window.geometry("800x600")
-        canvas2 = FigureCanvasTkAgg(fig2, master=repetition_window)
-        canvas2.draw()
-        canvas2.get_tk_widget().pack(expand=True, fill=tk.BOTH)
+        for chart in charts:
+            chart_window = Toplevel(self.root)
+            chart_window.title(chart.title)
+            chart_window.geometry("800x600")
+            image = tk.PhotoImage(master=chart_window, data=chart.photo_data())
+            label = ttk.Label(chart_window, image=image)
+            label.image = image  # Храним ссылку, иначе изображение будет удалено сборщиком мусора
+            label.pack(expand=True, fill=tk.BOTH)
 
         # Уведомление о сохранении
-        messagebox.showinfo("Графики сохранены", f"Графики сохранены:\n{weight_path}\n{repetition_path}")
+        paths = "\n".join(chart.path for chart in charts)
+        messagebox.showinfo("Графики сохранены", f"Графики сохранены:\n{paths}")
+
+    def show_diagnostics(self):
+        """
+        Окно диагностики: замеры операций приложения (вызовы, время, процентили, гистограмма времени
+        последних замеров), сохранение сводки в JSON и включение профилирования команд cProfile.
+        """
+        diagnostics_window = Toplevel(self.root)
+        diagnostics_window.title("Диагностика")
+        diagnostics_window.geometry("900x400")
+
+        columns = ("Операция", "Вызовы", "Всего, мс", "Среднее, мс", "p50, мс", "p95, мс", "Макс., мс",
+                   "Записей", "Гистограмма")
+        tree = ttk.Treeview(diagnostics_window, columns=columns, show="headings")
+        for column in columns:
+            tree.heading(column, text=column)
+            tree.column(column, width=80, anchor=tk.E)
+        tree.column("Операция", width=200, anchor=tk.W)
+        tree.column("Гистограмма", width=160, anchor=tk.W)
+        tree.pack(expand=True, fill=tk.BOTH, padx=5, pady=5)
+
+        def refresh():
+            tree.delete(*tree.get_children())
+            for name, summary in instrumentation.summary().items():
+                tree.insert('', tk.END, values=(
+                    name, summary['calls'], f"{summary['total_seconds'] * 1000:.1f}",
+                    f"{summary['mean_seconds'] * 1000:.1f}", f"{summary['p50_seconds'] * 1000:.1f}",
+                    f"{summary['p95_seconds'] * 1000:.1f}", f"{summary['max_seconds'] * 1000:.1f}",
+                    "" if summary['last_count'] is None else summary['last_count'],
+                    "/".join(str(count) for count in summary['histogram'].values())))
+
+        def save_json():
+            file_name = filedialog.asksaveasfilename(defaultextension=".json", title="Сохранить замеры",
+                                                     filetypes=[("JSON files", ".json"), ("ALL files", '*.*')])
+            if file_name:
+                instrumentation.dump(file_name)
+
+        profiling = tk.BooleanVar(value=instrumentation.profile_directory is not None)
+
+        def toggle_profiling():
+            instrumentation.profile_directory = profile_directory if profiling.get() else None
+
+        buttons = ttk.Frame(diagnostics_window)
+        buttons.pack(fill=tk.X, padx=5, pady=5)
+        ttk.Button(buttons, text="Обновить", command=refresh).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Сохранить в JSON", command=save_json).pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(buttons, text=f"Профилировать команды (cProfile, папка {profile_directory})",
+                        variable=profiling, command=toggle_profiling).pack(side=tk.LEFT, padx=5)
+        ttk.Label(diagnostics_window, text="Гистограмма: " + " / ".join(BUCKET_LABELS)).pack(pady=2)
+        refresh()
 
 def main():
+    parser = argparse.ArgumentParser(description="Дневник тренировок")
+    # Файл журнала можно передать в командной строке (например, training_log.db для хранилища SQLite)
+    # или каталог журналов команды
+    parser.add_argument('journal_path', nargs='?', default=data_file, help="файл журнала или каталог журналов команды")
+    parser.add_argument('--timings', action='store_true', help="вывести время запуска приложения")
+    parser.add_argument('--timestamps', choices=TIMESTAMP_FORMATS,
+                        help="формат даты и времени в файле журнала JSON (для новых журналов и при перезаписи)")
+    parser.add_argument('--diagnostics', action='store_true',
+                        help="замерять операции приложения и показать кнопку окна диагностики")
+    parser.add_argument('--profile', action='store_true',
+                        help=f"выполнять команды под cProfile и сохранять профили в папку {profile_directory}")
+    args = parser.parse_args()
+    # Замеры включаются до создания приложения, чтобы замерить и загрузку журнала
+    instrumentation.enabled = args.diagnostics or args.profile
+    if args.profile:
+        instrumentation.profile_directory = profile_directory
+    timings = [("Импорт модулей", import_finished - import_started)] if args.timings else None
     root = tk.Tk()
-    app = TrainingLogApp(root)
+    app = TrainingLogApp(root, args.journal_path, timings, args.timestamps)
     root.mainloop()
 
 if __name__ == "__main__":